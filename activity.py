@@ -0,0 +1,152 @@
+"""Daily activity counters: computing, storing and shifting a day's done/total counts.
+
+Shared by the web app and the maintenance scripts, so it imports nothing
+from Flask; callers pass the connection and own the transaction unless a
+function says it commits.
+"""
+from analytics import refresh_streaks
+from day_view import completion_pct
+from migrations import ACTIVE_DAY_MIN_POINTS, ACTIVITY_COUNTS_VERSION
+
+
+def activity_stats(phys_done, phys_total, prof_done, prof_total):
+    phys_pct = completion_pct(phys_done, phys_total)
+    prof_pct = completion_pct(prof_done, prof_total)
+    return {
+        'phys_pct': phys_pct, 'prof_pct': prof_pct,
+        'phys_done': phys_done, 'phys_total': phys_total,
+        'prof_done': prof_done, 'prof_total': prof_total,
+        'combined': round((phys_pct + prof_pct) / 2)
+    }
+
+
+def compute_daily_activity(db, uid, date_str):
+    """Count done/total items for a day straight from the source tables (read-only)"""
+    # Nutrition Checklist
+    nutrition = db.execute('SELECT is_checked FROM nutrition_checklist WHERE user_id=? AND entry_date=?', (uid, date_str)).fetchall()
+    
+    # Tasks (Manual Physical Tasks)
+    tasks = db.execute('SELECT is_completed FROM tasks WHERE user_id=? AND task_date=?', (uid, date_str)).fetchall()
+    
+    # Reminders
+    reminders = db.execute('SELECT is_done FROM reminders WHERE user_id=? AND reminder_date=?', (uid, date_str)).fetchall()
+    
+    # Physical Goals
+    goals = db.execute('SELECT completed_count, total_count FROM physical_goals WHERE user_id=? AND goal_date=?', (uid, date_str)).fetchall()
+
+    # Physical stats
+    phys_total = len(nutrition) + len(tasks) + len(reminders) + sum(g['total_count'] for g in goals)
+    phys_done = sum(1 for n in nutrition if n['is_checked']) + \
+                 sum(1 for t in tasks if t['is_completed']) + \
+                 sum(1 for r in reminders if r['is_done']) + \
+                 sum(g['completed_count'] for g in goals)
+    
+    # Profession stats (filtered by date)
+    prof_tasks = db.execute('SELECT is_completed FROM profession_tasks WHERE user_id=? AND task_date=?', (uid, date_str)).fetchall()
+    prof_total = len(prof_tasks)
+    prof_done = sum(1 for t in prof_tasks if t['is_completed'])
+    
+    return activity_stats(phys_done, phys_total, prof_done, prof_total)
+
+
+def recalculate_daily_activity(db, uid, date_str, commit=True):
+    """Full recompute of a day's daily_activity row from the source tables.
+
+    Mutation endpoints use apply_activity_delta instead; this is the
+    fallback when no row exists yet and the reference for verification.
+    """
+    stats = compute_daily_activity(db, uid, date_str)
+    points = stats['phys_done'] + stats['prof_done']
+    db.execute('''INSERT INTO daily_activity 
+                  (user_id, entry_date, physical_completion_pct, profession_completion_pct, 
+                   physical_points, profession_points, total_points, 
+                   physical_total_count, profession_total_count, counts_version) 
+                  VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                  ON CONFLICT(user_id, entry_date) DO UPDATE SET
+                  physical_completion_pct=excluded.physical_completion_pct,
+                  profession_completion_pct=excluded.profession_completion_pct,
+                  physical_points=excluded.physical_points,
+                  profession_points=excluded.profession_points,
+                  total_points=excluded.total_points,
+                  physical_total_count=excluded.physical_total_count,
+                  profession_total_count=excluded.profession_total_count,
+                  counts_version=excluded.counts_version''',
+               (uid, date_str, stats['phys_pct'], stats['prof_pct'], stats['phys_done'], stats['prof_done'],
+                points, stats['phys_total'], stats['prof_total'], ACTIVITY_COUNTS_VERSION))
+    refresh_streaks(db, uid)
+    if commit:
+        db.commit()
+    return stats
+
+
+def apply_activity_delta(db, uid, date_str, phys_done=0, phys_total=0, prof_done=0, prof_total=0):
+    """Shift a day's stored done/total counters by the given deltas.
+
+    Runs inside the caller's transaction (no commit), right after the
+    mutation that caused it. Falls back to a full recompute when the
+    day has no daily_activity row yet.
+    """
+    if not (phys_done or phys_total or prof_done or prof_total):
+        return None
+    row = db.execute('''UPDATE daily_activity SET
+                        physical_points = physical_points + :pd,
+                        physical_total_count = physical_total_count + :pt,
+                        profession_points = profession_points + :qd,
+                        profession_total_count = profession_total_count + :qt,
+                        total_points = physical_points + profession_points + :pd + :qd,
+                        physical_completion_pct = CASE WHEN physical_total_count + :pt > 0
+                            THEN CAST((physical_points + :pd) * 100.0 / (physical_total_count + :pt) + 0.5 AS INTEGER)
+                            ELSE 0 END,
+                        profession_completion_pct = CASE WHEN profession_total_count + :qt > 0
+                            THEN CAST((profession_points + :qd) * 100.0 / (profession_total_count + :qt) + 0.5 AS INTEGER)
+                            ELSE 0 END
+                      WHERE user_id = :uid AND entry_date = :date
+                      RETURNING physical_points, physical_total_count, profession_points, profession_total_count,
+                                total_points''',
+                     {'pd': phys_done, 'pt': phys_total, 'qd': prof_done, 'qt': prof_total,
+                      'uid': uid, 'date': date_str}).fetchone()
+    if row is None:
+        return recalculate_daily_activity(db, uid, date_str, commit=False)
+    # Streaks are kept current by writers, so GET /api/analytics only reads;
+    # they only change when the day crosses the active threshold
+    before = row['total_points'] - phys_done - prof_done
+    if (before >= ACTIVE_DAY_MIN_POINTS) != (row['total_points'] >= ACTIVE_DAY_MIN_POINTS):
+        refresh_streaks(db, uid)
+    return activity_stats(row['physical_points'], row['physical_total_count'],
+                           row['profession_points'], row['profession_total_count'])
+
+
+def stored_daily_activity(db, uid, date_str):
+    """A day's stats from its stored daily_activity row (read-only).
+
+    None when the row is missing or carries an older counts_version;
+    the caller then recomputes it with recalculate_daily_activity.
+    """
+    row = db.execute('''SELECT physical_points, physical_total_count, profession_points, profession_total_count,
+                               counts_version
+                          FROM daily_activity WHERE user_id = ? AND entry_date = ?''', (uid, date_str)).fetchone()
+    if row is None or row['counts_version'] < ACTIVITY_COUNTS_VERSION:
+        return None
+    return activity_stats(row['physical_points'], row['physical_total_count'],
+                          row['profession_points'], row['profession_total_count'])
+
+
+def verify_daily_activity(db, uid, date_str):
+    """Compare the stored daily_activity counters with a full recompute.
+
+    Returns a dict of {field: (stored, expected)} for every mismatch;
+    empty when the incremental counters are in sync.
+    """
+    expected = compute_daily_activity(db, uid, date_str)
+    row = db.execute('''SELECT physical_points, physical_total_count, profession_points,
+                             profession_total_count, physical_completion_pct, profession_completion_pct
+                      FROM daily_activity WHERE user_id=? AND entry_date=?''', (uid, date_str)).fetchone()
+    if row is None:
+        stored = {'phys_done': 0, 'phys_total': 0, 'prof_done': 0, 'prof_total': 0, 'phys_pct': 0, 'prof_pct': 0}
+    else:
+        stored = {
+            'phys_done': row['physical_points'], 'phys_total': row['physical_total_count'],
+            'prof_done': row['profession_points'], 'prof_total': row['profession_total_count'],
+            'phys_pct': row['physical_completion_pct'], 'prof_pct': row['profession_completion_pct'],
+        }
+    return {k: (v, expected[k]) for k, v in stored.items() if v != expected[k]}
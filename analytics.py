@@ -0,0 +1,221 @@
+"""Streaks, moving averages and weekday patterns over daily_activity.
+
+Reads stay bounded however long a user's history is:
+- weekday patterns come from activity_weekday, seven rows of running
+  sums kept by triggers on daily_activity (migration 6);
+- streaks come from activity_streaks; the triggers only record the
+  earliest day whose active state flipped, and refresh_streaks() rescans
+  from there (back one longest-streak length). Writers refresh in their
+  own transaction when a day's active state flips (activity.py's counter
+  updates, the importer), so reads stay read-only. Breaking the record
+  streak needs the whole history; that is left to the nightly
+  refresh_dirty_streaks() in rollover.py (and recalculate_all.py), and a
+  row still marked dirty is recomputed in memory, never written;
+- moving averages are window functions over a calendar of the last
+  `days` + 89 days, missing days counting as 0%;
+- week/month/year views read the trigger-kept rollup tables
+  (migration 7), one row per period.
+"""
+import datetime
+
+from migrations import ACTIVE_DAY_MIN_POINTS, ACTIVITY_ROLLUPS, rollup_terms
+
+MOVING_WINDOWS = (7, 30, 90)
+TREND_MAX_DAYS = 366
+
+# period name -> rollup table
+ROLLUP_PERIODS = {'week': 'weekly_activity', 'month': 'monthly_activity', 'year': 'yearly_activity'}
+
+WEEKDAYS = ('Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday')
+
+# Runs of consecutive active days on or after a date: (start, end, length) in date order
+RUNS_SQL = f'''
+    SELECT MIN(entry_date) AS start, MAX(entry_date) AS end, COUNT(*) AS length
+      FROM (SELECT entry_date, julianday(entry_date) - ROW_NUMBER() OVER (ORDER BY entry_date) AS run
+              FROM daily_activity
+             WHERE user_id = ? AND entry_date >= ? AND total_points >= {ACTIVE_DAY_MIN_POINTS})
+     GROUP BY run ORDER BY start'''
+
+# Window frames per moving average, over one row per calendar day
+_FRAMES = ', '.join(f'w{n} AS (ORDER BY day ROWS BETWEEN {n - 1} PRECEDING AND CURRENT ROW)'
+                    for n in MOVING_WINDOWS)
+_AVERAGES = ', '.join(f'ROUND(AVG(physical) OVER w{n}, 1) AS physical_{n}, '
+                      f'ROUND(AVG(profession) OVER w{n}, 1) AS profession_{n}' for n in MOVING_WINDOWS)
+TREND_SQL = f'''
+    WITH RECURSIVE calendar_days(day) AS (
+        SELECT date(:start) UNION ALL SELECT date(day, '+1 day') FROM calendar_days WHERE day < :end),
+    series AS (
+        SELECT calendar_days.day, COALESCE(a.physical_completion_pct, 0) AS physical,
+               COALESCE(a.profession_completion_pct, 0) AS profession
+          FROM calendar_days
+          LEFT JOIN daily_activity a ON a.user_id = :uid AND a.entry_date = calendar_days.day)
+    SELECT * FROM (SELECT day, physical, profession, {_AVERAGES} FROM series WINDOW {_FRAMES})
+     WHERE day >= :first'''
+
+
+def _shift(day, days):
+    return (datetime.date.fromisoformat(day) + datetime.timedelta(days=days)).isoformat()
+
+
+def _rescan(db, uid, row, full=True):
+    """(latest, longest) runs for a dirty activity_streaks row, each (start, end, length).
+
+    Reads a bounded range around dirty_from. Only when the record run was
+    shortened does the answer need the whole history; then it is scanned
+    if full, else None is returned.
+    """
+    longest = (row['longest_start'], row['longest_end'], row['longest_len'])
+    # Days before dirty_from are unchanged, so a run reaching into the
+    # changed range started at most one longest-streak length earlier
+    since = _shift(row['dirty_from'], -(row['longest_len'] + 1))
+    # The same holds for a run crossing `since`: read one more length back
+    # so it is seen whole, then keep the runs reaching the changed range
+    runs = [tuple(r) for r in db.execute(RUNS_SQL, (uid, _shift(since, -(row['longest_len'] + 1))))
+            if r['end'] >= since]
+    best = max(runs, key=lambda r: r[2], default=(None, None, 0))
+    if longest[1] is not None and longest[1] >= since:
+        if best[2] < longest[2]:
+            # The record run shrank; the next longest may be anywhere
+            if not full:
+                return None
+            runs = [tuple(r) for r in db.execute(RUNS_SQL, (uid, '0000-01-01'))]
+            best = max(runs, key=lambda r: r[2], default=(None, None, 0))
+        longest = best
+    elif best[2] > longest[2]:
+        longest = best
+
+    if runs:
+        latest = runs[-1]
+    elif row['latest_end'] is not None and row['latest_end'] < since:
+        latest = (row['latest_start'], row['latest_end'], None)
+    else:
+        # Nothing active from `since` on: the latest run ends on the last
+        # active day before it, and lies in unchanged days
+        last = db.execute(f'''SELECT entry_date FROM daily_activity
+                                WHERE user_id = ? AND entry_date < ? AND total_points >= {ACTIVE_DAY_MIN_POINTS}
+                                ORDER BY entry_date DESC LIMIT 1''', (uid, since)).fetchone()
+        latest = (None, None, 0)
+        if last:
+            latest = [tuple(r) for r in db.execute(RUNS_SQL, (uid, _shift(last[0], -(longest[2] + 1))))
+                      if r['end'] <= last[0]][-1]
+    return latest, longest
+
+
+def current_streaks(db, uid):
+    """uid's activity_streaks values as a dict, recomputed if dirty (read-only); None without a row"""
+    row = db.execute('SELECT * FROM activity_streaks WHERE user_id = ?', (uid,)).fetchone()
+    if row is None or row['dirty_from'] is None:
+        return dict(row) if row else None
+    latest, longest = _rescan(db, uid, row)
+    return dict(row, dirty_from=None, latest_start=latest[0], latest_end=latest[1],
+                longest_start=longest[0], longest_end=longest[1], longest_len=longest[2])
+
+
+def refresh_streaks(db, uid, full=False):
+    """Bring uid's activity_streaks row up to date (no commit); returns it or None.
+
+    A change that shortened the record run would need a full-history scan;
+    unless full, that row is left dirty for refresh_dirty_streaks() (run by
+    rollover.py and recalculate_all.py) and readers recompute it meanwhile.
+    """
+    row = db.execute('SELECT * FROM activity_streaks WHERE user_id = ?', (uid,)).fetchone()
+    if row is None or row['dirty_from'] is None:
+        return row
+    rescanned = _rescan(db, uid, row, full)
+    if rescanned is None:
+        return row
+    latest, longest = rescanned
+    db.execute('''UPDATE activity_streaks SET dirty_from = NULL, latest_start = ?, latest_end = ?,
+                         longest_start = ?, longest_end = ?, longest_len = ?
+                   WHERE user_id = ? AND changes = ?''',
+               (latest[0], latest[1], *longest, uid, row['changes']))
+    return db.execute('SELECT * FROM activity_streaks WHERE user_id = ?', (uid,)).fetchone()
+
+
+def refresh_dirty_streaks(db, user_ids=None):
+    """Fully refresh_streaks() every dirty user, or the dirty ones among user_ids (no commit)"""
+    if user_ids is None:
+        rows = db.execute('SELECT user_id FROM activity_streaks WHERE dirty_from IS NOT NULL').fetchall()
+    else:
+        rows = db.execute(f"SELECT user_id FROM activity_streaks WHERE user_id IN ({', '.join('?' * len(user_ids))}) "
+                          'AND dirty_from IS NOT NULL', list(user_ids)).fetchall()
+    for row in rows:
+        refresh_streaks(db, row[0], full=True)
+    return len(rows)
+
+
+def streaks(db, uid, today):
+    """Current and longest runs of active days; today may still be in progress (read-only)"""
+    row = current_streaks(db, uid)
+    if row is None or row['latest_end'] is None:
+        return {'current': 0, 'current_start': None, 'longest': 0, 'longest_start': None, 'longest_end': None}
+    current, start = 0, None
+    if row['latest_end'] >= _shift(today, -1) and row['latest_start'] <= today:
+        end = min(row['latest_end'], today)
+        start = row['latest_start']
+        current = (datetime.date.fromisoformat(end) - datetime.date.fromisoformat(start)).days + 1
+    return {'current': current, 'current_start': start, 'longest': row['longest_len'],
+            'longest_start': row['longest_start'], 'longest_end': row['longest_end']}
+
+
+def weekday_patterns(db, uid):
+    """Average completion and active share per weekday, Monday first"""
+    rows = {r['weekday']: r for r in db.execute('SELECT * FROM activity_weekday WHERE user_id = ?', (uid,))}
+    patterns = []
+    for weekday in (1, 2, 3, 4, 5, 6, 0):
+        r = rows.get(weekday)
+        days = r['days'] if r else 0
+        patterns.append({
+            'weekday': WEEKDAYS[weekday],
+            'days': days,
+            'active_days': r['active_days'] if r else 0,
+            'physical_avg': round(r['physical_pct_sum'] / days, 1) if days else 0.0,
+            'profession_avg': round(r['profession_pct_sum'] / days, 1) if days else 0.0,
+            'points_avg': round(r['points_sum'] / days, 2) if days else 0.0,
+        })
+    return patterns
+
+
+def trend(db, uid, end, days=90):
+    """Per-day completion with 7/30/90-day moving averages for the `days` days ending at end"""
+    first = _shift(end, -(days - 1))
+    start = _shift(first, -(max(MOVING_WINDOWS) - 1))
+    return [dict(r) for r in db.execute(TREND_SQL, {'uid': uid, 'start': start, 'end': end, 'first': first})]
+
+
+def period_key(period, day):
+    """The rollup key of the period containing day: its Monday, 'YYYY-MM' or 'YYYY'"""
+    if period == 'week':
+        return _shift(day, -datetime.date.fromisoformat(day).weekday())
+    return day[:7] if period == 'month' else day[:4]
+
+
+def rollup(db, uid, period, first, last):
+    """One row per week/month/year overlapping first..last that has any days, with averages"""
+    table = ROLLUP_PERIODS[period]
+    column = ACTIVITY_ROLLUPS[table][0]
+    rows = db.execute(f'''SELECT {column} AS period, {', '.join(rollup_terms())} FROM {table}
+                           WHERE user_id = ? AND {column} BETWEEN ? AND ? ORDER BY {column}''',
+                      (uid, period_key(period, first), period_key(period, last)))
+    result = []
+    for r in rows:
+        days = r['days']
+        result.append({
+            **dict(r),
+            'physical_avg': round(r['physical_pct_sum'] / days, 1),
+            'profession_avg': round(r['profession_pct_sum'] / days, 1),
+            'points_avg': round(r['total_points'] / days, 2),
+        })
+    return result
+
+
+def summary(db, uid, today):
+    """Dashboard payload: streaks, today's moving averages and weekday patterns"""
+    latest = trend(db, uid, today, 1)[0]
+    return {
+        'date': today,
+        'streaks': streaks(db, uid, today),
+        'moving_averages': {str(n): {'physical': latest[f'physical_{n}'], 'profession': latest[f'profession_{n}']}
+                            for n in MOVING_WINDOWS},
+        'weekdays': weekday_patterns(db, uid),
+    }
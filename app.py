@@ -1,275 +1,441 @@
+"""Neri web app.
+
+    create_app(config=None) builds the Flask app; wsgi.py holds the
+    instance servers load (`gunicorn wsgi:app`), `python app.py` runs the
+    dev server.
+
+The day counters, checklists and migrations live in Flask-free modules
+(activity.py, checklists.py, migrations.py) that the maintenance scripts
+import directly. Importing this module only defines the views; the schema
+step and the background services start in create_app(). Feature modules
+only some routes need (export, import) load on first use.
+"""
 import os
+import time
+import logging
 import sqlite3
 import datetime
+import calendar
 import json
-import random
 import hashlib
-try:
-    import requests as http_requests
-except ImportError:
-    http_requests = None
-
-from flask import Flask, render_template, request, redirect, url_for, session, g, jsonify, flash
+import base64
+import binascii
+import threading
+import weakref
+
+from flask import (Blueprint, Flask, current_app, render_template, request, redirect, url_for, session, g, jsonify,
+                   flash, send_file, abort)
+from werkzeug.local import LocalProxy
 from werkzeug.security import generate_password_hash, check_password_hash
-from database import get_db, close_connection, init_db
-
-app = Flask(__name__)
-app.secret_key = os.environ.get('SECRET_KEY', 'dev_key_neri_dark_mode')
-app.config['DATABASE'] = 'neri.db'
-
-# Create / migrate DB tables on startup
-def run_schema():
-    try:
-        db = sqlite3.connect(app.config['DATABASE'])
-        db.row_factory = sqlite3.Row
-        with open('schema.sql', 'r') as f:
-            db.executescript(f.read())
-        db.commit()
-        db.close()
-    except Exception as e:
-        print(f"Schema note: {e}")
+from database import ConnectionPool, connect, ensure_schema, begin_immediate, DEFAULT_CONFIG as DB_DEFAULT_CONFIG
+from activity import (activity_stats, compute_daily_activity, recalculate_daily_activity, apply_activity_delta,
+                      stored_daily_activity)
+from analytics import (summary as analytics_summary, trend as analytics_trend, rollup as analytics_rollup,
+                       ROLLUP_PERIODS, TREND_MAX_DAYS)
+from calendar_cache import CalendarCache
+from profile_cache import ProfileCache
+from day_view import build_day_views, parse_fields, project, MAX_DATES as DAY_VIEW_MAX_DATES
+from checklists import compute_nutrition_targets, get_bmi_status, checklist_template, insert_checklist
+from rollover import RolloverWorker
+from assets import BUNDLES, DIST as ASSET_DIST, MIMETYPES as ASSET_MIMETYPES, bundle_text, load_manifest
+from quote_provider import QuoteProvider, DEFAULT_URL as QUOTE_DEFAULT_URL
+from sql_perf import InstrumentedConnection, PerfRegistry, QueryLog, server_timing, slow_log
+
+bp = Blueprint('main', __name__)
+
+# ── Configuration ─────────────────────────────────────────────────────────────
+def default_config():
+    """Settings from the environment; create_app(config) overrides any of them"""
+    config = dict(DB_DEFAULT_CONFIG)  # SQLite pragmas and pool size
+    config.update({
+        'SECRET_KEY': os.environ.get('SECRET_KEY', 'dev_key_neri_dark_mode'),
+        'DATABASE': 'neri.db',
+        # Run pending migrations in create_app(); turn off when deploys run `python migrations.py`
+        'APPLY_SCHEMA': os.environ.get('APPLY_SCHEMA', '1') != '0',
+        'CALENDAR_CACHE_SIZE': int(os.environ.get('CALENDAR_CACHE_SIZE', 2048)),
+        'PROFILE_CACHE_SIZE': int(os.environ.get('PROFILE_CACHE_SIZE', 1024)),
+        'PROFILE_CACHE_TTL': int(os.environ.get('PROFILE_CACHE_TTL', 300)),
+        'OVERVIEW_CONSISTENCY': os.environ.get('OVERVIEW_CONSISTENCY', 'stored'),
+        # Optional in-process midnight rollover (otherwise run rollover.py from cron)
+        'ROLLOVER_IN_PROCESS': os.environ.get('ROLLOVER_IN_PROCESS') == '1',
+        # Statement timing per request (see sql_perf); off unless SQL_PERF=1, since the
+        # proxy and the timing cost every statement something
+        'SQL_PERF': os.environ.get('SQL_PERF') == '1',
+        'SLOW_QUERY_MS': float(os.environ.get('SLOW_QUERY_MS', 50)),
+        'SLOW_QUERY_LOG': os.environ.get('SLOW_QUERY_LOG'),
+        # Users allowed to read /debug/perf
+        'ADMIN_USERNAMES': {name.strip() for name in os.environ.get('ADMIN_USERNAMES', '').split(',')
+                            if name.strip()},
+        'QUOTE_API_URL': os.environ.get('QUOTE_API_URL', QUOTE_DEFAULT_URL),
+        'PROFESSION_PAGE_SIZE': int(os.environ.get('PROFESSION_PAGE_SIZE', 50)),
+        'PROFESSION_PAGE_MAX': 200,
+        'BATCH_MAX_OPS': 200,
+        'IMPORT_MAX_BYTES': int(os.environ.get('IMPORT_MAX_BYTES', 50 * 1024 * 1024)),
+    })
+    return config
+
+# ── App factory ───────────────────────────────────────────────────────────────
+def create_app(config=None):
+    """Build the app: settings, per-app services, the views, then the schema step"""
+    app = Flask(__name__)
+    app.config.update(default_config())
+    app.config.update(config or {})
+
+    def open_db():
+        return connect(app.config['DATABASE'], app.config)
+
+    if app.config['SLOW_QUERY_LOG'] and not slow_log.handlers:
+        handler = logging.FileHandler(app.config['SLOW_QUERY_LOG'])
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        slow_log.addHandler(handler)
+
+    # The app's request connections; closed once the app is collected or at exit
+    pool = ConnectionPool(app.config['DATABASE'], {k: app.config[k] for k in DB_DEFAULT_CONFIG if k in app.config})
+    weakref.finalize(app, pool.close)
+
+    calendar_cache = CalendarCache(app.config['CALENDAR_CACHE_SIZE'])
+    app.extensions['neri'] = {
+        'pool': pool,
+        'calendar_cache': calendar_cache,
+        'profile_cache': ProfileCache(app.config['PROFILE_CACHE_SIZE'], app.config['PROFILE_CACHE_TTL'],
+                                      derive=_derive_profile),
+        'perf_registry': PerfRegistry(),
+        'quote_provider': QuoteProvider(app.config['QUOTE_API_URL'], load=lambda: _load_quote(open_db()),
+                                        save=lambda quote: _save_quote(open_db(), quote)),
+        'rollover_worker': RolloverWorker(open_db),
+        'import_jobs': None,  # created by the first import (see import_jobs_for)
+        'import_jobs_lock': threading.Lock(),
+        'open_db': open_db,
+        'assets': _built_assets(app.static_folder),
+    }
+    app.register_blueprint(bp)
+    app.teardown_appcontext(close_connection)
 
-run_schema()
+    # Explicit and once per process per database (see database.ensure_schema)
+    if app.config['APPLY_SCHEMA']:
+        try:
+            ensure_schema(app.config['DATABASE'], app.config)
+        except Exception as e:
+            print(f"Schema note: {e}")
+    if app.config['ROLLOVER_IN_PROCESS']:
+        app.extensions['neri']['rollover_worker'].start()
+    return app
+
+def _service(name):
+    """The current app's instance of a per-app service"""
+    return LocalProxy(lambda: current_app.extensions['neri'][name])
+
+calendar_cache = _service('calendar_cache')  # month grids and date views
+profile_cache = _service('profile_cache')    # users rows with nutrition targets / BMI status
+perf_registry = _service('perf_registry')
+quote_provider = _service('quote_provider')
+db_pool = _service('pool')
+
+# ── Static assets ─────────────────────────────────────────────────────────────
+# Built bundles (python assets.py) have content-hashed names, so they can be
+# cached for a year; unbuilt ones are assembled per request and revalidated
+ASSET_MAX_AGE = 365 * 24 * 3600
+
+# Accept-Encoding token -> precompressed sibling suffix, in preference order
+ASSET_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+def _built_assets(static_dir):
+    """{'manifest': bundle -> file, 'encodings': file -> available encodings}, or None if never built"""
+    manifest = load_manifest(static_dir)
+    if manifest is None:
+        return None
+    out_dir = os.path.join(static_dir, ASSET_DIST)
+    encodings = {filename: [(token, suffix) for token, suffix in ASSET_ENCODINGS
+                            if os.path.exists(os.path.join(out_dir, filename + suffix))]
+                 for filename in manifest.values()}
+    return {'manifest': manifest, 'encodings': encodings}
+
+@bp.app_template_global()
+def asset_url(name):
+    """URL of a bundle in assets.BUNDLES: its built, content-hashed file once assets are built"""
+    built = current_app.extensions['neri']['assets']
+    return url_for('main.asset', filename=built['manifest'].get(name, name) if built else name)
+
+@bp.route('/assets/<path:filename>')
+def asset(filename):
+    built = current_app.extensions['neri']['assets']
+    mimetype = ASSET_MIMETYPES.get(os.path.splitext(filename)[1])
+    if built and filename in built['encodings']:
+        path = os.path.join(current_app.static_folder, ASSET_DIST, filename)
+        token, suffix = next(((t, s) for t, s in built['encodings'][filename] if t in request.accept_encodings),
+                             (None, ''))
+        resp = send_file(path + suffix, mimetype=mimetype, conditional=True, max_age=ASSET_MAX_AGE)
+        if token:
+            resp.headers['Content-Encoding'] = token
+        resp.headers['Vary'] = 'Accept-Encoding'
+        resp.headers['Cache-Control'] = f'public, max-age={ASSET_MAX_AGE}, immutable'
+        return resp
+    if filename not in BUNDLES:
+        abort(404)
+    body = bundle_text(filename, current_app.static_folder)
+    resp = current_app.response_class(body, mimetype=mimetype)
+    resp.set_etag(hashlib.md5(body.encode()).hexdigest())
+    resp.headers['Cache-Control'] = 'no-cache'
+    return resp.make_conditional(request)
+
+# ── Request database connection ───────────────────────────────────────────────
+def traced(db, config):
+    """Apply SQL_TRACE_CALLBACK (set by check_query_plans.py / bench_routes.py) to db"""
+    trace = config.get('SQL_TRACE_CALLBACK')
+    if trace:
+        db.set_trace_callback(trace)
+    return db
+
+def get_db():
+    """The request's pooled connection, checked out on first use"""
+    db = getattr(g, '_database', None)
+    if db is None:
+        db = traced(db_pool.acquire(), current_app.config)
+        if current_app.config.get('SQL_PERF'):
+            # Timed and counted per request (see sql_perf)
+            db = InstrumentedConnection(db, g.setdefault('_sql_log', QueryLog()))
+        g._database = db
+    return db
+
+def close_connection(exception):
+    db = g.pop('_database', None)
+    if db is not None:
+        if isinstance(db, InstrumentedConnection):
+            db = db.raw
+        db_pool.release(db)
+
+# ── SQL instrumentation ───────────────────────────────────────────────────────
+@bp.before_app_request
+def start_query_log():
+    if current_app.config['SQL_PERF']:
+        g._sql_log = QueryLog()
+
+@bp.after_app_request
+def record_query_log(response):
+    log = g.pop('_sql_log', None)
+    if log is None:
+        return response
+    seconds = time.perf_counter() - log.started
+    db = g.get('_database')
+    route = f"{request.method} {request.url_rule.rule if request.url_rule else '<unmatched>'}"
+    perf_registry.finish(route, seconds, log, db.raw if db is not None else None,
+                         current_app.config['SLOW_QUERY_MS'])
+    response.headers['Server-Timing'] = server_timing(log, seconds)
+    return response
+
+@bp.app_context_processor
+def inject_user():
+    return dict(current_user=current_user())
 
-@app.teardown_appcontext
-def teardown_app_context(exception):
-    close_connection(exception)
+# ── Profile loading ───────────────────────────────────────────────────────────
+def _derive_profile(user):
+    bmi = user.get('bmi')
+    return {
+        'targets': compute_nutrition_targets(user.get('height'), user.get('weight')),
+        'bmi_status': get_bmi_status(bmi) if bmi else None,
+    }
 
-@app.context_processor
-def inject_user():
-    user = None
-    if 'user_id' in session:
-        db = get_db()
-        user = db.execute('SELECT * FROM users WHERE id = ?', (session['user_id'],)).fetchone()
-    return dict(current_user=user)
+def load_profile(uid, db=None):
+    """Profile entry for uid: memoized on g for the request, then profile_cache, then one users query"""
+    profiles = g.setdefault('_profiles', {})
+    entry = profiles.get(uid)
+    if entry is None:
+        entry = profile_cache.get(uid)
+        if entry is None:
+            row = (db or get_db()).execute('SELECT * FROM users WHERE id = ?', (uid,)).fetchone()
+            if row is None:
+                return None
+            entry = profile_cache.put(uid, row)
+        profiles[uid] = entry
+    return entry
+
+def current_user():
+    if 'user_id' not in session:
+        return None
+    entry = load_profile(session['user_id'])
+    return entry['user'] if entry else None
+
+def invalidate_profile(uid):
+    profile_cache.invalidate(uid)
+    g.pop('_profiles', None)
+
+def data_version(uid, ym):
+    """(profile, month) stamps for uid's payloads in month ym ('YYYY-MM').
+
+    user_data_version moves on profile changes, month_data_version on any
+    write dated in that month; both 0 before the first such write. Read
+    before building a payload, so a write that lands mid-build leaves the
+    entry tagged with the older version and it is rebuilt next time.
+    """
+    return tuple(get_db().execute(
+        '''SELECT COALESCE((SELECT version FROM user_data_version WHERE user_id = :uid), 0),
+                  COALESCE((SELECT version FROM month_data_version WHERE user_id = :uid AND ym = :ym), 0)''',
+        {'uid': uid, 'ym': ym}).fetchone())
+
+def calendar_entry(key, build):
+    """calendar_cache entry for key, built and stored on a miss or a newer data version"""
+    version = data_version(key[1], CalendarCache.key_month(key))
+    entry = calendar_cache.get(key, version)
+    if entry is None:
+        entry = calendar_cache.put(key, build(), version)
+    return entry
+
+def cached_json(key, build):
+    """Serve a calendar payload from calendar_cache, answering If-None-Match with 304"""
+    entry = calendar_entry(key, build)
+    if entry['etag'] in request.if_none_match:
+        resp = current_app.response_class(status=304)
+    else:
+        resp = current_app.response_class(entry['body'], mimetype='application/json')
+    resp.set_etag(entry['etag'])
+    resp.headers['Cache-Control'] = 'private, no-cache'
+    return resp
+
+def etag_json(payload):
+    """Uncached JSON response that still answers If-None-Match with 304"""
+    body = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    etag = hashlib.md5(body.encode()).hexdigest()
+    if etag in request.if_none_match:
+        resp = current_app.response_class(status=304)
+    else:
+        resp = current_app.response_class(body, mimetype='application/json')
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = 'private, no-cache'
+    return resp
 
 def login_required(f):
     from functools import wraps
     @wraps(f)
     def decorated_function(*args, **kwargs):
         if 'user_id' not in session:
-            return redirect(url_for('login'))
+            return redirect(url_for('.login'))
         return f(*args, **kwargs)
     return decorated_function
 
 # ── Quote helper ──────────────────────────────────────────────────────────────
-_quote_cache = {'date': None, 'quote': None, 'author': None}
+# Fetched by a background thread; renders only ever read memory. The last
+# good quote round-trips through daily_quotes on a connection of its own.
+def _load_quote(db):
+    try:
+        row = db.execute('SELECT quote_date, quote, author FROM daily_quotes '
+                         'ORDER BY quote_date DESC LIMIT 1').fetchone()
+    finally:
+        db.close()
+    return {'date': row['quote_date'], 'quote': row['quote'], 'author': row['author']} if row else None
+
+def _save_quote(db, quote):
+    try:
+        db.execute('INSERT INTO daily_quotes (quote_date, quote, author) VALUES (?, ?, ?) '
+                   'ON CONFLICT(quote_date) DO UPDATE SET quote=excluded.quote, author=excluded.author, '
+                   'fetched_at=CURRENT_TIMESTAMP',
+                   (quote['date'], quote['quote'], quote['author']))
+        db.commit()
+    finally:
+        db.close()
 
 def get_daily_quote():
+    quote_provider.start()
+    return quote_provider.current()
+
+# ── Activity counters ─────────────────────────────────────────────────────────
+# Computing and storing the counters lives in activity.py (no Flask there)
+def load_daily_activity(db, uid, date_str):
+    """A day's stats from its stored daily_activity row.
+
+    A missing row is computed without storing it: the day's first
+    mutation creates the row, so idle days leave none behind. A row
+    with an older counts_version is recomputed and stored once.
+    """
+    stats = stored_daily_activity(db, uid, date_str)
+    if stats is None:
+        if not db.execute('SELECT 1 FROM daily_activity WHERE user_id = ? AND entry_date = ?',
+                          (uid, date_str)).fetchone():
+            return compute_daily_activity(db, uid, date_str)
+        stats = recalculate_daily_activity(db, uid, date_str)
+        calendar_cache.invalidate(uid, date_str)
+    return stats
+
+# ── Calendar Month Aggregation ─────────────────────────────────────────────
+# One grouped pass over every dated table; the bare title column comes from
+# the MIN(id) row, i.e. the first reminder/goal entered for that day.
+_MONTH_ITEMS_SQL = '''
+    SELECT 'goal' AS kind, goal_date AS day, SUM(completed_count) AS done, SUM(total_count) AS total,
+           goal_title AS title, MIN(id)
+      FROM physical_goals WHERE user_id = :uid AND goal_date BETWEEN :first AND :last GROUP BY goal_date
+    UNION ALL
+    SELECT 'reminder', reminder_date, SUM(is_done), COUNT(*), title, MIN(id)
+      FROM reminders WHERE user_id = :uid AND reminder_date BETWEEN :first AND :last GROUP BY reminder_date
+    UNION ALL
+    SELECT 'profession', task_date, SUM(is_completed), COUNT(*), NULL, NULL
+      FROM profession_tasks WHERE user_id = :uid AND task_date BETWEEN :first AND :last GROUP BY task_date
+    UNION ALL
+    SELECT 'task', task_date, SUM(is_completed), COUNT(*), NULL, NULL
+      FROM tasks WHERE user_id = :uid AND task_date BETWEEN :first AND :last GROUP BY task_date
+    UNION ALL
+    SELECT 'checklist', entry_date, SUM(is_checked), COUNT(*), NULL, NULL
+      FROM nutrition_checklist WHERE user_id = :uid AND entry_date BETWEEN :first AND :last GROUP BY entry_date
+'''
+
+def _keyword(title):
+    words = (title or '').split()
+    return words[0][:10] if words else ''
+
+def calendar_month_summary(db, uid, year, month):
+    """Per-day calendar payload for a month, built from two grouped queries (read-only)"""
+    first = datetime.date(year, month, 1)
+    last = first.replace(day=calendar.monthrange(year, month)[1])
+    params = {'uid': uid, 'first': first.isoformat(), 'last': last.isoformat()}
+
+    activities = {a['entry_date']: dict(a) for a in db.execute(
+        'SELECT * FROM daily_activity WHERE user_id = :uid AND entry_date BETWEEN :first AND :last', params)}
+
+    items = {}
+    for row in db.execute(_MONTH_ITEMS_SQL, params):
+        items.setdefault(row['day'], {})[row['kind']] = row
+
     today = datetime.date.today().isoformat()
-    if _quote_cache['date'] == today and _quote_cache['quote']:
-        return _quote_cache
-
-    fallbacks = [
-        {"quote": "The secret of getting ahead is getting started.", "author": "Mark Twain"},
-        {"quote": "It always seems impossible until it's done.", "author": "Nelson Mandela"},
-        {"quote": "Don't watch the clock; do what it does — keep going.", "author": "Sam Levenson"},
-        {"quote": "Success is the sum of small efforts repeated day in and day out.", "author": "Robert Collier"},
-        {"quote": "The future depends on what you do today.", "author": "Mahatma Gandhi"},
-        {"quote": "Discipline is choosing between what you want now and what you want most.", "author": "Augusta F. Kantra"},
-        {"quote": "An investment in knowledge pays the best interest.", "author": "Benjamin Franklin"},
-    ]
-    # Pick a consistent fallback for today so it doesn't change on reload
-    day_index = datetime.date.today().toordinal() % len(fallbacks)
-    default = fallbacks[day_index]
-
-    if http_requests:
-        try:
-            res = http_requests.get(
-                'https://api.quotable.io/random?tags=motivational,success,technology',
-                timeout=3
-            )
-            if res.status_code == 200:
-                data = res.json()
-                _quote_cache.update({
-                    'date': today,
-                    'quote': data.get('content', default['quote']),
-                    'author': data.get('author', default['author'])
-                })
-                return _quote_cache
-        except Exception:
-            pass
+    activity_map = {}
+    for date_str in set(activities) | {d for d, kinds in items.items() if kinds.keys() & {'goal', 'reminder', 'profession'}}:
+        kinds = items.get(date_str, {})
+        goal, reminder = kinds.get('goal'), kinds.get('reminder')
+        act = activities.get(date_str)
+
+        if not act:
+            if date_str >= today and (goal or reminder):
+                # Live numbers for upcoming days without a stored row; never written from a GET
+                phys_done = sum(kinds[k]['done'] or 0 for k in ('goal', 'reminder', 'task', 'checklist') if k in kinds)
+                phys_total = sum(kinds[k]['total'] or 0 for k in ('goal', 'reminder', 'task', 'checklist') if k in kinds)
+                prof = kinds.get('profession')
+                stats = activity_stats(phys_done, phys_total,
+                                        (prof['done'] or 0) if prof else 0, prof['total'] if prof else 0)
+                act = {'physical_completion_pct': stats['phys_pct'], 'profession_completion_pct': stats['prof_pct'],
+                       'total_points': stats['phys_done'] + stats['prof_done']}
+            else:
+                act = {'physical_completion_pct': 0, 'total_points': 0}
 
-    _quote_cache.update({'date': today, 'quote': default['quote'], 'author': default['author']})
-    return _quote_cache
+        if goal: act['has_goals'] = True
+        if reminder: act['has_reminders'] = True
 
-# ── Activity Recalculation Helper ──────────────────────────────────────────
-def recalculate_daily_activity(db, uid, date_str):
-    """Accurately calculate and store daily completion percentage"""
-    # Nutrition Checklist
-    nutrition = db.execute('SELECT is_checked FROM nutrition_checklist WHERE user_id=? AND entry_date=?', (uid, date_str)).fetchall()
-    
-    # Tasks (Manual Physical Tasks)
-    tasks = db.execute('SELECT is_completed FROM tasks WHERE user_id=? AND task_date=?', (uid, date_str)).fetchall()
-    
-    # Reminders
-    reminders = db.execute('SELECT is_done FROM reminders WHERE user_id=? AND reminder_date=?', (uid, date_str)).fetchall()
-    
-    # Physical Goals
-    goals = db.execute('SELECT completed_count, total_count FROM physical_goals WHERE user_id=? AND goal_date=?', (uid, date_str)).fetchall()
-
-    # Physical stats
-    phys_total = len(nutrition) + len(tasks) + len(reminders) + sum(g['total_count'] for g in goals)
-    phys_done = sum(1 for n in nutrition if n['is_checked']) + \
-                 sum(1 for t in tasks if t['is_completed']) + \
-                 sum(1 for r in reminders if r['is_done']) + \
-                 sum(g['completed_count'] for g in goals)
-    
-    phys_pct = round((phys_done / phys_total * 100) if phys_total else 0)
-    
-    # Profession stats (filtered by date)
-    prof_tasks = db.execute('SELECT is_completed FROM profession_tasks WHERE user_id=? AND task_date=?', (uid, date_str)).fetchall()
-    prof_total = len(prof_tasks)
-    prof_done = sum(1 for t in prof_tasks if t['is_completed'])
-    prof_pct = round((prof_done / prof_total * 100) if prof_total else 0)
-    
-    points = phys_done + prof_done
-    
-    existing = db.execute('SELECT id FROM daily_activity WHERE user_id=? AND entry_date=?', (uid, date_str)).fetchone()
-    if existing:
-        db.execute('''UPDATE daily_activity SET 
-                      physical_completion_pct=?, profession_completion_pct=?, 
-                      physical_points=?, profession_points=?, total_points=?,
-                      physical_total_count=?, profession_total_count=?
-                      WHERE id=?''', 
-                   (phys_pct, prof_pct, phys_done, prof_done, points, phys_total, prof_total, existing['id']))
-    else:
-        db.execute('''INSERT INTO daily_activity 
-                      (user_id, entry_date, physical_completion_pct, profession_completion_pct, 
-                       physical_points, profession_points, total_points, 
-                       physical_total_count, profession_total_count) 
-                      VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-                   (uid, date_str, phys_pct, prof_pct, phys_done, prof_done, points, phys_total, prof_total))
-    db.commit()
-    return {
-        'phys_pct': phys_pct, 'prof_pct': prof_pct, 
-        'phys_done': phys_done, 'phys_total': phys_total,
-        'prof_done': prof_done, 'prof_total': prof_total,
-        'combined': round((phys_pct + prof_pct) / 2)
-    }
-def compute_nutrition_targets(height_cm, weight_kg):
-    if not height_cm or not weight_kg or float(weight_kg) <= 0 or float(height_cm) <= 0:
-        return None
-    h, w = float(height_cm), float(weight_kg)
-    bmi = w / ((h / 100) ** 2)
-    return {
-        'bmi': round(bmi, 1),
-        'protein_g': round(w * 1.6),
-        'fiber_g': 30 if w >= 70 else 25,
-        'water_l': round(w * 0.035, 1),
-    }
+        # Calculate overall score for the day
+        act['overall_score'] = round((act.get('physical_completion_pct', 0) + act.get('profession_completion_pct', 0)) / 2)
 
-# ── Nutrition Food Pools ─────────────────────────────────────────────────────
-FOOD_POOLS = {
-    'breakfast_protein': [
-        'eggs', 'Greek yogurt', 'paneer', 'protein smoothie', 'tofu scramble', 
-        'cottage cheese', 'moong dal chilla', 'sprouted moong'
-    ],
-    'lunch_protein': [
-        'chicken breast', 'dal (lentils)', 'tofu', 'tempeh', 'legumes (chickpeas, kidney beans)', 
-        'soy chunks', 'grilled fish', 'lean beef'
-    ],
-    'dinner_protein': [
-        'fish (salmon, tuna)', 'beans', 'cottage cheese', 'quinoa', 'turkey', 
-        'mushrooms with peas', 'edamame', 'lentil soup'
-    ],
-    'vegetables': [
-        'broccoli', 'spinach', 'carrots', 'cauliflower', 'bell peppers', 
-        'brussels sprouts', 'sweet potatoes', 'kale', 'green beans'
-    ],
-    'grains': [
-        'oats', 'brown rice', 'roti (whole wheat)', 'quinoa', 'barley', 
-        'buckwheat', 'millet', 'whole grain bread'
-    ],
-    'fruits': [
-        'apple', 'guava', 'banana', 'pear', 'orange', 'berries', 'papaya', 'pomegranate'
-    ]
-}
+        # Keyword extraction (Prioritize day_note)
+        if act.get('day_note'):
+            act['keyword'] = act['day_note'][:15]
+        elif goal or reminder:
+            act['keyword'] = _keyword(reminder['title'] if reminder else goal['title'])
 
-WORKOUT_ROUTINES = [
-    'Cardio & Core: 30 mins running/cycling + plank & crunches',
-    'Leg Day: Squats, Lunges, Calf raises, Glute bridges',
-    'Chest & Triceps: Push-ups, Dips, Tricep extensions',
-    'Back & Biceps: Pull-ups, Rows, Bicep curls',
-    'Full Body HIIT: Burpees, Jumping jacks, Mountain climbers',
-    'Active Recovery: 45 mins brisk walking or yoga stretch'
-]
-
-def build_nutrition_checklist(targets, seed_date=None):
-    # Use seed_date (ISO format string) to create a deterministic but changing seed
-    if seed_date:
-        seed_hash = int(hashlib.md5(seed_date.encode()).hexdigest(), 16)
-        rng = random.Random(seed_hash)
-    else:
-        rng = random.Random()
-        
-    checklist = []
-    
-    # ── 1. Calculate rotating workout schedule ─────────────────────────────
-    if seed_date:
-        try:
-            day_idx = datetime.date.fromisoformat(seed_date).toordinal()
-        except Exception:
-            day_idx = rng.randint(0, 1000)
-    else:
-        day_idx = rng.randint(0, 1000)
-        
-    wo = WORKOUT_ROUTINES[day_idx % len(WORKOUT_ROUTINES)]
-    
-    checklist.extend([
-        {'label': 'Warm-up: 5-10 mins dynamic stretching', 'type': 'workout'},
-        {'label': wo, 'type': 'workout'},
-        {'label': 'Cool-down: 5 mins static stretching', 'type': 'workout'},
-        {'label': 'Log your completion and effort', 'type': 'workout'}
-    ])
-
-    if not targets:
-        return checklist
-
-    # ── 2. Calculate Nutrition Targets ─────────────────────────────────────
-    p, f, w = targets['protein_g'], targets['fiber_g'], targets['water_l']
-    per_meal = round(p / 3)
-    
-    # Randomly pick items from pools
-    bp = rng.choice(FOOD_POOLS['breakfast_protein'])
-    lp = rng.choice(FOOD_POOLS['lunch_protein'])
-    dp = rng.choice(FOOD_POOLS['dinner_protein'])
-    
-    # Pick 2 different vegetables
-    veg_pool = FOOD_POOLS['vegetables'][:]
-    v1 = rng.choice(veg_pool)
-    veg_pool.remove(v1)
-    v2 = rng.choice(veg_pool)
-    
-    gr = rng.choice(FOOD_POOLS['grains'])
-    fr = rng.choice(FOOD_POOLS['fruits'])
-
-    checklist.extend([
-        {'label': f'Breakfast protein (~{per_meal}g) — {bp}', 'type': 'protein'},
-        {'label': f'Lunch protein (~{per_meal}g) — {lp}', 'type': 'protein'},
-        {'label': f'Dinner protein (~{per_meal}g) — {dp}', 'type': 'protein'},
-        {'label': f'Daily protein target: {p}g total', 'type': 'protein'},
-        {'label': f'Vegetable servings ({v1}, {v2}) — towards {f}g fiber goal', 'type': 'fiber'},
-        {'label': f'Whole grains for at least one meal — {gr}', 'type': 'fiber'},
-        {'label': f'One serving of fruit — {fr}', 'type': 'fiber'},
-        {'label': f'Daily fiber target: {f}g total', 'type': 'fiber'},
-        {'label': 'Morning: 500ml within 30 min of waking', 'type': 'water'},
-        {'label': 'Pre-lunch: 300ml before your meal', 'type': 'water'},
-        {'label': 'Afternoon: 500ml between 2–4 PM', 'type': 'water'},
-        {'label': 'Evening: 300ml post-workout or with snack', 'type': 'water'},
-        {'label': f'Daily water target: {w}L (based on your weight)', 'type': 'water'},
-    ])
-    
-    return checklist
+        activity_map[date_str] = act
+    return activity_map
 
 # ── Routes ────────────────────────────────────────────────────────────────────
-@app.route('/')
+@bp.route('/')
 def index():
     if 'user_id' in session:
-        return redirect(url_for('overview'))
-    return redirect(url_for('login'))
+        return redirect(url_for('.overview'))
+    return redirect(url_for('.login'))
 
-@app.route('/auth/login', methods=['GET', 'POST'])
+@bp.route('/auth/login', methods=['GET', 'POST'])
 def login():
     if request.method == 'POST':
         username = request.form['username']
@@ -278,11 +444,11 @@ def login():
         user = db.execute('SELECT * FROM users WHERE username = ?', (username,)).fetchone()
         if user and check_password_hash(user['password_hash'], password):
             session['user_id'] = user['id']
-            return redirect(url_for('overview'))
+            return redirect(url_for('.overview'))
         flash('Invalid credentials. Please check your username and password.', 'error')
     return render_template('auth.html', mode='signin')
 
-@app.route('/auth/signup', methods=['GET', 'POST'])
+@bp.route('/auth/signup', methods=['GET', 'POST'])
 def signup():
     if request.method == 'POST':
         username = request.form['username']
@@ -298,18 +464,18 @@ def signup():
             db.commit()
             session['user_id'] = user_id
             flash('Account created. Complete your health profile in the Physical section to unlock nutrition insights.', 'success')
-            return redirect(url_for('overview'))
+            return redirect(url_for('.overview'))
         except sqlite3.IntegrityError:
             flash('Username already taken. Please choose a different one.', 'error')
     return render_template('auth.html', mode='signup')
 
-@app.route('/auth/logout')
+@bp.route('/auth/logout')
 def logout():
     session.clear()
-    return redirect(url_for('login'))
+    return redirect(url_for('.login'))
 
 # ── Overview — summary dashboard ──────────────────────────────────────────────
-@app.route('/overview')
+@bp.route('/overview')
 @login_required
 def overview():
     db = get_db()
@@ -330,8 +496,13 @@ def overview():
             flash(msg, 'info')
         session['daily_alert_shown'] = True
 
-    # Use the centralized recalculation for today to ensure consistency
-    stats = recalculate_daily_activity(db, uid, today)
+    # Mutations keep daily_activity current, so a render only reads it;
+    # OVERVIEW_CONSISTENCY='recompute' restores the recompute-on-every-load behaviour
+    if current_app.config['OVERVIEW_CONSISTENCY'] == 'recompute':
+        stats = recalculate_daily_activity(db, uid, today)
+        calendar_cache.invalidate(uid, today)
+    else:
+        stats = load_daily_activity(db, uid, today)
 
     # Today's Reminders (Focus for overview sidebar)
     reminders = db.execute(
@@ -342,6 +513,7 @@ def overview():
     quote = get_daily_quote()
     now_hour = datetime.datetime.now().hour
     return render_template('overview.html',
+        bootstrap=overview_bootstrap(uid, today),
         today=today,
         now_hour=now_hour,
         tasks_total=stats['phys_total'],
@@ -355,39 +527,57 @@ def overview():
         quote=quote,
     )
 
+def overview_bootstrap(uid, today):
+    """The month and day payloads the overview script would fetch first,
+    keyed by their API URL; the page embeds them so the client can skip
+    those requests. Both go through calendar_cache, so the ETags match
+    what the endpoints would send."""
+    day = datetime.date.fromisoformat(today)
+    month = calendar_entry(CalendarCache.month_key(uid, day.year, day.month),
+                           lambda: calendar_month_summary(get_db(), uid, day.year, day.month))
+    view = calendar_entry(CalendarCache.day_key(uid, today), lambda: date_view_payload(get_db(), uid, today))
+    return {
+        url_for('.get_calendar_month', year=day.year, month=day.month): {'etag': month['etag'], 'data': month['payload']},
+        url_for('.get_date_view', date=today): {'etag': view['etag'], 'data': view['payload']},
+    }
+
 # ── Profession — notebook page ────────────────────────────────────────────────
-@app.route('/profession')
+@bp.route('/profession')
 @login_required
 def profession():
     db = get_db()
     uid = session['user_id']
     today = datetime.date.today().isoformat()
     
-    # Get all tasks for this user
-    all_prof_tasks = db.execute(
-        'SELECT * FROM profession_tasks WHERE user_id = ? ORDER BY is_completed ASC, created_at DESC', (uid,)
+    # Today's tasks are bounded by the day; older pending work is paged
+    today_tasks = db.execute(
+        'SELECT * FROM profession_tasks WHERE user_id = ? AND task_date = ? ORDER BY is_completed ASC, created_at DESC',
+        (uid, today)
     ).fetchall()
-    
-    # Split into today's tasks and past incomplete tasks
-    today_tasks = [t for t in all_prof_tasks if t['task_date'] == today]
-    past_pending = [t for t in all_prof_tasks if t['task_date'] < today and not t['is_completed']]
+    past_pending, past_cursor = profession_task_page(db, uid, statuses=(0,), before_date=today)
+    past_pending_count = db.execute(
+        'SELECT COUNT(*) FROM profession_tasks WHERE user_id = ? AND is_completed = 0 AND task_date < ?', (uid, today)
+    ).fetchone()[0]
     
     prof_stats = db.execute('SELECT * FROM profession_stats WHERE user_id = ?', (uid,)).fetchone()
     
     return render_template('profession.html', 
                            today_tasks=today_tasks, 
                            past_pending=past_pending, 
+                           past_pending_count=past_pending_count,
+                           past_cursor=past_cursor,
                            prof_stats=prof_stats, 
                            today=today)
 
 # ── Physical page ─────────────────────────────────────────────────────────────
-@app.route('/physical')
+@bp.route('/physical')
 @login_required
 def physical():
     db = get_db()
     uid = session['user_id']
     today = datetime.date.today().isoformat()
-    user = db.execute('SELECT * FROM users WHERE id = ?', (uid,)).fetchone()
+    profile = load_profile(uid, db)
+    user = profile['user']
 
     daily = db.execute(
         'SELECT * FROM daily_physical WHERE user_id = ? AND entry_date = ?', (uid, today)
@@ -399,67 +589,67 @@ def physical():
             'SELECT * FROM daily_physical WHERE user_id = ? AND entry_date = ?', (uid, today)
         ).fetchone()
 
-    targets  = compute_nutrition_targets(user['height'], user['weight'])
+    targets  = profile['targets']
     checklist = db.execute(
         'SELECT * FROM nutrition_checklist WHERE user_id = ? AND entry_date = ?', (uid, today)
     ).fetchall()
 
     if not checklist:
-        for item in build_nutrition_checklist(targets, today):
-            db.execute(
-                'INSERT INTO nutrition_checklist (user_id, entry_date, item_label, item_type) VALUES (?,?,?,?)',
-                (uid, today, item['label'], item['type'])
-            )
+        checklist = insert_checklist(db, uid, today, checklist_template(targets, today))
+        apply_activity_delta(db, uid, today, phys_total=len(checklist))
         db.commit()
-        checklist = db.execute(
-            'SELECT * FROM nutrition_checklist WHERE user_id = ? AND entry_date = ?', (uid, today)
-        ).fetchall()
-    elif checklist:
+        calendar_cache.invalidate(uid, today)
+    elif not any(item['item_type'] == 'workout' for item in checklist):
         # Backfill: If an old checklist exists without workouts, append them
-        has_workouts = any(item['item_type'] == 'workout' for item in checklist)
-        if not has_workouts:
-            new_items = build_nutrition_checklist(targets, today)
-            workout_items = [i for i in new_items if i['type'] == 'workout']
-            for item in workout_items:
-                db.execute(
-                    'INSERT INTO nutrition_checklist (user_id, entry_date, item_label, item_type) VALUES (?,?,?,?)',
-                    (uid, today, item['label'], item['type'])
-                )
-            db.commit()
-            checklist = db.execute(
-                'SELECT * FROM nutrition_checklist WHERE user_id = ? AND entry_date = ?', (uid, today)
-            ).fetchall()
+        workout_items = [i for i in checklist_template(targets, today) if i[1] == 'workout']
+        checklist = checklist + insert_checklist(db, uid, today, workout_items)
+        apply_activity_delta(db, uid, today, phys_total=len(workout_items))
+        db.commit()
+        calendar_cache.invalidate(uid, today)
 
     return render_template('physical.html', daily=daily, targets=targets, checklist=checklist, user=user)
 
 # ── Calendar Tasks API ────────────────────────────────────────────────────────
-@app.route('/api/task/add', methods=['POST'])
+@bp.route('/api/task/add', methods=['POST'])
 @login_required
 def add_task():
     data = request.json
     db = get_db()
     db.execute('INSERT INTO tasks (user_id, title, task_date) VALUES (?, ?, ?)',
                (session['user_id'], data['title'], data['date']))
+    apply_activity_delta(db, session['user_id'], data['date'], phys_total=1)
     db.commit()
-    recalculate_daily_activity(db, session['user_id'], data['date'])
+    calendar_cache.invalidate(session['user_id'], data['date'])
     return jsonify({'status': 'success'})
 
-@app.route('/api/task/toggle', methods=['POST'])
+# A toggle sets a flag to the requested state and shifts the day's counters
+# by one. The UPDATE only matches a row whose flag is on the other side, so
+# when two requests race for the same row exactly one of them changes it
+# (SQLite serializes writers) and only that one applies the delta.
+_FLIPS = '(COALESCE(%s, 0) != 0) != ?'
+
+def _flip_delta(state):
+    return 1 if state else -1
+
+@bp.route('/api/task/toggle', methods=['POST'])
 @login_required
 def toggle_task():
     data = request.json
     db = get_db()
     uid = session['user_id']
-    db.execute('UPDATE tasks SET is_completed = ? WHERE id = ? AND user_id = ?',
-               (data['completed'], data['id'], uid))
+    completed = 1 if data['completed'] else 0
+
+    # Only the request that actually flips the row shifts the counters
+    task = db.execute(f'UPDATE tasks SET is_completed = ? WHERE id = ? AND user_id = ? AND {_FLIPS % "is_completed"} '
+                      'RETURNING task_date', (completed, data['id'], uid, completed)).fetchone()
+    if task:
+        apply_activity_delta(db, uid, task['task_date'], phys_done=_flip_delta(completed))
     db.commit()
-    
-    task = db.execute('SELECT task_date FROM tasks WHERE id = ? AND user_id = ?', (data['id'], uid)).fetchone()
     if task:
-        recalculate_daily_activity(db, uid, task['task_date'])
+        calendar_cache.invalidate(uid, task['task_date'])
     return jsonify({'status': 'success'})
 
-@app.route('/api/physical-goals/toggle', methods=['POST'])
+@bp.route('/api/physical-goals/toggle', methods=['POST'])
 @login_required
 def toggle_physical_goal():
     data = request.json
@@ -468,17 +658,20 @@ def toggle_physical_goal():
     goal_id = data.get('id')
     completed = 1 if data.get('completed') else 0
     
-    goal = db.execute('SELECT goal_date FROM physical_goals WHERE id=? AND user_id=?', (goal_id, uid)).fetchone()
+    # The delta depends on the stored count, so read it under the write lock
+    begin_immediate(db)
+    goal = db.execute('SELECT goal_date, completed_count FROM physical_goals WHERE id=? AND user_id=?', (goal_id, uid)).fetchone()
     if not goal:
+        db.rollback()
         return jsonify({'status': 'error', 'message': 'Goal not found'}), 404
-        
+
     db.execute('UPDATE physical_goals SET completed_count=? WHERE id=? AND user_id=?', (completed, goal_id, uid))
+    apply_activity_delta(db, uid, goal['goal_date'], phys_done=completed - (goal['completed_count'] or 0))
     db.commit()
-    
-    stats = recalculate_daily_activity(db, uid, goal['goal_date'])
+    calendar_cache.invalidate(uid, goal['goal_date'])
     return jsonify({'status': 'success'})
 
-@app.route('/api/physical-goals/add', methods=['POST'])
+@bp.route('/api/physical-goals/add', methods=['POST'])
 @login_required
 def add_physical_goal():
     data = request.json
@@ -486,25 +679,30 @@ def add_physical_goal():
     uid = session['user_id']
     db.execute('INSERT INTO physical_goals (user_id, goal_title, goal_date) VALUES (?, ?, ?)',
                (uid, data['goal_title'], data['goal_date']))
+    # New goals default to total_count=1, completed_count=0
+    apply_activity_delta(db, uid, data['goal_date'], phys_total=1)
     db.commit()
-    recalculate_daily_activity(db, uid, data['goal_date'])
+    calendar_cache.invalidate(uid, data['goal_date'])
     return jsonify({'status': 'success'})
 
-@app.route('/api/physical-goals/delete', methods=['POST'])
+@bp.route('/api/physical-goals/delete', methods=['POST'])
 @login_required
 def delete_physical_goal():
     data = request.json
     db = get_db()
     uid = session['user_id']
-    goal = db.execute('SELECT goal_date FROM physical_goals WHERE id=? AND user_id=?', (data['id'], uid)).fetchone()
+    goal = db.execute('DELETE FROM physical_goals WHERE id=? AND user_id=? RETURNING goal_date, completed_count, total_count',
+                      (data['id'], uid)).fetchone()
     if goal:
-        db.execute('DELETE FROM physical_goals WHERE id=? AND user_id=?', (data['id'], uid))
-        db.commit()
-        recalculate_daily_activity(db, uid, goal['goal_date'])
+        apply_activity_delta(db, uid, goal['goal_date'],
+                             phys_done=-(goal['completed_count'] or 0), phys_total=-(goal['total_count'] or 0))
+    db.commit()
+    if goal:
+        calendar_cache.invalidate(uid, goal['goal_date'])
     return jsonify({'status': 'success'})
 
 
-@app.route('/api/tasks', methods=['GET'])
+@bp.route('/api/tasks', methods=['GET'])
 @login_required
 def get_tasks():
     date = request.args.get('date')
@@ -518,20 +716,86 @@ def get_tasks():
     } for t in tasks])
 
 # ── Profession Tasks API ──────────────────────────────────────────────────────
-@app.route('/api/profession/tasks', methods=['GET'])
+# ── Profession task history (keyset paging) ──────────────────────────────────
+# Pages walk idx_profession_tasks_user_status one status at a time, newest
+# first, so a page costs the same however long the history is.
+
+def _encode_cursor(row):
+    raw = json.dumps([row['is_completed'], row['created_at'], row['id']])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def _decode_cursor(cursor):
+    """(is_completed, created_at, id) of the last row served; ValueError if malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        status, created_at, task_id = json.loads(raw)
+        return int(status), str(created_at), int(task_id)
+    except (TypeError, ValueError, binascii.Error):
+        raise ValueError('Bad cursor')
+
+def profession_task_page(db, uid, cursor=None, limit=None, statuses=(0, 1), before_date=None):
+    """One page in ORDER BY is_completed, created_at DESC, id DESC; returns (rows, next_cursor)"""
+    limit = limit or current_app.config['PROFESSION_PAGE_SIZE']
+    after = _decode_cursor(cursor) if cursor else None
+    rows = []
+    for status in statuses:
+        if after and status < after[0]:
+            continue
+        sql = 'SELECT * FROM profession_tasks WHERE user_id = ? AND is_completed = ?'
+        params = [uid, status]
+        if after and status == after[0]:
+            sql += ' AND (created_at, id) < (?, ?)'
+            params += [after[1], after[2]]
+        if before_date:
+            sql += ' AND task_date < ?'
+            params.append(before_date)
+        sql += ' ORDER BY created_at DESC, id DESC LIMIT ?'
+        params.append(limit + 1 - len(rows))
+        rows += db.execute(sql, params).fetchall()
+        if len(rows) > limit:
+            break
+    if len(rows) > limit:
+        return rows[:limit], _encode_cursor(rows[limit - 1])
+    return rows, None
+
+def _page_args():
+    try:
+        limit = int(request.args.get('limit') or current_app.config['PROFESSION_PAGE_SIZE'])
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= current_app.config['PROFESSION_PAGE_MAX']:
+        raise ValueError('Bad limit')
+    return request.args.get('cursor') or None, limit
+
+def _profession_page_response(statuses, before_date=None):
+    try:
+        cursor, limit = _page_args()
+        rows, next_cursor = profession_task_page(get_db(), session['user_id'], cursor, limit, statuses, before_date)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    return jsonify({
+        'status': 'success',
+        'tasks': [{
+            'id': t['id'], 'title': t['title'], 'task_date': t['task_date'],
+            'is_completed': bool(t['is_completed']), 'created_at': t['created_at']
+        } for t in rows],
+        'next_cursor': next_cursor
+    })
+
+@bp.route('/api/profession/tasks', methods=['GET'])
 @login_required
 def get_profession_tasks():
-    db = get_db()
-    tasks = db.execute(
-        'SELECT * FROM profession_tasks WHERE user_id = ? ORDER BY is_completed ASC, created_at DESC',
-        (session['user_id'],)
-    ).fetchall()
-    return jsonify([{
-        'id': t['id'], 'title': t['title'],
-        'is_completed': bool(t['is_completed']), 'created_at': t['created_at']
-    } for t in tasks])
+    """Task history, pending first; ?status=pending|done, ?limit=, ?cursor= from the previous page"""
+    statuses = {'pending': (0,), 'done': (1,)}.get(request.args.get('status'), (0, 1))
+    return _profession_page_response(statuses)
+
+@bp.route('/api/profession/tasks/past-pending', methods=['GET'])
+@login_required
+def get_past_pending_profession_tasks():
+    """Older pages of the "pending works on previous day" list"""
+    return _profession_page_response((0,), before_date=datetime.date.today().isoformat())
 
-@app.route('/api/profession/tasks/add', methods=['POST'])
+@bp.route('/api/profession/tasks/add', methods=['POST'])
 @login_required
 def add_profession_task():
     data = request.json
@@ -543,33 +807,34 @@ def add_profession_task():
     cur = db.cursor()
     cur.execute('INSERT INTO profession_tasks (user_id, title, task_date) VALUES (?, ?, ?)',
                 (session['user_id'], title, task_date))
+    apply_activity_delta(db, session['user_id'], task_date, prof_total=1)
     db.commit()
-    recalculate_daily_activity(db, session['user_id'], task_date)
+    calendar_cache.invalidate(session['user_id'], task_date)
     return jsonify({'status': 'success', 'id': cur.lastrowid})
 
-@app.route('/api/profession/tasks/toggle', methods=['POST'])
+@bp.route('/api/profession/tasks/toggle', methods=['POST'])
 @login_required
 def toggle_profession_task():
     data = request.json
     db = get_db()
-    db.execute('UPDATE profession_tasks SET is_completed = ? WHERE id = ? AND user_id = ?',
-               (data['completed'], data['id'], session['user_id']))
-    db.commit()
-    
-    # Get task date to recalculate
-    task = db.execute('SELECT task_date FROM profession_tasks WHERE id=?', (data['id'],)).fetchone()
+    completed = 1 if data['completed'] else 0
+    task = db.execute(f'UPDATE profession_tasks SET is_completed = ? WHERE id = ? AND user_id = ? '
+                      f'AND {_FLIPS % "is_completed"} RETURNING task_date',
+                      (completed, data['id'], session['user_id'], completed)).fetchone()
     if task and task['task_date']:
-        recalculate_daily_activity(db, session['user_id'], task['task_date'])
-        
-    done  = db.execute('SELECT COUNT(*) FROM profession_tasks WHERE user_id=? AND is_completed=1', (session['user_id'],)).fetchone()[0]
-    total = db.execute('SELECT COUNT(*) FROM profession_tasks WHERE user_id=?', (session['user_id'],)).fetchone()[0]
-    db.execute('UPDATE profession_stats SET completed_count=?, target_count=? WHERE user_id=?',
-               (done, total, session['user_id']))
+        apply_activity_delta(db, session['user_id'], task['task_date'], prof_done=_flip_delta(completed))
+
+    # profession_stats is kept current by triggers on profession_tasks (migration 8)
+    stats = db.execute('SELECT completed_count, target_count FROM profession_stats WHERE user_id=?',
+                       (session['user_id'],)).fetchone()
+    done, total = (stats['completed_count'] or 0, stats['target_count'] or 0) if stats else (0, 0)
     db.commit()
+    if task:
+        calendar_cache.invalidate(session['user_id'], task['task_date'])
     return jsonify({'status': 'success', 'done': done, 'total': total,
                     'pct': round(done/total*100) if total else 0})
 
-@app.route('/api/profession/tasks/edit', methods=['POST'])
+@bp.route('/api/profession/tasks/edit', methods=['POST'])
 @login_required
 def edit_profession_task():
     data = request.json
@@ -577,23 +842,30 @@ def edit_profession_task():
     if not title:
         return jsonify({'status': 'error'}), 400
     db = get_db()
-    db.execute('UPDATE profession_tasks SET title=? WHERE id=? AND user_id=?',
-               (title, data['id'], session['user_id']))
+    task = db.execute('UPDATE profession_tasks SET title=? WHERE id=? AND user_id=? RETURNING task_date',
+                      (title, data['id'], session['user_id'])).fetchone()
     db.commit()
+    if task:
+        calendar_cache.invalidate(session['user_id'], task['task_date'])
     return jsonify({'status': 'success'})
 
-@app.route('/api/profession/tasks/delete', methods=['POST'])
+@bp.route('/api/profession/tasks/delete', methods=['POST'])
 @login_required
 def delete_profession_task():
     data = request.json
     db = get_db()
-    db.execute('DELETE FROM profession_tasks WHERE id=? AND user_id=?',
-               (data['id'], session['user_id']))
+    task = db.execute('DELETE FROM profession_tasks WHERE id=? AND user_id=? RETURNING task_date, is_completed',
+                      (data['id'], session['user_id'])).fetchone()
+    if task and task['task_date']:
+        apply_activity_delta(db, session['user_id'], task['task_date'],
+                             prof_done=-int(bool(task['is_completed'])), prof_total=-1)
     db.commit()
+    if task:
+        calendar_cache.invalidate(session['user_id'], task['task_date'])
     return jsonify({'status': 'success'})
 
 # ── Reminders API ─────────────────────────────────────────────────────────────
-@app.route('/api/reminders/add', methods=['POST'])
+@bp.route('/api/reminders/add', methods=['POST'])
 @login_required
 def add_reminder():
     data = request.json
@@ -603,43 +875,45 @@ def add_reminder():
         return jsonify({'status': 'error'}), 400
     db = get_db()
     cur = db.cursor()
-    db.execute('INSERT INTO reminders (user_id, title, reminder_date) VALUES (?, ?, ?)', (session['user_id'], title, date))
-    db.commit()
+    cur.execute('INSERT INTO reminders (user_id, title, reminder_date) VALUES (?, ?, ?)', (session['user_id'], title, date))
     if date:
-        recalculate_daily_activity(db, session['user_id'], date)
+        apply_activity_delta(db, session['user_id'], date, phys_total=1)
+    db.commit()
+    calendar_cache.invalidate(session['user_id'], date)
     return jsonify({'status': 'success', 'id': cur.lastrowid})
 
-@app.route('/api/reminders/toggle', methods=['POST'])
+@bp.route('/api/reminders/toggle', methods=['POST'])
 @login_required
 def toggle_reminder():
     data = request.json
     db = get_db()
-    db.execute('UPDATE reminders SET is_done=? WHERE id=? AND user_id=?',
-               (data['done'], data['id'], session['user_id']))
-    db.commit()
-    
-    rem = db.execute('SELECT reminder_date FROM reminders WHERE id=? AND user_id=?', (data['id'], session['user_id'])).fetchone()
+    done = 1 if data['done'] else 0
+    rem = db.execute(f'UPDATE reminders SET is_done=? WHERE id=? AND user_id=? AND {_FLIPS % "is_done"} '
+                     'RETURNING reminder_date', (done, data['id'], session['user_id'], done)).fetchone()
     if rem and rem['reminder_date']:
-        recalculate_daily_activity(db, session['user_id'], rem['reminder_date'])
-        
+        apply_activity_delta(db, session['user_id'], rem['reminder_date'], phys_done=_flip_delta(done))
+    db.commit()
+    if rem:
+        calendar_cache.invalidate(session['user_id'], rem['reminder_date'])
     return jsonify({'status': 'success'})
 
-@app.route('/api/reminders/delete', methods=['POST'])
+@bp.route('/api/reminders/delete', methods=['POST'])
 @login_required
 def delete_reminder():
     data = request.json
     db = get_db()
     uid = session['user_id']
-    rem = db.execute('SELECT reminder_date FROM reminders WHERE id=? AND user_id=?', (data['id'], uid)).fetchone()
+    rem = db.execute('DELETE FROM reminders WHERE id=? AND user_id=? RETURNING reminder_date, is_done',
+                     (data['id'], uid)).fetchone()
+    if rem and rem['reminder_date']:
+        apply_activity_delta(db, uid, rem['reminder_date'], phys_done=-int(bool(rem['is_done'])), phys_total=-1)
+    db.commit()
     if rem:
-        db.execute('DELETE FROM reminders WHERE id=? AND user_id=?', (data['id'], uid))
-        db.commit()
-        if rem['reminder_date']:
-            recalculate_daily_activity(db, uid, rem['reminder_date'])
+        calendar_cache.invalidate(uid, rem['reminder_date'])
     return jsonify({'status': 'success'})
 
 # ── Physical API ──────────────────────────────────────────────────────────────
-@app.route('/api/physical/update', methods=['POST'])
+@bp.route('/api/physical/update', methods=['POST'])
 @login_required
 def update_physical():
     data = request.json
@@ -663,109 +937,276 @@ def update_physical():
                    (h, w, bg, bmi, uid))
         if h and w:
             db.execute('DELETE FROM nutrition_checklist WHERE user_id=? AND entry_date=?', (uid, today))
+            recalculate_daily_activity(db, uid, today, commit=False)
     db.commit()
+    if 'personal_info' in data:
+        # Date views embed the profile, so every cached day is stale
+        invalidate_profile(uid)
+        calendar_cache.invalidate_user(uid)
     return jsonify({'status': 'success'})
 
-@app.route('/api/nutrition/checklist/toggle', methods=['POST'])
+@bp.route('/api/nutrition/checklist/toggle', methods=['POST'])
 @login_required
 def toggle_nutrition_item():
     data = request.json
     db = get_db()
     uid = session['user_id']
-    today = datetime.date.today().isoformat()
-    
-    db.execute('UPDATE nutrition_checklist SET is_checked=? WHERE id=? AND user_id=?',
-               (data['checked'], data['id'], uid))
+    checked = 1 if data['checked'] else 0
+
+    item = db.execute(f'UPDATE nutrition_checklist SET is_checked=? WHERE id=? AND user_id=? AND {_FLIPS % "is_checked"} '
+                      'RETURNING entry_date', (checked, data['id'], uid, checked)).fetchone()
+    if item:
+        stats = apply_activity_delta(db, uid, item['entry_date'], phys_done=_flip_delta(checked))
+    else:
+        # Already in the requested state (or missing): nothing to shift
+        item = db.execute('SELECT entry_date FROM nutrition_checklist WHERE id=? AND user_id=?',
+                          (data['id'], uid)).fetchone()
+        if not item:
+            return jsonify({'status': 'error', 'message': 'Item not found'}), 404
+        stats = compute_daily_activity(db, uid, item['entry_date'])
     db.commit()
-    
-    stats = recalculate_daily_activity(db, uid, today)
-    
+    calendar_cache.invalidate(uid, item['entry_date'])
+
     return jsonify({'status': 'success', 'percentage': stats['phys_pct']})
 
+# ── Batch Mutation API ───────────────────────────────────────────────────────
+# Each handler applies one operation without committing and returns
+# (result, affected_date). /api/batch recalculates every affected day once.
+# Fields are checked and converted by check_batch_op() before any handler runs.
+def _flag(value):
+    return 1 if value else 0
+
+def _op_id(field, value):
+    if isinstance(value, bool) or not isinstance(value, (int, str)) or not str(value).isdecimal() \
+            or not 0 < int(value) < 2 ** 63:
+        raise ValueError(f'{field} must be a positive integer')
+    return int(value)
+
+def _op_date(field, value):
+    try:
+        return datetime.date.fromisoformat(value).isoformat()
+    except (TypeError, ValueError):
+        raise ValueError(f'{field} must be a YYYY-MM-DD date') from None
+
+def _op_text(field, value):
+    if not isinstance(value, str):
+        raise ValueError(f'{field} must be a string')
+    return value
+
+def _op_flag(field, value):
+    if value not in (True, False):  # also 1 and 0
+        raise ValueError(f'{field} must be true or false')
+    return value
+
+BATCH_FIELDS = {'id': _op_id, 'date': _op_date, 'goal_date': _op_date, 'title': _op_text, 'goal_title': _op_text,
+                'completed': _op_flag, 'done': _op_flag, 'checked': _op_flag}
+
+def check_batch_op(op):
+    """(handler, op with its fields converted) for one /api/batch op; ValueError if malformed"""
+    handler = BATCH_HANDLERS.get((op.get('type'), op.get('op'))) if isinstance(op, dict) else None
+    if handler is None:
+        raise ValueError('Unknown operation')
+    if op['op'] != 'add' and op.get('id') is None:
+        raise ValueError('id is required')
+    return handler, {**op, **{field: convert(field, op[field]) for field, convert in BATCH_FIELDS.items()
+                              if op.get(field) is not None}}
+
+def _row_date(row, column):
+    if row is None:
+        raise ValueError('Not found')
+    return row[column]
+
+def _batch_task_add(db, uid, op):
+    title = (op.get('title') or '').strip()
+    if not title or not op.get('date'):
+        raise ValueError('title and date are required')
+    cur = db.execute('INSERT INTO tasks (user_id, title, task_date) VALUES (?, ?, ?)', (uid, title, op['date']))
+    return {'id': cur.lastrowid}, op['date']
+
+def _batch_task_toggle(db, uid, op):
+    row = db.execute('UPDATE tasks SET is_completed=? WHERE id=? AND user_id=? RETURNING task_date',
+                     (_flag(op.get('completed')), op['id'], uid)).fetchone()
+    return {}, _row_date(row, 'task_date')
+
+def _batch_task_edit(db, uid, op):
+    title = (op.get('title') or '').strip()
+    if not title:
+        raise ValueError('title is required')
+    row = db.execute('UPDATE tasks SET title=? WHERE id=? AND user_id=? RETURNING task_date',
+                     (title, op['id'], uid)).fetchone()
+    return {}, _row_date(row, 'task_date')
+
+def _batch_task_delete(db, uid, op):
+    row = db.execute('DELETE FROM tasks WHERE id=? AND user_id=? RETURNING task_date', (op['id'], uid)).fetchone()
+    return {}, _row_date(row, 'task_date')
+
+def _batch_reminder_add(db, uid, op):
+    title = (op.get('title') or '').strip()
+    if not title:
+        raise ValueError('title is required')
+    cur = db.execute('INSERT INTO reminders (user_id, title, reminder_date) VALUES (?, ?, ?)', (uid, title, op.get('date')))
+    return {'id': cur.lastrowid}, op.get('date')
+
+def _batch_reminder_toggle(db, uid, op):
+    row = db.execute('UPDATE reminders SET is_done=? WHERE id=? AND user_id=? RETURNING reminder_date',
+                     (_flag(op.get('done')), op['id'], uid)).fetchone()
+    return {}, _row_date(row, 'reminder_date')
+
+def _batch_reminder_edit(db, uid, op):
+    title = (op.get('title') or '').strip()
+    if not title:
+        raise ValueError('title is required')
+    row = db.execute('UPDATE reminders SET title=? WHERE id=? AND user_id=? RETURNING reminder_date',
+                     (title, op['id'], uid)).fetchone()
+    return {}, _row_date(row, 'reminder_date')
+
+def _batch_reminder_delete(db, uid, op):
+    row = db.execute('DELETE FROM reminders WHERE id=? AND user_id=? RETURNING reminder_date', (op['id'], uid)).fetchone()
+    return {}, _row_date(row, 'reminder_date')
+
+def _batch_goal_add(db, uid, op):
+    title = (op.get('goal_title') or '').strip()
+    if not title or not op.get('goal_date'):
+        raise ValueError('goal_title and goal_date are required')
+    cur = db.execute('INSERT INTO physical_goals (user_id, goal_title, goal_date) VALUES (?, ?, ?)',
+                     (uid, title, op['goal_date']))
+    return {'id': cur.lastrowid}, op['goal_date']
+
+def _batch_goal_toggle(db, uid, op):
+    row = db.execute('UPDATE physical_goals SET completed_count=? WHERE id=? AND user_id=? RETURNING goal_date',
+                     (_flag(op.get('completed')), op['id'], uid)).fetchone()
+    return {}, _row_date(row, 'goal_date')
+
+def _batch_goal_edit(db, uid, op):
+    title = (op.get('goal_title') or '').strip()
+    if not title:
+        raise ValueError('goal_title is required')
+    row = db.execute('UPDATE physical_goals SET goal_title=?, updated_at=CURRENT_TIMESTAMP WHERE id=? AND user_id=? '
+                     'RETURNING goal_date', (title, op['id'], uid)).fetchone()
+    return {}, _row_date(row, 'goal_date')
+
+def _batch_goal_delete(db, uid, op):
+    row = db.execute('DELETE FROM physical_goals WHERE id=? AND user_id=? RETURNING goal_date', (op['id'], uid)).fetchone()
+    return {}, _row_date(row, 'goal_date')
+
+def _batch_checklist_toggle(db, uid, op):
+    row = db.execute('UPDATE nutrition_checklist SET is_checked=? WHERE id=? AND user_id=? RETURNING entry_date',
+                     (_flag(op.get('checked')), op['id'], uid)).fetchone()
+    return {}, _row_date(row, 'entry_date')
+
+def _batch_profession_task_add(db, uid, op):
+    title = (op.get('title') or '').strip()
+    if not title:
+        raise ValueError('title is required')
+    task_date = op.get('date') or datetime.date.today().isoformat()
+    cur = db.execute('INSERT INTO profession_tasks (user_id, title, task_date) VALUES (?, ?, ?)', (uid, title, task_date))
+    return {'id': cur.lastrowid}, task_date
+
+def _batch_profession_task_toggle(db, uid, op):
+    row = db.execute('UPDATE profession_tasks SET is_completed=? WHERE id=? AND user_id=? RETURNING task_date',
+                     (_flag(op.get('completed')), op['id'], uid)).fetchone()
+    return {}, _row_date(row, 'task_date')
+
+def _batch_profession_task_edit(db, uid, op):
+    title = (op.get('title') or '').strip()
+    if not title:
+        raise ValueError('title is required')
+    row = db.execute('UPDATE profession_tasks SET title=? WHERE id=? AND user_id=? RETURNING task_date',
+                     (title, op['id'], uid)).fetchone()
+    return {}, _row_date(row, 'task_date')
+
+def _batch_profession_task_delete(db, uid, op):
+    row = db.execute('DELETE FROM profession_tasks WHERE id=? AND user_id=? RETURNING task_date', (op['id'], uid)).fetchone()
+    return {}, _row_date(row, 'task_date')
+
+BATCH_HANDLERS = {
+    ('task', 'add'): _batch_task_add,
+    ('task', 'toggle'): _batch_task_toggle,
+    ('task', 'edit'): _batch_task_edit,
+    ('task', 'delete'): _batch_task_delete,
+    ('reminder', 'add'): _batch_reminder_add,
+    ('reminder', 'toggle'): _batch_reminder_toggle,
+    ('reminder', 'edit'): _batch_reminder_edit,
+    ('reminder', 'delete'): _batch_reminder_delete,
+    ('goal', 'add'): _batch_goal_add,
+    ('goal', 'toggle'): _batch_goal_toggle,
+    ('goal', 'edit'): _batch_goal_edit,
+    ('goal', 'delete'): _batch_goal_delete,
+    ('checklist', 'toggle'): _batch_checklist_toggle,
+    ('profession_task', 'add'): _batch_profession_task_add,
+    ('profession_task', 'toggle'): _batch_profession_task_toggle,
+    ('profession_task', 'edit'): _batch_profession_task_edit,
+    ('profession_task', 'delete'): _batch_profession_task_delete,
+}
+
+
+@bp.route('/api/batch', methods=['POST'])
+@login_required
+def batch_mutations():
+    """Apply an ordered list of operations in one transaction.
+
+    Body: {"ops": [{"type": "task", "op": "toggle", "id": 3, "completed": true}, ...]}
+    Every op is checked before any runs; a malformed or failing op gets an
+    error entry in `results` and the others still apply. Each affected day
+    is recalculated once at the end.
+    """
+    data = request.json or {}
+    ops = data.get('ops')
+    if not isinstance(ops, list) or not ops:
+        return jsonify({'status': 'error', 'message': 'ops must be a non-empty list'}), 400
+    if len(ops) > current_app.config['BATCH_MAX_OPS']:
+        return jsonify({'status': 'error', 'message': f"at most {current_app.config['BATCH_MAX_OPS']} ops per batch"}), 400
+
+    planned = []
+    for op in ops:
+        try:
+            planned.append(check_batch_op(op))
+        except ValueError as e:
+            planned.append((None, str(e)))
+
+    db = get_db()
+    uid = session['user_id']
+    results = []
+    affected = {}
+    try:
+        for handler, op in planned:
+            if handler is None:
+                results.append({'status': 'error', 'message': op})
+                continue
+            try:
+                result, date_str = handler(db, uid, op)
+            except (KeyError, ValueError) as e:
+                results.append({'status': 'error', 'message': str(e) or 'Invalid operation'})
+                continue
+            if date_str:
+                affected[date_str] = None
+            results.append(dict(result, status='success'))
+
+        for date_str in affected:
+            affected[date_str] = recalculate_daily_activity(db, uid, date_str, commit=False)
+        db.commit()
+    except sqlite3.Error as e:
+        db.rollback()
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+    for date_str in affected:
+        calendar_cache.invalidate(uid, date_str)
+    return jsonify({'status': 'success', 'results': results, 'days': affected})
+
 # ── Calendar & Daily Tracking API ────────────────────────────────────────────
-@app.route('/api/calendar/month', methods=['GET'])
+@bp.route('/api/calendar/month', methods=['GET'])
 @login_required
 def get_calendar_month():
     """Get all daily activities and reminders for a month"""
     year = request.args.get('year', datetime.date.today().year, type=int)
     month = request.args.get('month', datetime.date.today().month, type=int)
-    db = get_db()
+    if not 1 <= month <= 12 or not 1 <= year <= 9999:
+        return jsonify({'status': 'error'}), 400
     uid = session['user_id']
-    
-    activities = db.execute(
-        'SELECT * FROM daily_activity WHERE user_id = ? AND entry_date LIKE ?',
-        (uid, f'{year:04d}-{month:02d}-%')
-    ).fetchall()
-    
-    goals = db.execute(
-        'SELECT goal_date, COUNT(*) as count FROM physical_goals WHERE user_id = ? AND goal_date LIKE ? GROUP BY goal_date',
-        (uid, f'{year:04d}-{month:02d}-%')
-    ).fetchall()
-    
-    prof_tasks_dates = db.execute(
-        'SELECT task_date, COUNT(*) as count FROM profession_tasks WHERE user_id = ? AND task_date LIKE ? GROUP BY task_date',
-        (uid, f'{year:04d}-{month:02d}-%')
-    ).fetchall()
-    
-    reminders = db.execute(
-        'SELECT reminder_date, COUNT(*) as count FROM reminders WHERE user_id = ? AND reminder_date LIKE ? GROUP BY reminder_date',
-        (uid, f'{year:04d}-{month:02d}-%')
-    ).fetchall()
-    
-    activity_map = {}
-    
-    # Process all dates that have ANYTHING
-    all_dates = set([a['entry_date'] for a in activities] + 
-                    [g['goal_date'] for g in goals] + 
-                    [r['reminder_date'] for r in reminders] +
-                    [p['task_date'] for p in prof_tasks_dates if p['task_date']])
-    
-    today_for_month = datetime.date.today()
-
-    for date_str in all_dates:
-        act = next((dict(a) for a in activities if a['entry_date'] == date_str), None)
-        has_goals = any(g['goal_date'] == date_str for g in goals)
-        has_reminders = any(r['reminder_date'] == date_str for r in reminders)
-        
-        if not act and (has_goals or has_reminders):
-            # Only recalculate if it's today or future; for past, don't create phantom records
-            try:
-                date_obj = datetime.date.fromisoformat(date_str)
-            except Exception:
-                date_obj = None
-            if date_obj and date_obj >= today_for_month:
-                stats = recalculate_daily_activity(db, uid, date_str)
-                act = {'physical_completion_pct': stats['phys_pct'], 'profession_completion_pct': stats['prof_pct'], 'total_points': stats['phys_done'] + stats['prof_done']}
-            else:
-                act = {'physical_completion_pct': 0, 'total_points': 0}
-        
-        if not act:
-            act = {'physical_completion_pct': 0, 'total_points': 0}
-            
-        activity_map[date_str] = act
-        if has_goals: activity_map[date_str]['has_goals'] = True
-        if has_reminders: activity_map[date_str]['has_reminders'] = True
-        
-        # Calculate overall score for the day
-        phys_pct = act.get('physical_completion_pct', 0)
-        day_prof_pct = act.get('profession_completion_pct', 0)
-        activity_map[date_str]['overall_score'] = round((phys_pct + day_prof_pct) / 2)
-        
-        # Keyword extraction (Prioritize day_note)
-        if act and act.get('day_note'):
-            activity_map[date_str]['keyword'] = act['day_note'][:15]
-        elif has_reminders or has_goals:
-            rem_title = db.execute('SELECT title FROM reminders WHERE user_id=? AND reminder_date=?', (uid, date_str)).fetchone()
-            goal_title = db.execute('SELECT goal_title FROM physical_goals WHERE user_id=? AND goal_date=?', (uid, date_str)).fetchone()
-            keyword = (rem_title['title'] if rem_title else goal_title['goal_title'] if goal_title else "").split()[0][:10]
-            activity_map[date_str]['keyword'] = keyword
-        
-        if act and act.get('day_note'):
-            activity_map[date_str]['day_note'] = act['day_note']
-
-    return jsonify(activity_map)
+    return cached_json(CalendarCache.month_key(uid, year, month),
+                       lambda: calendar_month_summary(get_db(), uid, year, month))
 
-@app.route('/api/activity/note/update', methods=['POST'])
+@bp.route('/api/activity/note/update', methods=['POST'])
 @login_required
 def update_day_note():
     """Update the persistent note for a specific date"""
@@ -778,40 +1219,45 @@ def update_day_note():
     db = get_db()
     uid = session['user_id']
     
-    existing = db.execute('SELECT id FROM daily_activity WHERE user_id=? AND entry_date=?', (uid, date_str)).fetchone()
-    if existing:
-        db.execute('UPDATE daily_activity SET day_note=? WHERE id=?', (note, existing['id']))
-    else:
-        db.execute('INSERT INTO daily_activity (user_id, entry_date, day_note) VALUES (?, ?, ?)',
-                   (uid, date_str, note))
+    cur = db.execute('UPDATE daily_activity SET day_note=? WHERE user_id=? AND entry_date=?', (note, uid, date_str))
+    if cur.rowcount == 0:
+        # Seed the counters too so later deltas start from the right base
+        recalculate_daily_activity(db, uid, date_str, commit=False)
+        db.execute('UPDATE daily_activity SET day_note=? WHERE user_id=? AND entry_date=?', (note, uid, date_str))
     db.commit()
+    calendar_cache.invalidate(uid, date_str)
     return jsonify({'status': 'success'})
 
-@app.route('/api/calendar/day', methods=['GET'])
+@bp.route('/api/calendar/day', methods=['GET'])
 @login_required
 def get_calendar_day():
-    """Get activities and tasks for a specific date"""
-    date = request.args.get('date')
-    if not date:
-        return jsonify({'status': 'error'}), 400
-    
-    db = get_db()
+    """A date's daily_activity row with its task and reminder rows.
+
+    ?fields= returns that projection of the day view instead, as
+    /api/date-view does.
+    """
+    try:
+        date = _parse_dates(request.args.get('date'))[0]
+        fields = parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
     uid = session['user_id']
-    
-    activity = db.execute(
-        'SELECT * FROM daily_activity WHERE user_id = ? AND entry_date = ?', (uid, date)
-    ).fetchone()
-    
-    tasks = db.execute(
-        'SELECT * FROM tasks WHERE user_id = ? AND task_date = ?', (uid, date)
-    ).fetchall()
-    
+    if fields is not None:
+        return etag_json(day_views(uid, [date], fields)[date])
+
+    db = get_db()
+    activity = db.execute('SELECT * FROM daily_activity WHERE user_id = ? AND entry_date = ?', (uid, date)).fetchone()
+    tasks = db.execute('SELECT * FROM tasks WHERE user_id = ? AND task_date = ? ORDER BY id', (uid, date)).fetchall()
+    reminders = db.execute('SELECT * FROM reminders WHERE user_id = ? AND reminder_date = ? ORDER BY id',
+                           (uid, date)).fetchall()
     return jsonify({
         'activity': dict(activity) if activity else None,
-        'tasks': [dict(t) for t in tasks]
+        'tasks': [dict(t) for t in tasks],
+        'reminders': [dict(r) for r in reminders],
     })
 
-@app.route('/api/task/update-points', methods=['POST'])
+@bp.route('/api/task/update-points', methods=['POST'])
 @login_required
 def update_task_points():
     """Update daily activity points when task is toggled"""
@@ -820,39 +1266,12 @@ def update_task_points():
     db = get_db()
     uid = session['user_id']
     
-    # Calculate current completion percentage for the day
-    tasks = db.execute(
-        'SELECT * FROM tasks WHERE user_id = ? AND task_date = ?', (uid, task_date)
-    ).fetchall()
-    
-    total = len(tasks)
-    done = sum(1 for t in tasks if t['is_completed'])
-    pct = round((done / total * 100) if total else 0)
-    
-    # Points: 1 point per completed task
-    physical_points = done
-    
-    # Update or create daily activity record
-    existing = db.execute(
-        'SELECT * FROM daily_activity WHERE user_id = ? AND entry_date = ?',
-        (uid, task_date)
-    ).fetchone()
-    
-    if existing:
-        db.execute(
-            'UPDATE daily_activity SET physical_completion_pct=?, physical_points=?, total_points=physical_points+profession_points WHERE user_id=? AND entry_date=?',
-            (pct, physical_points, uid, task_date)
-        )
-    else:
-        db.execute(
-            'INSERT INTO daily_activity (user_id, entry_date, physical_completion_pct, physical_points, total_points) VALUES (?, ?, ?, ?, ?)',
-            (uid, task_date, pct, physical_points, physical_points)
-        )
-    
-    db.commit()
-    return jsonify({'status': 'success', 'pct': pct, 'points': physical_points})
+    # Keep the stored counters consistent with every other writer
+    stats = recalculate_daily_activity(db, uid, task_date)
+    calendar_cache.invalidate(uid, task_date)
+    return jsonify({'status': 'success', 'pct': stats['phys_pct'], 'points': stats['phys_done']})
 
-@app.route('/api/check-edit-allowed', methods=['GET'])
+@bp.route('/api/check-edit-allowed', methods=['GET'])
 @login_required
 def check_edit_allowed():
     """Check if user can edit tasks for a date"""
@@ -875,77 +1294,65 @@ def check_edit_allowed():
         'is_future': target_date > today
     })
 
-@app.route('/api/date-view', methods=['GET'])
+@bp.route('/api/date-view', methods=['GET'])
 @login_required
 def get_date_view():
-    """Get overview, physical, and profession data for a specific date (LIVE version)"""
-    date_str = request.args.get('date')
-    if not date_str:
-        return jsonify({'status': 'error'}), 400
-    
-    db = get_db()
+    """Day view for ?date= or, keyed by date, for ?dates=a,b,c; ?fields= limits the sections"""
+    try:
+        fields = parse_fields(request.args.get('fields'))
+        multi = 'dates' in request.args
+        dates = _parse_dates(request.args.get('dates') if multi else request.args.get('date'))
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
     uid = session['user_id']
-    
-    # Get user info
-    user = db.execute('SELECT * FROM users WHERE id = ?', (uid,)).fetchone()
-    
-    # Calculate Profession stats live (filtered by date)
-    prof_tasks = db.execute('SELECT * FROM profession_tasks WHERE user_id = ? AND task_date = ?', (uid, date_str)).fetchall()
-    prof_total = len(prof_tasks)
-    prof_done = sum(1 for t in prof_tasks if t['is_completed'])
-    prof_pct = round((prof_done / prof_total * 100) if prof_total else 0)
-    
-    # Calculate Physical stats live
-    manual_tasks = db.execute('SELECT * FROM tasks WHERE user_id = ? AND task_date = ?', (uid, date_str)).fetchall()
-    checklist = db.execute('SELECT * FROM nutrition_checklist WHERE user_id = ? AND entry_date = ?', (uid, date_str)).fetchall()
-    reminders = db.execute('SELECT * FROM reminders WHERE user_id = ? AND reminder_date = ?', (uid, date_str)).fetchall()
-    goals = db.execute('SELECT * FROM physical_goals WHERE user_id = ? AND goal_date = ?', (uid, date_str)).fetchall()
-    
-    phys_total = len(manual_tasks) + len(checklist) + len(reminders) + sum(g['total_count'] for g in goals)
-    phys_done = sum(1 for t in manual_tasks if t['is_completed']) + sum(1 for c in checklist if c['is_checked']) + sum(1 for r in reminders if r['is_done']) + sum(g['completed_count'] for g in goals)
-    phys_pct = round((phys_done / phys_total * 100) if phys_total else 0)
-    
-    # Get day note
-    act_row = db.execute('SELECT day_note FROM daily_activity WHERE user_id=? AND entry_date=?', (uid, date_str)).fetchone()
-    day_note = act_row['day_note'] if act_row else None
-    
-    combined = round((phys_pct + prof_pct) / 2)
+    if not multi and fields is None:
+        date_str = dates[0]
+        return cached_json(CalendarCache.day_key(uid, date_str), lambda: date_view_payload(get_db(), uid, date_str))
+    views = day_views(uid, dates, fields)
+    return etag_json({'status': 'success', 'days': views} if multi else views[dates[0]])
+
+def _parse_dates(value):
+    """Comma-separated ISO dates -> normalized, de-duplicated list (ValueError if bad or too many)"""
+    dates = []
+    for part in (value or '').split(','):
+        try:
+            day = datetime.date.fromisoformat(part.strip()).isoformat()
+        except ValueError:
+            raise ValueError(f'Bad date {part!r}')
+        if day not in dates:
+            dates.append(day)
+    if len(dates) > DAY_VIEW_MAX_DATES:
+        raise ValueError(f'At most {DAY_VIEW_MAX_DATES} dates per request')
+    return dates
+
+def day_views(uid, dates, fields=None):
+    """{date: day view}; full views are served from and stored in calendar_cache,
+    projections are cut from a cached full view or built on their own"""
+    views, missing, versions = {}, [], {}
+    for date_str in dates:
+        if date_str[:7] not in versions:
+            versions[date_str[:7]] = data_version(uid, date_str[:7])
+        entry = calendar_cache.get(CalendarCache.day_key(uid, date_str), versions[date_str[:7]])
+        if entry is not None:
+            views[date_str] = project(entry['payload'], fields)
+        else:
+            missing.append(date_str)
+    if missing:
+        db = get_db()
+        profile = load_profile(uid, db)['user'] if fields is None or 'user' in fields else None
+        for date_str, view in build_day_views(db, uid, missing, fields, profile).items():
+            if fields is None:
+                calendar_cache.put(CalendarCache.day_key(uid, date_str), view, versions[date_str[:7]])
+            views[date_str] = view
+    return {d: views[d] for d in dates}
 
-    return jsonify({
-        'date': date_str,
-        'not_initiated': False,
-        'combined': combined,
-        'overview': {
-            'physical_completion_pct': phys_pct,
-            'profession_completion_pct': prof_pct,
-            'day_note': day_note
-        },
-        'physical': {
-            'percentage': phys_pct,
-            'phys_done': phys_done,
-            'phys_total': phys_total,
-            'checklist': [dict(c) for c in checklist],
-            'goals': [dict(g) for g in goals],
-            'reminders': [dict(r) for r in reminders],
-            'tasks_list': [dict(t) for t in manual_tasks] 
-        },
-        'profession': {
-            'tasks_total': prof_total,
-            'tasks_done': prof_done,
-            'percentage': prof_pct,
-            'tasks_list': [dict(t) for t in prof_tasks]
-        },
-        'user': {
-            'height': user['height'],
-            'weight': user['weight'],
-            'blood_group': user['blood_group'],
-            'bmi': user['bmi']
-        }
-    })
+def date_view_payload(db, uid, date_str):
+    return build_day_views(db, uid, [date_str], profile=load_profile(uid, db)['user'])[date_str]
 
 # Cleanup complete
 
-@app.route('/api/physical-activities', methods=['GET'])
+@bp.route('/api/physical-activities', methods=['GET'])
 @login_required
 def get_physical_activities():
     """Get list of suggested physical activities"""
@@ -953,7 +1360,7 @@ def get_physical_activities():
     activities = db.execute('SELECT * FROM physical_activities ORDER BY activity_category').fetchall()
     return jsonify([dict(a) for a in activities])
 
-@app.route('/api/physical-activities/init', methods=['GET'])
+@bp.route('/api/physical-activities/init', methods=['GET'])
 @login_required
 def init_physical_activities():
     """Initialize default physical activities if not already present"""
@@ -989,7 +1396,7 @@ def init_physical_activities():
         return jsonify({'status': 'error', 'message': str(e)}), 400
 
 
-@app.route('/api/nutrition-progress/update', methods=['POST'])
+@bp.route('/api/nutrition-progress/update', methods=['POST'])
 @login_required
 def update_nutrition_progress():
     """Update nutrition progress for individual items"""
@@ -1030,7 +1437,7 @@ def update_nutrition_progress():
     db.commit()
     return jsonify({'status': 'success', 'progress': progress})
 
-@app.route('/api/profile/update', methods=['POST'])
+@bp.route('/api/profile/update', methods=['POST'])
 @login_required
 def update_user_profile():
     """Update user profile from overview page"""
@@ -1057,6 +1464,8 @@ def update_user_profile():
         (height, weight, blood_group, bmi, uid)
     )
     db.commit()
+    invalidate_profile(uid)
+    calendar_cache.invalidate_user(uid)
     
     return jsonify({
         'status': 'success',
@@ -1064,19 +1473,171 @@ def update_user_profile():
         'bmi_status': get_bmi_status(bmi) if bmi else None
     })
 
-def get_bmi_status(bmi):
-    """Get BMI status: Underweight, Normal, Overweight, Obese"""
-    if bmi < 18.5:
-        return {'status': 'Underweight', 'color': '#3b82f6', 'recommendation': 'Increase caloric intake'}
-    elif bmi < 25:
-        return {'status': 'Normal', 'color': '#10b981', 'recommendation': 'Maintain current diet and exercise'}
-    elif bmi < 30:
-        return {'status': 'Overweight', 'color': '#f59e0b', 'recommendation': 'Reduce caloric intake, increase exercise'}
-    else:
-        return {'status': 'Obese', 'color': '#ef4444', 'recommendation': 'Consult healthcare provider'}
+# ── Analytics ─────────────────────────────────────────────────────────────────
+@bp.route('/api/analytics', methods=['GET'])
+@login_required
+def analytics_overview():
+    """Streaks, today's 7/30/90-day moving averages and weekday patterns"""
+    db = get_db()
+    payload = analytics_summary(db, session['user_id'], datetime.date.today().isoformat())
+    return etag_json({'status': 'success', **payload})
+
+@bp.route('/api/analytics/trend', methods=['GET'])
+@login_required
+def analytics_trend_series():
+    """Daily completion with moving averages: ?days=90 (max 366) ending at ?end= (default today)"""
+    try:
+        days = int(request.args.get('days', 90))
+        end = datetime.date.fromisoformat(request.args.get('end') or datetime.date.today().isoformat()).isoformat()
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'Invalid days or end'}), 400
+    if not 1 <= days <= TREND_MAX_DAYS:
+        return jsonify({'status': 'error', 'message': f'days must be 1..{TREND_MAX_DAYS}'}), 400
+    return etag_json({'status': 'success', 'days': analytics_trend(get_db(), session['user_id'], end, days)})
+
+@bp.route('/api/analytics/rollup', methods=['GET'])
+@login_required
+def analytics_rollup_series():
+    """Week/month/year totals: ?period=week|month|year over ?from=..?to= (default this year)"""
+    period = request.args.get('period', 'month')
+    if period not in ROLLUP_PERIODS:
+        return jsonify({'status': 'error', 'message': f"period must be one of {', '.join(ROLLUP_PERIODS)}"}), 400
+    year = datetime.date.today().year
+    try:
+        first = datetime.date.fromisoformat(request.args.get('from') or f'{year}-01-01').isoformat()
+        last = datetime.date.fromisoformat(request.args.get('to') or f'{year}-12-31').isoformat()
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'Invalid from or to'}), 400
+    if first > last:
+        return jsonify({'status': 'error', 'message': 'from must not be after to'}), 400
+    rows = analytics_rollup(get_db(), session['user_id'], period, first, last)
+    return etag_json({'status': 'success', 'period': period, 'rows': rows})
+
+# ── Export ────────────────────────────────────────────────────────────────────
+@bp.route('/api/export', methods=['GET'])
+@login_required
+def export_history():
+    """Stream the user's rows: ?format=ndjson|csv&tables=&since=&until= (CSV takes one table).
+
+    Gzipped when the client accepts it, unless ?gzip=0.
+    """
+    from export import EXPORT_TABLES, FORMATS as EXPORT_FORMATS, parse_tables, ndjson_chunks, csv_chunks, \
+        snapshot, encode
+    fmt = request.args.get('format', 'ndjson')
+    since, until = request.args.get('since'), request.args.get('until')
+    try:
+        tables = parse_tables(request.args.get('tables'))
+        for value in (since, until):
+            if value:
+                datetime.date.fromisoformat(value)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'status': 'error', 'message': f"format must be one of {', '.join(EXPORT_FORMATS)}"}), 400
+    if fmt == 'csv' and len(tables) != 1:
+        return jsonify({'status': 'error', 'message': f"CSV exports one table: tables={'|'.join(EXPORT_TABLES)}"}), 400
+
+    uid = session['user_id']
+    config = current_app.config
+    compress = request.args.get('gzip') != '0' and 'gzip' in request.accept_encodings
 
+    def generate():
+        # Its own connection: the stream outlives the request's pooled one
+        db = traced(connect(config['DATABASE'], config, check_same_thread=False), config)
+        try:
+            if fmt == 'csv':
+                chunks = csv_chunks(db, uid, tables[0], since, until)
+            else:
+                chunks = ndjson_chunks(db, uid, tables, since, until)
+            yield from encode(snapshot(db, chunks), compress)
+        finally:
+            db.close()
+
+    filename = f"neri-{tables[0] if fmt == 'csv' else 'export'}-{datetime.date.today().isoformat()}.{fmt}"
+    resp = current_app.response_class(generate(), mimetype='text/csv' if fmt == 'csv' else 'application/x-ndjson')
+    resp.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    resp.headers['Cache-Control'] = 'no-store'
+    resp.headers['Vary'] = 'Accept-Encoding'
+    if compress:
+        resp.headers['Content-Encoding'] = 'gzip'
+    return resp
+
+# ── Import ────────────────────────────────────────────────────────────────────
+def import_jobs_for(app):
+    """The app's import queue, created (and importer loaded) by the first import"""
+    services = app.extensions['neri']
+    with services['import_jobs_lock']:
+        if services['import_jobs'] is None:
+            from importer import ImportJobs
+            calendar, config = services['calendar_cache'], app.config  # app may be the current_app proxy
+            services['import_jobs'] = ImportJobs(lambda: traced(services['open_db'](), config),
+                                                 on_done=calendar.invalidate_user)
+    return services['import_jobs']
+
+@bp.route('/api/import', methods=['POST'])
+@login_required
+def import_history():
+    """Queue an import: the body (or a multipart `file`) in export format, ?format=ndjson|csv&table=.
+
+    Answers 202 with the job; poll /api/import/<job id> for progress.
+    """
+    import tempfile
+    from importer import IMPORT_TABLES, FORMATS as IMPORT_FORMATS
+    fmt = request.args.get('format', 'ndjson')
+    table = request.args.get('table')
+    if fmt not in IMPORT_FORMATS:
+        return jsonify({'status': 'error', 'message': f"format must be one of {', '.join(IMPORT_FORMATS)}"}), 400
+    if fmt == 'csv' and table not in IMPORT_TABLES:
+        return jsonify({'status': 'error', 'message': f"CSV imports one table: table={'|'.join(IMPORT_TABLES)}"}), 400
+    limit = current_app.config['IMPORT_MAX_BYTES']
+    if (request.content_length or 0) > limit:
+        return jsonify({'status': 'error', 'message': f'Import is larger than {limit} bytes'}), 413
+
+    source = request.files['file'].stream if 'file' in request.files else request.stream
+    fd, path = tempfile.mkstemp(prefix='neri_import_')
+    size = 0
+    with os.fdopen(fd, 'wb') as f:
+        while True:
+            chunk = source.read(64 * 1024)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > limit:
+                f.close()
+                os.remove(path)
+                return jsonify({'status': 'error', 'message': f'Import is larger than {limit} bytes'}), 413
+            f.write(chunk)
+    job = import_jobs_for(current_app).submit(session['user_id'], path, fmt, table if fmt == 'csv' else None, size)
+    return jsonify({'status': 'success', 'job': job, 'status_url': url_for('.import_status', job_id=job['id'])}), 202
+
+@bp.route('/api/import/<job_id>', methods=['GET'])
+@login_required
+def import_status(job_id):
+    jobs = current_app.extensions['neri']['import_jobs']
+    job = jobs.get(job_id) if jobs is not None else None
+    if job is None or job['user_id'] != session['user_id']:
+        return jsonify({'status': 'error', 'message': 'Job not found'}), 404
+    return jsonify({'status': 'success', 'job': job})
+
+# ── Performance report ────────────────────────────────────────────────────────
+@bp.route('/debug/perf', methods=['GET'])
+@login_required
+def debug_perf():
+    """Per-route SQL aggregates since startup (?reset=1 clears them after reading)"""
+    user = current_user()
+    if not user or user['username'] not in current_app.config['ADMIN_USERNAMES']:
+        return jsonify({'status': 'error', 'message': 'Admins only'}), 403
+    payload = {
+        'status': 'success',
+        'enabled': current_app.config['SQL_PERF'],
+        'slow_query_ms': current_app.config['SLOW_QUERY_MS'],
+        'routes': perf_registry.snapshot(),
+        'slow_queries': list(perf_registry.slow),
+    }
+    if request.args.get('reset') == '1':
+        perf_registry.clear()
+    return jsonify(payload)
 
 
 if __name__ == '__main__':
-    run_schema()
-    app.run(debug=True)
+    create_app().run(debug=True)
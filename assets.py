@@ -0,0 +1,141 @@
+"""Static asset bundles: minify, content-hash and precompress for production.
+
+    python assets.py [--static static] [--no-minify] [--clean]
+
+Each bundle in BUNDLES is its source files concatenated in order. The
+build writes static/dist/<name>.<hash>.<ext> plus .gz and .br siblings
+and static/dist/manifest.json mapping bundle name -> built file;
+app.py's asset_url() reads the manifest and serves the built files with
+a one-year immutable Cache-Control. Without a manifest (a checkout that
+was never built) asset_url() points at the unminified bundle, assembled
+per request and revalidated every time.
+
+Minification uses rjsmin / rcssmin and Brotli uses the brotli package
+when they are installed; without them bundles are only concatenated and
+gzipped.
+"""
+import os
+import sys
+import json
+import gzip
+import hashlib
+import argparse
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+DIST = 'dist'
+MANIFEST = 'manifest.json'
+
+# bundle name -> source files under static/, concatenated in this order
+BUNDLES = {
+    'app.css': ['css/style.css'],
+    'app.js': ['js/datastore.js', 'js/script.js', 'js/flash.js'],
+    'auth.css': ['css/pages/auth.css'],
+    'auth.js': ['js/pages/auth.js'],
+    'overview.css': ['css/pages/overview.css'],
+    'overview.js': ['js/pages/overview.js'],
+    'physical.css': ['css/pages/physical.css'],
+    'physical.js': ['js/pages/physical.js'],
+    'profession.css': ['css/pages/profession.css'],
+    'profession.js': ['js/pages/profession.js'],
+}
+
+MIMETYPES = {'.js': 'text/javascript', '.css': 'text/css'}
+
+
+def bundle_text(name, static_dir=STATIC_DIR):
+    """The bundle's sources joined in order (unminified)"""
+    parts = []
+    for source in BUNDLES[name]:
+        with open(os.path.join(static_dir, source), encoding='utf-8') as f:
+            parts.append(f.read().rstrip())
+    # `;` keeps one script's last statement from running into the next one's first
+    return (';\n' if name.endswith('.js') else '\n').join(parts) + '\n'
+
+
+def minify(name, text):
+    """Minified text when the minifier for the bundle's type is installed, else text unchanged"""
+    try:
+        if name.endswith('.js'):
+            import rjsmin
+            return rjsmin.jsmin(text) + '\n'
+        import rcssmin
+        return rcssmin.cssmin(text) + '\n'
+    except ImportError:
+        return text
+
+
+def compressed(data):
+    """{suffix: bytes} of the precompressed siblings"""
+    out = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    try:
+        import brotli
+    except ImportError:
+        return out
+    out['.br'] = brotli.compress(data, quality=11)
+    return out
+
+
+def build(static_dir=STATIC_DIR, minified=True, clean=False, progress=print):
+    """Write every bundle, its siblings and the manifest; returns the manifest.
+
+    Earlier builds' files are kept for pages still cached with their URLs
+    unless clean is set.
+    """
+    out_dir = os.path.join(static_dir, DIST)
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = {}
+    for name in BUNDLES:
+        text = bundle_text(name, static_dir)
+        data = (minify(name, text) if minified else text).encode('utf-8')
+        stem, ext = os.path.splitext(name)
+        filename = f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+        with open(os.path.join(out_dir, filename), 'wb') as f:
+            f.write(data)
+        sizes = [f"{len(text.encode('utf-8'))} -> {len(data)} B"]
+        for suffix, body in compressed(data).items():
+            with open(os.path.join(out_dir, filename + suffix), 'wb') as f:
+                f.write(body)
+            sizes.append(f"{suffix[1:]} {len(body)} B")
+        manifest[name] = filename
+        progress(f"  {filename}: {', '.join(sizes)}")
+
+    if clean:
+        keep = set(manifest.values()) | {MANIFEST}
+        for entry in os.listdir(out_dir):
+            if entry.removesuffix('.gz').removesuffix('.br') not in keep:
+                os.remove(os.path.join(out_dir, entry))
+    # Written last, so a running app never points at a file that isn't there yet
+    tmp = os.path.join(out_dir, MANIFEST + '.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, os.path.join(out_dir, MANIFEST))
+    return manifest
+
+
+def load_manifest(static_dir=STATIC_DIR):
+    """The built manifest, or None when assets were never built"""
+    try:
+        with open(os.path.join(static_dir, DIST, MANIFEST)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build the minified, content-hashed static bundles.')
+    parser.add_argument('--static', default=STATIC_DIR, help='static directory (default: the app\'s)')
+    parser.add_argument('--no-minify', action='store_true', help='only concatenate, hash and compress')
+    parser.add_argument('--clean', action='store_true', help='delete files from earlier builds')
+    args = parser.parse_args(argv)
+
+    try:
+        manifest = build(args.static, minified=not args.no_minify, clean=args.clean)
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        return 1
+    print(f"Built {len(manifest)} bundle(s) into {os.path.join(args.static, DIST)}.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
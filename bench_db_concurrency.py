@@ -0,0 +1,135 @@
+"""Concurrent-writer load test: legacy per-request connections vs database.connect/ConnectionPool.
+
+Simulates the click-heavy toggle pattern (read row, update it, bump
+daily_activity, commit) from many threads while other threads read a
+day view, and reports "database is locked" errors and latency
+percentiles for each mode.
+
+    python bench_db_concurrency.py [--writers 16] [--readers 8] [--requests 200]
+"""
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import tempfile
+import threading
+import datetime
+
+from migrations import migrate_path
+from database import ConnectionPool
+
+DAY = datetime.date.today().isoformat()
+
+
+def seed(path, users, items):
+    migrate_path(path)
+    db = sqlite3.connect(path)
+    for uid in range(1, users + 1):
+        db.execute('INSERT INTO users (id, username, password_hash) VALUES (?, ?, ?)', (uid, f'bench{uid}', 'x'))
+        db.executemany('INSERT INTO nutrition_checklist (user_id, entry_date, item_label, item_type) VALUES (?, ?, ?, ?)',
+                       [(uid, DAY, f'item {i}', 'protein') for i in range(items)])
+        db.execute('INSERT INTO daily_activity (user_id, entry_date, physical_total_count) VALUES (?, ?, ?)',
+                   (uid, DAY, items))
+    db.commit()
+    db.close()
+
+
+def toggle(db, uid, item_id):
+    row = db.execute('SELECT is_checked FROM nutrition_checklist WHERE id=? AND user_id=?', (item_id, uid)).fetchone()
+    new = 0 if row[0] else 1
+    db.execute('UPDATE nutrition_checklist SET is_checked=? WHERE id=? AND user_id=?', (new, item_id, uid))
+    db.execute('UPDATE daily_activity SET physical_points = physical_points + ? WHERE user_id=? AND entry_date=?',
+               (1 if new else -1, uid, DAY))
+    db.commit()
+
+
+def read_day(db, uid):
+    db.execute('SELECT * FROM nutrition_checklist WHERE user_id=? AND entry_date=?', (uid, DAY)).fetchall()
+    db.execute('SELECT * FROM daily_activity WHERE user_id=? AND entry_date=?', (uid, DAY)).fetchone()
+
+
+def run(mode, path, args):
+    if mode == 'legacy':
+        # What database.get_db did before: a fresh default connection per
+        # request, rollback journal (seed() leaves the file in DELETE mode)
+        acquire = lambda: sqlite3.connect(path, timeout=args.legacy_timeout)
+        release = lambda db: db.close()
+    else:
+        pool = ConnectionPool(path, {'SQLITE_POOL_SIZE': args.writers + args.readers})
+        acquire, release = pool.acquire, pool.release
+
+    latencies = {'write': [], 'read': []}
+    errors = {'locked': 0, 'other': 0}
+    lock = threading.Lock()
+    items_per_user = args.items
+
+    def worker(kind, n):
+        local, local_err = [], {'locked': 0, 'other': 0}
+        for i in range(args.requests):
+            uid = (n + i) % args.users + 1
+            start = time.perf_counter()
+            db = acquire()
+            try:
+                if kind == 'write':
+                    toggle(db, uid, (uid - 1) * items_per_user + i % items_per_user + 1)
+                else:
+                    read_day(db, uid)
+            except sqlite3.OperationalError as e:
+                local_err['locked' if 'locked' in str(e) else 'other'] += 1
+                if db.in_transaction:
+                    db.rollback()
+            finally:
+                release(db)
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies[kind].extend(local)
+            for k in errors:
+                errors[k] += local_err[k]
+
+    threads = [threading.Thread(target=worker, args=('write', n)) for n in range(args.writers)]
+    threads += [threading.Thread(target=worker, args=('read', n)) for n in range(args.readers)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    if mode != 'legacy':
+        pool.close()
+    return latencies, errors, elapsed
+
+
+def pct(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writers', type=int, default=16)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=200, help='requests per thread')
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--items', type=int, default=17, help='checklist items per user')
+    parser.add_argument('--legacy-timeout', type=float, default=5.0,
+                        help='sqlite3.connect timeout for legacy mode (Python default is 5s)')
+    args = parser.parse_args()
+
+    print(f"{args.writers} writers, {args.readers} readers, {args.requests} requests each")
+    print(f"{'mode':<8} {'locked':>7} {'other':>6} {'req/s':>8} {'w p50':>8} {'w p99':>8} {'r p50':>8} {'r p99':>8}  (ms)")
+    for mode in ('legacy', 'tuned'):
+        path = os.path.join(tempfile.mkdtemp(prefix=f'neri_bench_{mode}_'), 'neri.db')
+        seed(path, args.users, args.items)
+        latencies, errors, elapsed = run(mode, path, args)
+        total = len(latencies['write']) + len(latencies['read'])
+        print(f"{mode:<8} {errors['locked']:>7} {errors['other']:>6} {total / elapsed:>8.0f} "
+              f"{pct(latencies['write'], 50):>8.2f} {pct(latencies['write'], 99):>8.2f} "
+              f"{pct(latencies['read'], 50):>8.2f} {pct(latencies['read'], 99):>8.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,401 @@
+"""Route benchmark: drive every route in app.py against a seeded database.
+
+Seeds a scratch database with --users users and --days days of history
+(--tasks, --checklist, --reminders, --goals and --profession rows per
+user per day), then sends --requests requests per thread to each route
+through the Flask test client, --threads clients at a time. Reports
+throughput, p50/p95/p99 latency and SQL statements per request for
+each endpoint.
+
+    python bench_routes.py [--users 50] [--days 90] [--threads 4] [--requests 50]
+    python bench_routes.py --save bench_baseline.json
+    python bench_routes.py --compare bench_baseline.json [--tolerance 0.25]
+
+--compare exits 1 when a route runs more queries per request than the
+baseline, or its p95 is more than --tolerance (and --min-ms) slower.
+Timings only compare across runs on the same machine with the same
+seed options; query counts compare anywhere.
+"""
+import os
+import sys
+import json
+import time
+import random
+import sqlite3
+import argparse
+import platform
+import tempfile
+import datetime
+import threading
+
+from migrations import migrate_path
+
+TODAY = datetime.date.today()
+PASSWORD = 'bench'
+
+# option -> (table, columns, row builder(rng, day, n)), seeded per user per day
+SEED_TABLES = {
+    'tasks': ('tasks', 'user_id, title, task_date, is_completed',
+              lambda rng, day, n: (f'Task {n}', day, rng.randint(0, 1))),
+    'checklist': ('nutrition_checklist', 'user_id, item_label, entry_date, item_type, is_checked',
+                  lambda rng, day, n: (f'Item {n}', day, rng.choice(('protein', 'fiber', 'water')), rng.randint(0, 1))),
+    'reminders': ('reminders', 'user_id, title, reminder_date, is_done',
+                  lambda rng, day, n: (f'Reminder {n}', day, rng.randint(0, 1))),
+    'goals': ('physical_goals', 'user_id, goal_title, goal_date, completed_count, total_count',
+              lambda rng, day, n: (f'Goal {n}', day, rng.randint(0, 3), 3)),
+    'profession': ('profession_tasks', 'user_id, title, task_date, is_completed, created_at',
+                   lambda rng, day, n: (f'Ticket {n}', day, rng.randint(0, 1), f'{day} 09:{n % 60:02d}:00')),
+}
+
+# (table, date column) of the rows the delete routes use up, one per request, dated today
+SPARE_TABLES = {'tasks': ('tasks', 'task_date'), 'goals': ('physical_goals', 'goal_date'),
+                'reminders': ('reminders', 'reminder_date'), 'profession': ('profession_tasks', 'task_date')}
+
+
+def _insert(db, table, columns, rows):
+    db.executemany(f"INSERT INTO {table} ({columns}) VALUES ({', '.join('?' * len(columns.split(',')))})", rows)
+
+
+def seed(path, args):
+    """Create the scratch database; returns the number of rows written"""
+    from werkzeug.security import generate_password_hash
+    from recalculate_all import rebuild
+
+    migrate_path(path)
+    db = sqlite3.connect(path)
+    db.row_factory = sqlite3.Row
+    rng = random.Random(args.seed)
+    password_hash = generate_password_hash(PASSWORD)
+    days = [(TODAY - datetime.timedelta(days=d)).isoformat() for d in range(args.days - 1, -1, -1)]
+    days += [(TODAY + datetime.timedelta(days=d)).isoformat() for d in range(1, args.future_days + 1)]
+    written = 0
+
+    db.executemany('INSERT INTO users (id, username, password_hash, height, weight, blood_group, bmi) '
+                   'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                   [(uid, f'bench{uid}', password_hash, 175, 70, 'O+', 22.9) for uid in range(1, args.users + 1)])
+    db.executemany('INSERT INTO profession_stats (user_id) VALUES (?)', [(uid,) for uid in range(1, args.users + 1)])
+    for uid in range(1, args.users + 1):
+        db.executemany('INSERT INTO daily_physical (user_id, entry_date, water_intake_liters) VALUES (?, ?, ?)',
+                       [(uid, day, round(rng.uniform(0, 3), 1)) for day in days])
+        written += len(days)
+        for option, (table, columns, build) in SEED_TABLES.items():
+            rows = [(uid, *build(rng, day, n)) for day in days for n in range(getattr(args, option))]
+            _insert(db, table, columns, rows)
+            written += len(rows)
+        if uid <= args.threads:
+            for option in SPARE_TABLES:
+                table, columns, build = SEED_TABLES[option]
+                _insert(db, table, columns, [(uid, *build(rng, TODAY.isoformat(), n)) for n in range(args.requests)])
+    db.commit()
+    rebuild(db, progress=lambda message: None)
+    db.close()
+    return written
+
+
+def user_context(path, uid, requests):
+    """Ids and dates a client's requests refer to"""
+    db = sqlite3.connect(path)
+    today = TODAY.isoformat()
+
+    def ids(table, date_col, limit):
+        return [r[0] for r in db.execute(f'SELECT id FROM {table} WHERE user_id = ? AND {date_col} = ? '
+                                         f'ORDER BY id DESC LIMIT ?', (uid, today, limit))]
+    ctx = {
+        'uid': uid,
+        'today': today,
+        'tomorrow': (TODAY + datetime.timedelta(days=1)).isoformat(),
+        'yesterday': (TODAY - datetime.timedelta(days=1)).isoformat(),
+        'week': ','.join((TODAY - datetime.timedelta(days=d)).isoformat() for d in range(7)),
+        'year': TODAY.year,
+        'month': TODAY.month,
+        'checklist': ids('nutrition_checklist', 'entry_date', 1) or [0],
+        # Newest rows first: the spares, which the delete routes use up
+        'spare': {option: ids(table, date_col, requests) for option, (table, date_col) in SPARE_TABLES.items()},
+    }
+    # Toggled rows: the oldest of today's, so they are never deleted
+    for option, (table, date_col) in SPARE_TABLES.items():
+        row = db.execute(f'SELECT MIN(id) FROM {table} WHERE user_id = ? AND {date_col} = ?', (uid, today)).fetchone()
+        ctx[option] = row[0] or 0
+    db.close()
+    return ctx
+
+
+def _spare(ctx, option):
+    spares = ctx['spare'][option]
+    return spares.pop() if spares else 0
+
+
+# ── Routes ──────────────────────────────────────────────────────────────────
+# GETS are (name, url), POSTS (name, url, body(ctx, i)); urls are formatted
+# with ctx. Mutations alternate their flag on i so the data stays stable.
+GETS = [
+    ('GET /', '/'),
+    ('GET /auth/login', '/auth/login'),
+    ('GET /auth/signup', '/auth/signup'),
+    ('GET /overview', '/overview'),
+    ('GET /profession', '/profession'),
+    ('GET /physical', '/physical'),
+    ('GET /api/tasks', '/api/tasks?date={today}'),
+    ('GET /api/profession/tasks', '/api/profession/tasks'),
+    ('GET /api/profession/tasks?status=done', '/api/profession/tasks?status=done&limit=20'),
+    ('GET /api/profession/tasks/past-pending', '/api/profession/tasks/past-pending'),
+    ('GET /api/calendar/month', '/api/calendar/month?year={year}&month={month}'),
+    ('GET /api/calendar/day', '/api/calendar/day?date={yesterday}'),
+    ('GET /api/check-edit-allowed', '/api/check-edit-allowed?date={today}'),
+    ('GET /api/date-view', '/api/date-view?date={today}'),
+    ('GET /api/date-view?fields', '/api/date-view?date={tomorrow}&fields=overview,physical.goals,physical.reminders'),
+    ('GET /api/date-view?dates', '/api/date-view?dates={week}&fields=physical.stats,profession'),
+    ('GET /api/physical-activities/init', '/api/physical-activities/init'),
+    ('GET /api/physical-activities', '/api/physical-activities'),
+]
+
+POSTS = [
+    ('POST /api/task/add', '/api/task/add', lambda c, i: {'title': f'Bench {i}', 'date': c['today']}),
+    ('POST /api/task/toggle', '/api/task/toggle', lambda c, i: {'id': c['tasks'], 'completed': i % 2 == 0}),
+    ('POST /api/task/update-points', '/api/task/update-points', lambda c, i: {'task_date': c['today']}),
+    ('POST /api/physical-goals/add', '/api/physical-goals/add',
+     lambda c, i: {'goal_title': f'Bench {i}', 'goal_date': c['today']}),
+    ('POST /api/physical-goals/toggle', '/api/physical-goals/toggle',
+     lambda c, i: {'id': c['goals'], 'completed': i % 2 == 0}),
+    ('POST /api/profession/tasks/add', '/api/profession/tasks/add', lambda c, i: {'title': f'Bench {i}'}),
+    ('POST /api/profession/tasks/toggle', '/api/profession/tasks/toggle',
+     lambda c, i: {'id': c['profession'], 'completed': i % 2 == 0}),
+    ('POST /api/profession/tasks/edit', '/api/profession/tasks/edit',
+     lambda c, i: {'id': c['profession'], 'title': f'Ticket {i}'}),
+    ('POST /api/reminders/add', '/api/reminders/add', lambda c, i: {'title': f'Bench {i}', 'date': c['today']}),
+    ('POST /api/reminders/toggle', '/api/reminders/toggle', lambda c, i: {'id': c['reminders'], 'done': i % 2 == 0}),
+    ('POST /api/nutrition/checklist/toggle', '/api/nutrition/checklist/toggle',
+     lambda c, i: {'id': c['checklist'][0], 'checked': i % 2 == 0}),
+    ('POST /api/physical/update', '/api/physical/update', lambda c, i: {'water': 1.0 + i % 3, 'food_log': 'oats'}),
+    ('POST /api/activity/note/update', '/api/activity/note/update',
+     lambda c, i: {'date': c['today'], 'note': f'Note {i % 2}'}),
+    ('POST /api/nutrition-progress/update', '/api/nutrition-progress/update',
+     lambda c, i: {'entry_date': c['today'], 'item_id': c['checklist'][0], 'progress': i % 100}),
+    ('POST /api/profile/update', '/api/profile/update',
+     lambda c, i: {'height': 175, 'weight': 70 + i % 2, 'blood_group': 'O+'}),
+    ('POST /api/batch', '/api/batch', lambda c, i: {'ops': [
+        {'type': 'task', 'op': 'toggle', 'id': c['tasks'], 'completed': i % 2 == 1},
+        {'type': 'checklist', 'op': 'toggle', 'id': c['checklist'][0], 'checked': i % 2 == 1},
+        {'type': 'reminder', 'op': 'toggle', 'id': c['reminders'], 'done': i % 2 == 1},
+        {'type': 'goal', 'op': 'toggle', 'id': c['goals'], 'completed': i % 2 == 1},
+        {'type': 'profession_task', 'op': 'toggle', 'id': c['profession'], 'completed': i % 2 == 1},
+    ]}),
+    ('POST /api/batch (task delete)', '/api/batch',
+     lambda c, i: {'ops': [{'type': 'task', 'op': 'delete', 'id': _spare(c, 'tasks')}]}),
+    ('POST /api/physical-goals/delete', '/api/physical-goals/delete', lambda c, i: {'id': _spare(c, 'goals')}),
+    ('POST /api/reminders/delete', '/api/reminders/delete', lambda c, i: {'id': _spare(c, 'reminders')}),
+    ('POST /api/profession/tasks/delete', '/api/profession/tasks/delete',
+     lambda c, i: {'id': _spare(c, 'profession')}),
+]
+
+
+def routes():
+    """(name, call(client, ctx, i), restores_session) for every benchmarked endpoint"""
+    for name, url in GETS:
+        yield name, lambda client, c, i, url=url: client.get(url.format(**c)), False
+    for name, url, body in POSTS:
+        yield name, lambda client, c, i, url=url, body=body: client.post(url, json=body(c, i)), False
+
+    def next_page(client, c, i):
+        cursor = c.get('cursor')
+        response = client.get('/api/profession/tasks?limit=20' + (f'&cursor={cursor}' if cursor else ''))
+        c['cursor'] = response.get_json().get('next_cursor')
+        return response
+    yield 'GET /api/profession/tasks?cursor=', next_page, False
+    yield 'POST /auth/login', lambda client, c, i: client.post(
+        '/auth/login', data={'username': f"bench{c['uid']}", 'password': PASSWORD}), False
+    yield 'POST /auth/signup', lambda client, c, i: client.post(
+        '/auth/signup', data={'username': f"new{c['uid']}_{i}_{time.monotonic_ns()}", 'password': PASSWORD}), True
+    yield 'GET /auth/logout', lambda client, c, i: client.get('/auth/logout'), True
+
+
+# Options recorded in a baseline; timings only compare when these match
+BASELINE_OPTIONS = ('users', 'days', 'future_days', 'tasks', 'checklist', 'reminders', 'goals', 'profession',
+                    'threads', 'requests', 'cold', 'seed')
+
+
+# ── Running ─────────────────────────────────────────────────────────────────
+def pct(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] * 1000
+
+
+def run(app, contexts, args, counter):
+    """{route: stats} with every thread sending args.requests requests to one route at a time"""
+    clients = []
+    for ctx in contexts:
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess['user_id'] = ctx['uid']
+            sess['daily_alert_shown'] = True
+        clients.append(client)
+
+    results = {}
+    for name, call, restores_session in routes():
+        if args.route and not any(part in name for part in args.route):
+            continue
+        latencies, queries, errors = [], [], []
+        lock = threading.Lock()
+        barrier = threading.Barrier(len(clients))
+
+        def worker(client, ctx):
+            local_lat, local_q, local_err = [], [], 0
+            barrier.wait()
+            for i in range(args.requests):
+                counter.count = 0
+                started = time.perf_counter()
+                response = call(client, ctx, i)
+                local_lat.append(time.perf_counter() - started)
+                local_q.append(counter.count)
+                if response.status_code >= 400:
+                    local_err += 1
+                if restores_session:
+                    with client.session_transaction() as sess:
+                        sess['user_id'] = ctx['uid']
+                        sess['daily_alert_shown'] = True
+            with lock:
+                latencies.extend(local_lat)
+                queries.extend(local_q)
+                errors.append(local_err)
+
+        threads = [threading.Thread(target=worker, args=pair) for pair in zip(clients, contexts)]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+        results[name] = {
+            'calls': len(latencies),
+            'errors': sum(errors),
+            'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+            'p50_ms': round(pct(latencies, 50), 3),
+            'p95_ms': round(pct(latencies, 95), 3),
+            'p99_ms': round(pct(latencies, 99), 3),
+            'queries': round(sum(queries) / len(queries), 2) if queries else 0.0,
+        }
+    return results
+
+
+def report(results):
+    width = max(len(name) for name in results)
+    print(f"{'route':<{width}} {'calls':>6} {'err':>4} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'queries':>8}  (ms)")
+    for name, r in results.items():
+        print(f"{name:<{width}} {r['calls']:>6} {r['errors']:>4} {r['rps']:>8.0f} {r['p50_ms']:>8.2f} "
+              f"{r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['queries']:>8.2f}")
+
+
+def compare(results, baseline, tolerance, min_ms, partial=False):
+    """Names of routes that regressed against the baseline, printing each change"""
+    regressions = []
+    for name, r in results.items():
+        base = baseline['routes'].get(name)
+        if base is None:
+            print(f"new   {name}")
+            continue
+        problems = []
+        if r['queries'] > base['queries'] + 0.01:
+            problems.append(f"queries {base['queries']:.2f} -> {r['queries']:.2f}")
+        if r['p95_ms'] > base['p95_ms'] * (1 + tolerance) and r['p95_ms'] - base['p95_ms'] > min_ms:
+            problems.append(f"p95 {base['p95_ms']:.2f} -> {r['p95_ms']:.2f} ms")
+        if r['errors'] > base.get('errors', 0):
+            problems.append(f"errors {base.get('errors', 0)} -> {r['errors']}")
+        if problems:
+            regressions.append(name)
+            print(f"SLOW  {name}: {', '.join(problems)}")
+    for name in baseline['routes']:
+        if name not in results and not partial:
+            print(f"gone  {name}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--days', type=int, default=90, help='days of history per user, ending today')
+    parser.add_argument('--future-days', type=int, default=7)
+    parser.add_argument('--tasks', type=int, default=2, help='tasks per user per day')
+    parser.add_argument('--checklist', type=int, default=17, help='checklist items per user per day')
+    parser.add_argument('--reminders', type=int, default=1, help='reminders per user per day')
+    parser.add_argument('--goals', type=int, default=1, help='physical goals per user per day')
+    parser.add_argument('--profession', type=int, default=3, help='profession tasks per user per day')
+    parser.add_argument('--threads', type=int, default=1, help='concurrent clients, each a different user')
+    parser.add_argument('--requests', type=int, default=50, help='requests per thread per route')
+    parser.add_argument('--route', action='append', help='only routes containing this text (repeatable)')
+    parser.add_argument('--cold', action='store_true', help='disable the calendar and profile caches')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--db', help='reuse this seeded database instead of seeding a scratch one')
+    parser.add_argument('--save', metavar='PATH', help='write results as a JSON baseline')
+    parser.add_argument('--compare', metavar='PATH', help='compare against a saved baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed p95 slowdown (0.25 = 25%%)')
+    parser.add_argument('--min-ms', type=float, default=0.5, help='ignore p95 changes smaller than this')
+    args = parser.parse_args()
+    args.threads = max(args.threads, 1)
+
+    if args.db:
+        path = args.db
+    else:
+        path = os.path.join(tempfile.mkdtemp(prefix='neri_bench_routes_'), 'neri.db')
+        started = time.perf_counter()
+        rows = seed(path, args)
+        print(f"Seeded {rows} rows for {args.users} users x {args.days + args.future_days} days "
+              f"in {time.perf_counter() - started:.1f}s ({path})")
+    if args.threads > args.users:
+        print(f"Error: --threads ({args.threads}) needs at least as many --users")
+        return 1
+
+    counter = threading.local()
+
+    def count(sql):
+        counter.count = getattr(counter, 'count', 0) + 1
+
+    from app import create_app
+    config = {
+        'DATABASE': path,
+        'QUOTE_API_URL': '',  # no network in a benchmark
+        # A failing route counts as an error (500) instead of stopping the run
+        'PROPAGATE_EXCEPTIONS': False,
+        'SQL_TRACE_CALLBACK': count,
+    }
+    if args.cold:
+        config['CALENDAR_CACHE_SIZE'] = config['PROFILE_CACHE_SIZE'] = 0
+    app = create_app(config)
+    app.logger.disabled = True
+
+    contexts = [user_context(path, uid, args.requests) for uid in range(1, args.threads + 1)]
+    print(f"{args.threads} thread(s) x {args.requests} requests per route"
+          f"{', caches off' if args.cold else ''}")
+    started = time.perf_counter()
+    results = run(app, contexts, args, counter)
+    elapsed = time.perf_counter() - started
+    report(results)
+    calls = sum(r['calls'] for r in results.values())
+    print(f"{calls} requests in {elapsed:.1f}s ({calls / elapsed:.0f} req/s overall)")
+
+    status = 0
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        changed = [k for k in BASELINE_OPTIONS if baseline.get('options', {}).get(k) != getattr(args, k)]
+        if changed:
+            print(f"Note: baseline ran with different {', '.join(changed)}; compare timings with care")
+        regressions = compare(results, baseline, args.tolerance, args.min_ms, partial=bool(args.route))
+        print(f"{len(regressions)} regression(s) against {args.compare}.")
+        status = 1 if regressions else 0
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                'created': datetime.datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'sqlite': sqlite3.sqlite_version,
+                'options': {k: getattr(args, k) for k in BASELINE_OPTIONS},
+                'routes': results,
+            }, f, indent=2)
+        print(f"Saved baseline to {args.save}")
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""Cold-start benchmark: import time of the web worker and the maintenance scripts.
+
+    python bench_startup.py [--runs 5] [--baseline REV]
+
+Each target is imported in a fresh interpreter under `python -X importtime`
+and the cumulative time of its top-level import is reported (median of
+--runs, after one warm-up that also creates and migrates the scratch
+database). The web worker target is `wsgi` (create_app() with the schema
+step included), or `app` in trees that predate the factory.
+
+--baseline checks REV out with `git archive` into a scratch directory and
+runs the same targets there, printing both columns and the difference.
+"""
+import os
+import re
+import sys
+import shutil
+import argparse
+import tempfile
+import subprocess
+import statistics
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+SCRIPTS = ('recalculate_all', 'rollover', 'checklists', 'export', 'importer', 'rollups', 'reconcile_stats')
+
+LINE_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$')
+
+
+def targets(tree):
+    """(label, module) pairs that exist in tree"""
+    worker = 'wsgi' if os.path.exists(os.path.join(tree, 'wsgi.py')) else 'app'
+    found = [('web worker', worker)]
+    found += [(name, name) for name in SCRIPTS if os.path.exists(os.path.join(tree, f'{name}.py'))]
+    return found
+
+
+def import_ms(tree, module, workdir):
+    """Cumulative -X importtime of `import module`, in ms"""
+    env = dict(os.environ, PYTHONPATH=tree, QUOTE_API_URL='')
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                          cwd=workdir, env=env, capture_output=True, text=True)
+    if proc.returncode:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    for line in proc.stderr.splitlines():
+        m = LINE_RE.match(line)
+        if m and not m.group(3) and m.group(4) == module:
+            return int(m.group(2)) / 1000
+    raise RuntimeError(f"no importtime line for {module}")
+
+
+def measure(tree, runs):
+    """{label: median ms} for every target in tree, each run in a fresh interpreter"""
+    workdir = tempfile.mkdtemp(prefix='neri_startup_')  # the scratch neri.db lives here
+    try:
+        results = {}
+        for label, module in targets(tree):
+            import_ms(tree, module, workdir)  # warm-up: .pyc files, database creation
+            results[label] = statistics.median(import_ms(tree, module, workdir) for _ in range(runs))
+        return results
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def checkout(rev):
+    """Export rev of this repository into a scratch directory"""
+    path = tempfile.mkdtemp(prefix='neri_startup_base_')
+    archive = subprocess.run(['git', 'archive', rev], cwd=HERE, capture_output=True, check=True).stdout
+    subprocess.run(['tar', '-x', '-C', path], input=archive, check=True)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Import-time benchmark for the web worker and the scripts.')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--baseline', metavar='REV', help='git revision to compare against')
+    args = parser.parse_args(argv)
+
+    current = measure(HERE, args.runs)
+    if not args.baseline:
+        print(f"{'target':<18} {'import ms':>10}")
+        for label, ms in current.items():
+            print(f"{label:<18} {ms:>10.1f}")
+        return 0
+
+    base_tree = checkout(args.baseline)
+    try:
+        baseline = measure(base_tree, args.runs)
+    finally:
+        shutil.rmtree(base_tree, ignore_errors=True)
+    print(f"{'target':<18} {args.baseline[:10]:>10} {'current':>10} {'saved':>10}")
+    for label, ms in current.items():
+        before = baseline.get(label)
+        if before is None:
+            print(f"{label:<18} {'-':>10} {ms:>10.1f} {'-':>10}")
+        else:
+            print(f"{label:<18} {before:>10.1f} {ms:>10.1f} {before - ms:>10.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,97 @@
+import json
+import hashlib
+import datetime
+import threading
+from collections import OrderedDict
+
+
+class CalendarCache:
+    """Bounded LRU of serialized calendar payloads, keyed per user.
+
+    Keys are ('month', user_id, year, month) and ('day', user_id, date_str).
+    Each entry remembers the day it was built on, since payloads compare
+    dates against "today", and the data version it was built at (the
+    user's profile stamp and the stamp of the key's month, kept by
+    triggers in the database); an entry from an earlier day or an older
+    version is treated as a miss. Writes from
+    other workers and the maintenance scripts therefore show up on the
+    next request.
+
+    invalidate()/invalidate_user() drop this worker's stale entries right
+    away instead of leaving them to be evicted.
+    """
+
+    def __init__(self, max_entries=2048):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def month_key(uid, year, month):
+        return ('month', uid, year, month)
+
+    @staticmethod
+    def day_key(uid, date_str):
+        return ('day', uid, date_str)
+
+    @staticmethod
+    def key_month(key):
+        """'YYYY-MM' of the month a key's payload covers"""
+        if key[0] == 'month':
+            return f'{key[2]:04d}-{key[3]:02d}'
+        return key[2][:7]
+
+    def get(self, key, version=None):
+        today = datetime.date.today().isoformat()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry['built_on'] != today or entry['version'] != version:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, payload, version=None):
+        body = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+        entry = {
+            'etag': hashlib.md5(body.encode()).hexdigest(),
+            'body': body,
+            'payload': payload,
+            'built_on': datetime.date.today().isoformat(),
+            'version': version,
+        }
+        if self.max_entries <= 0:
+            return entry
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, uid, date_str):
+        """Drop the day payload and its month payload for one dated change"""
+        if not date_str:
+            return
+        try:
+            day = datetime.date.fromisoformat(date_str)
+        except (TypeError, ValueError):
+            return
+        with self._lock:
+            self._entries.pop(self.day_key(uid, day.isoformat()), None)
+            self._entries.pop(self.month_key(uid, day.year, day.month), None)
+
+    def invalidate_user(self, uid):
+        """Drop everything for a user, e.g. after a profile change"""
+        with self._lock:
+            for key in [k for k in self._entries if k[1] == uid]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,162 @@
+"""Drive every route against a scratch database and EXPLAIN each query it runs.
+
+Fails (exit 1) if any statement issued by a route does a full table scan
+on a per-user table. That includes the statements a route runs on its own
+connection: the export stream is read to the end and the import job is
+awaited. Run after adding a route or changing a query:
+
+    python check_query_plans.py
+"""
+import os
+import re
+import sys
+import time
+import sqlite3
+import datetime
+import tempfile
+
+# Small global lookup tables that are fine to scan
+SCAN_ALLOWED = {'physical_activities', 'schema_version', 'calendar_days'}
+
+SCAN_RE = re.compile(r'\bSCAN (\w+)')
+# Multi-row VALUES lists ("SCAN CONSTANT ROW", "SCAN 17 CONSTANT ROWS")
+CONSTANT_RE = re.compile(r'^SCAN (\d+ )?CONSTANT ROW')
+
+
+def seed(client, today, tomorrow):
+    client.post('/auth/signup', data={'username': 'plan_check', 'password': 'plan_check'})
+    client.post('/api/physical/update', json={'personal_info': {'height': 175, 'weight': 70, 'blood_group': 'O+'}})
+    client.post('/api/task/add', json={'title': 'Stretch', 'date': today})
+    client.post('/api/reminders/add', json={'title': 'Call doctor', 'date': tomorrow})
+    client.post('/api/physical-goals/add', json={'goal_title': 'Leg day', 'goal_date': tomorrow})
+    client.post('/api/profession/tasks/add', json={'title': 'Review PR'})
+
+
+def drive_routes(client, today, tomorrow):
+    """One request per route in app.py (page renders and /api/*)"""
+    year, month = today[:4], int(today[5:7])
+    gets = [
+        '/', '/overview', '/profession', '/physical',
+        f'/api/tasks?date={today}',
+        '/api/profession/tasks',
+        '/api/profession/tasks?status=done&limit=1',
+        '/api/profession/tasks/past-pending',
+        f'/api/calendar/month?year={year}&month={month}',
+        f'/api/calendar/day?date={today}',
+        f'/api/check-edit-allowed?date={today}',
+        f'/api/date-view?date={today}',
+        f'/api/date-view?date={tomorrow}&fields=overview,physical.goals,physical.reminders',
+        f'/api/date-view?dates={today},{tomorrow}&fields=physical.stats,profession',
+        '/api/physical-activities/init',
+        '/api/physical-activities',
+        '/api/analytics',
+        '/api/analytics/trend?days=30',
+        '/api/analytics/rollup?period=week',
+        '/api/analytics/rollup?period=month&from=2020-01-01&to=2030-12-31',
+        '/debug/perf',
+    ]
+    posts = [
+        ('/api/task/add', {'title': 'Walk', 'date': today}),
+        ('/api/task/toggle', {'id': 1, 'completed': True}),
+        ('/api/physical-goals/add', {'goal_title': 'Swim', 'goal_date': today}),
+        ('/api/physical-goals/toggle', {'id': 1, 'completed': True}),
+        ('/api/physical-goals/delete', {'id': 2}),
+        ('/api/profession/tasks/add', {'title': 'Write docs'}),
+        ('/api/profession/tasks/toggle', {'id': 1, 'completed': True}),
+        ('/api/profession/tasks/edit', {'id': 1, 'title': 'Review PRs'}),
+        ('/api/profession/tasks/delete', {'id': 2}),
+        ('/api/reminders/add', {'title': 'Stand up', 'date': today}),
+        ('/api/reminders/toggle', {'id': 1, 'done': True}),
+        ('/api/reminders/delete', {'id': 2}),
+        ('/api/physical/update', {'water': 1.5, 'food_log': 'oats'}),
+        ('/api/nutrition/checklist/toggle', {'id': 1, 'checked': True}),
+        ('/api/activity/note/update', {'date': today, 'note': 'Good day'}),
+        ('/api/task/update-points', {'task_date': today}),
+        ('/api/profile/update', {'height': 175, 'weight': 71, 'blood_group': 'O+'}),
+        ('/api/batch', {'ops': [
+            {'type': 'task', 'op': 'add', 'title': 'Plank', 'date': today},
+            {'type': 'task', 'op': 'toggle', 'id': 1, 'completed': False},
+            {'type': 'checklist', 'op': 'toggle', 'id': 2, 'checked': True},
+            {'type': 'reminder', 'op': 'edit', 'id': 1, 'title': 'Stand up often'},
+            {'type': 'goal', 'op': 'toggle', 'id': 1, 'completed': False},
+            {'type': 'profession_task', 'op': 'toggle', 'id': 1, 'completed': False},
+            {'type': 'task', 'op': 'delete', 'id': 3},
+        ]}),
+    ]
+    for url in gets:
+        yield 'GET ' + url, lambda url=url: client.get(url)
+    for url, body in posts:
+        yield 'POST ' + url, lambda url=url, body=body: client.post(url, json=body)
+
+    # The export's body is generated after the view returns; read it all
+    yield 'GET /api/export', lambda: client.get('/api/export?gzip=0').get_data()
+    yield 'GET /api/export?format=csv', lambda: client.get(
+        f'/api/export?format=csv&tables=tasks&since={today}&until={tomorrow}&gzip=0').get_data()
+
+    jobs = []
+
+    def import_and_wait():
+        body = client.get('/api/export?gzip=0&tables=tasks,reminders').get_data()
+        job = client.post('/api/import?format=ndjson', data=body).get_json()['job']
+        jobs.append(job['id'])
+        deadline = time.monotonic() + 30
+        while (state := client.get(f"/api/import/{job['id']}").get_json()['job']['state']) != 'done':
+            if state == 'failed' or time.monotonic() > deadline:
+                raise RuntimeError(f'import job {state}')
+            time.sleep(0.05)
+    yield 'POST /api/import (and its job)', import_and_wait
+    yield 'GET /api/import/<job_id>', lambda: client.get(f'/api/import/{jobs[0]}')
+
+    def next_page():
+        cursor = client.get('/api/profession/tasks?limit=1').get_json()['next_cursor']
+        client.get(f'/api/profession/tasks?limit=1&cursor={cursor}')
+    yield 'GET /api/profession/tasks?cursor=', next_page
+    yield 'POST /auth/login', lambda: client.post('/auth/login', data={'username': 'plan_check', 'password': 'plan_check'})
+    yield 'GET /auth/logout', lambda: client.get('/auth/logout')
+
+
+def main():
+    tmpdir = tempfile.mkdtemp(prefix='neri_plans_')
+    db_path = os.path.join(tmpdir, 'neri.db')
+
+    from migrations import migrate_path
+    migrate_path(db_path)
+
+    from app import create_app
+    captured = []
+    app = create_app({'DATABASE': db_path, 'TESTING': True, 'SQL_TRACE_CALLBACK': captured.append,
+                      'ADMIN_USERNAMES': {'plan_check'}})
+
+    today = datetime.date.today().isoformat()
+    tomorrow = (datetime.date.today() + datetime.timedelta(days=1)).isoformat()
+    client = app.test_client()
+    seed(client, today, tomorrow)
+
+    explain = sqlite3.connect(db_path)
+    failures = []
+    checked = set()
+    for route, call in drive_routes(client, today, tomorrow):
+        captured.clear()
+        call()
+        for sql in captured:
+            head = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ''
+            if head not in ('SELECT', 'UPDATE', 'DELETE', 'INSERT', 'WITH') or sql in checked:
+                continue
+            checked.add(sql)
+            plan = [r[3] for r in explain.execute('EXPLAIN QUERY PLAN ' + sql).fetchall()]
+            scans = [m.group(1) for line in plan for m in [SCAN_RE.search(line)]
+                     if m and m.group(1) not in SCAN_ALLOWED and not CONSTANT_RE.match(line)]
+            if scans:
+                failures.append((route, sql, plan))
+    explain.close()
+
+    for route, sql, plan in failures:
+        print(f"FULL SCAN in {route}:\n  {' '.join(sql.split())}")
+        for line in plan:
+            print(f"    {line}")
+    print(f"Checked {len(checked)} distinct statements, {len(failures)} with table scans.")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""Exercise QuoteProvider against a local stub quote API.
+
+Checks that a good response is served and persisted, that a restart is
+warm from storage, that failures back off instead of retrying on every
+render, and that current() never waits on a slow API:
+
+    python check_quote_provider.py
+"""
+import sys
+import json
+import time
+import datetime
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from quote_provider import QuoteProvider, fallback_quote
+
+
+class StubAPI(BaseHTTPRequestHandler):
+    mode = 'ok'
+    hits = 0
+
+    def do_GET(self):
+        StubAPI.hits += 1
+        if StubAPI.mode == 'slow':
+            time.sleep(2)
+        if StubAPI.mode == 'down':
+            self.send_response(503)
+            self.end_headers()
+            return
+        body = json.dumps({'content': 'Stub wisdom.', 'author': 'Stub'}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def main():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubAPI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}/random'
+    today = datetime.date.today()
+    stored = {}
+    failures = []
+
+    def check(name, ok):
+        print(f"{'ok  ' if ok else 'FAIL'} {name}")
+        if not ok:
+            failures.append(name)
+
+    # Fresh start: fallback immediately, fetched quote shortly after
+    provider = QuoteProvider(url, load=lambda: stored.get('q'), save=lambda q: stored.update(q=q),
+                             poll_interval=0.05)
+    provider.start()
+    check('fallback before first fetch', provider.current()['quote'] in
+          (fallback_quote(today)['quote'], 'Stub wisdom.'))
+    check('fetched quote served', wait_for(lambda: provider.current()['quote'] == 'Stub wisdom.'))
+    check('fetched quote persisted', stored.get('q', {}).get('author') == 'Stub')
+    provider.stop()
+
+    # Restart with the API down: warm from storage, no fetch needed today
+    StubAPI.mode, StubAPI.hits = 'down', 0
+    warm = QuoteProvider(url, load=lambda: stored.get('q'), poll_interval=0.05)
+    warm.start()
+    check('restart is warm', warm.current()['quote'] == 'Stub wisdom.')
+    time.sleep(0.2)
+    check('no fetch when today is cached', StubAPI.hits == 0)
+    warm.stop()
+
+    # API down with nothing stored: back off instead of hammering
+    cold = QuoteProvider(url, poll_interval=0.05, min_backoff=0.3, max_backoff=1)
+    cold.start()
+    for _ in range(20):
+        cold.current()
+        time.sleep(0.05)
+    check('fallback while API is down', cold.current() == fallback_quote(today))
+    check(f'backoff limits retries ({StubAPI.hits} in 1s)', 1 <= StubAPI.hits <= 4)
+    check('backoff grows', cold.backoff > cold.min_backoff)
+    cold.stop()
+
+    # Slow API: the render path must not wait on it
+    StubAPI.mode = 'slow'
+    slow = QuoteProvider(url, poll_interval=0.05, timeout=3)
+    slow.start()
+    started = time.perf_counter()
+    for _ in range(100):
+        slow.current()
+    elapsed = time.perf_counter() - started
+    check(f'current() does not block ({elapsed * 1000:.1f} ms for 100 calls)', elapsed < 0.1)
+    slow.stop()
+
+    server.shutdown()
+    print(f"{len(failures)} failure(s).")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,251 @@
+"""Daily nutrition/workout checklist generation, shared by the app and the batch jobs.
+
+    python checklists.py [--db neri.db] [--date YYYY-MM-DD]
+
+pre-generates the checklists for a day (tomorrow by default) for every
+recently active user.
+"""
+import sys
+import random
+import hashlib
+import argparse
+import datetime
+from functools import lru_cache
+
+# Users with activity in this many days get tomorrow's checklist ahead of time
+ACTIVE_DAYS = 14
+
+def compute_nutrition_targets(height_cm, weight_kg):
+    if not height_cm or not weight_kg or float(weight_kg) <= 0 or float(height_cm) <= 0:
+        return None
+    h, w = float(height_cm), float(weight_kg)
+    bmi = w / ((h / 100) ** 2)
+    return {
+        'bmi': round(bmi, 1),
+        'protein_g': round(w * 1.6),
+        'fiber_g': 30 if w >= 70 else 25,
+        'water_l': round(w * 0.035, 1),
+    }
+
+def get_bmi_status(bmi):
+    """Get BMI status: Underweight, Normal, Overweight, Obese"""
+    if bmi < 18.5:
+        return {'status': 'Underweight', 'color': '#3b82f6', 'recommendation': 'Increase caloric intake'}
+    elif bmi < 25:
+        return {'status': 'Normal', 'color': '#10b981', 'recommendation': 'Maintain current diet and exercise'}
+    elif bmi < 30:
+        return {'status': 'Overweight', 'color': '#f59e0b', 'recommendation': 'Reduce caloric intake, increase exercise'}
+    else:
+        return {'status': 'Obese', 'color': '#ef4444', 'recommendation': 'Consult healthcare provider'}
+
+# ── Nutrition Food Pools ─────────────────────────────────────────────────────
+FOOD_POOLS = {
+    'breakfast_protein': [
+        'eggs', 'Greek yogurt', 'paneer', 'protein smoothie', 'tofu scramble', 
+        'cottage cheese', 'moong dal chilla', 'sprouted moong'
+    ],
+    'lunch_protein': [
+        'chicken breast', 'dal (lentils)', 'tofu', 'tempeh', 'legumes (chickpeas, kidney beans)', 
+        'soy chunks', 'grilled fish', 'lean beef'
+    ],
+    'dinner_protein': [
+        'fish (salmon, tuna)', 'beans', 'cottage cheese', 'quinoa', 'turkey', 
+        'mushrooms with peas', 'edamame', 'lentil soup'
+    ],
+    'vegetables': [
+        'broccoli', 'spinach', 'carrots', 'cauliflower', 'bell peppers', 
+        'brussels sprouts', 'sweet potatoes', 'kale', 'green beans'
+    ],
+    'grains': [
+        'oats', 'brown rice', 'roti (whole wheat)', 'quinoa', 'barley', 
+        'buckwheat', 'millet', 'whole grain bread'
+    ],
+    'fruits': [
+        'apple', 'guava', 'banana', 'pear', 'orange', 'berries', 'papaya', 'pomegranate'
+    ]
+}
+
+WORKOUT_ROUTINES = [
+    'Cardio & Core: 30 mins running/cycling + plank & crunches',
+    'Leg Day: Squats, Lunges, Calf raises, Glute bridges',
+    'Chest & Triceps: Push-ups, Dips, Tricep extensions',
+    'Back & Biceps: Pull-ups, Rows, Bicep curls',
+    'Full Body HIIT: Burpees, Jumping jacks, Mountain climbers',
+    'Active Recovery: 45 mins brisk walking or yoga stretch'
+]
+
+def build_nutrition_checklist(targets, seed_date=None):
+    # Use seed_date (ISO format string) to create a deterministic but changing seed
+    if seed_date:
+        seed_hash = int(hashlib.md5(seed_date.encode()).hexdigest(), 16)
+        rng = random.Random(seed_hash)
+    else:
+        rng = random.Random()
+        
+    checklist = []
+    
+    # ── 1. Calculate rotating workout schedule ─────────────────────────────
+    if seed_date:
+        try:
+            day_idx = datetime.date.fromisoformat(seed_date).toordinal()
+        except Exception:
+            day_idx = rng.randint(0, 1000)
+    else:
+        day_idx = rng.randint(0, 1000)
+        
+    wo = WORKOUT_ROUTINES[day_idx % len(WORKOUT_ROUTINES)]
+    
+    checklist.extend([
+        {'label': 'Warm-up: 5-10 mins dynamic stretching', 'type': 'workout'},
+        {'label': wo, 'type': 'workout'},
+        {'label': 'Cool-down: 5 mins static stretching', 'type': 'workout'},
+        {'label': 'Log your completion and effort', 'type': 'workout'}
+    ])
+
+    if not targets:
+        return checklist
+
+    # ── 2. Calculate Nutrition Targets ─────────────────────────────────────
+    p, f, w = targets['protein_g'], targets['fiber_g'], targets['water_l']
+    per_meal = round(p / 3)
+    
+    # Randomly pick items from pools
+    bp = rng.choice(FOOD_POOLS['breakfast_protein'])
+    lp = rng.choice(FOOD_POOLS['lunch_protein'])
+    dp = rng.choice(FOOD_POOLS['dinner_protein'])
+    
+    # Pick 2 different vegetables
+    veg_pool = FOOD_POOLS['vegetables'][:]
+    v1 = rng.choice(veg_pool)
+    veg_pool.remove(v1)
+    v2 = rng.choice(veg_pool)
+    
+    gr = rng.choice(FOOD_POOLS['grains'])
+    fr = rng.choice(FOOD_POOLS['fruits'])
+
+    checklist.extend([
+        {'label': f'Breakfast protein (~{per_meal}g) — {bp}', 'type': 'protein'},
+        {'label': f'Lunch protein (~{per_meal}g) — {lp}', 'type': 'protein'},
+        {'label': f'Dinner protein (~{per_meal}g) — {dp}', 'type': 'protein'},
+        {'label': f'Daily protein target: {p}g total', 'type': 'protein'},
+        {'label': f'Vegetable servings ({v1}, {v2}) — towards {f}g fiber goal', 'type': 'fiber'},
+        {'label': f'Whole grains for at least one meal — {gr}', 'type': 'fiber'},
+        {'label': f'One serving of fruit — {fr}', 'type': 'fiber'},
+        {'label': f'Daily fiber target: {f}g total', 'type': 'fiber'},
+        {'label': 'Morning: 500ml within 30 min of waking', 'type': 'water'},
+        {'label': 'Pre-lunch: 300ml before your meal', 'type': 'water'},
+        {'label': 'Afternoon: 500ml between 2–4 PM', 'type': 'water'},
+        {'label': 'Evening: 300ml post-workout or with snack', 'type': 'water'},
+        {'label': f'Daily water target: {w}L (based on your weight)', 'type': 'water'},
+    ])
+    
+    return checklist
+
+# ── Template cache ───────────────────────────────────────────────────────────
+# A dated checklist depends only on the three targets and the date, so users
+# with the same targets share one template per day.
+@lru_cache(maxsize=4096)
+def _cached_template(protein_g, fiber_g, water_l, seed_date):
+    targets = None
+    if protein_g is not None:
+        targets = {'protein_g': protein_g, 'fiber_g': fiber_g, 'water_l': water_l}
+    return tuple((item['label'], item['type']) for item in build_nutrition_checklist(targets, seed_date))
+
+def checklist_template(targets, seed_date):
+    """(label, item_type) pairs for the day, memoized on (protein, fiber, water, date)"""
+    if targets:
+        return _cached_template(targets['protein_g'], targets['fiber_g'], targets['water_l'], seed_date)
+    return _cached_template(None, None, None, seed_date)
+
+def insert_checklist(db, uid, entry_date, items):
+    """Insert items with one statement and return the new rows (no commit)"""
+    if not items:
+        return []
+    values = ', '.join(['(?, ?, ?, ?)'] * len(items))
+    params = [v for label, item_type in items for v in (uid, entry_date, label, item_type)]
+    rows = db.execute(f'INSERT INTO nutrition_checklist (user_id, entry_date, item_label, item_type) '
+                      f'VALUES {values} RETURNING *', params).fetchall()
+    return sorted(rows, key=lambda r: r['id'])
+
+# ── Bulk pre-generation ──────────────────────────────────────────────────────
+# Real activity only: points earned, a note written, or items the user
+# scheduled. Rows the rollover creates ahead of time (daily_physical, the
+# checklist) don't count, so an idle user drops out after active_days.
+ACTIVE_USERS_SQL = '''
+    SELECT u.id FROM users u
+     WHERE EXISTS (SELECT 1 FROM daily_activity a WHERE a.user_id = u.id AND a.entry_date >= :since
+                      AND (a.total_points > 0 OR a.day_note != ''))
+        OR EXISTS (SELECT 1 FROM tasks t WHERE t.user_id = u.id AND t.task_date >= :since)
+        OR EXISTS (SELECT 1 FROM profession_tasks t WHERE t.user_id = u.id AND t.task_date >= :since)
+        OR EXISTS (SELECT 1 FROM physical_goals g WHERE g.user_id = u.id AND g.goal_date >= :since)
+        OR EXISTS (SELECT 1 FROM reminders r WHERE r.user_id = u.id
+                      AND COALESCE(r.reminder_date, r.created_at) >= :since)'''
+
+def active_user_ids(db, entry_date, active_days=ACTIVE_DAYS):
+    """Users with real activity in the active_days before entry_date"""
+    since = (datetime.date.fromisoformat(entry_date) - datetime.timedelta(days=active_days)).isoformat()
+    return [r[0] for r in db.execute(ACTIVE_USERS_SQL, {'since': since})]
+
+# Adds the new items to the day's totals when the row exists already (the
+# user scheduled something for that day); otherwise the day's first
+# mutation creates the row with the checklist counted
+ADD_TOTALS_SQL = '''
+    UPDATE daily_activity SET
+        physical_total_count = physical_total_count + :items,
+        physical_completion_pct = CAST(physical_points * 100.0 / (physical_total_count + :items) + 0.5 AS INTEGER)
+     WHERE user_id = :uid AND entry_date = :day'''
+
+def pregenerate(db, entry_date, user_ids=None, commit=True):
+    """Create entry_date's checklist for the given (default: active) users who lack one.
+
+    One executemany for the items and one adding them to daily_activity
+    rows that already exist (no row is created, so counts_version stays
+    whatever the row's writer stamped), committed together. Returns the
+    number of users given a checklist.
+    """
+    if user_ids is None:
+        user_ids = active_user_ids(db, entry_date)
+    rows, totals = [], []
+    for start in range(0, len(user_ids), 500):
+        chunk = user_ids[start:start + 500]
+        users = db.execute(
+            f'''SELECT u.id, u.height, u.weight FROM users u
+                 WHERE u.id IN ({', '.join('?' * len(chunk))})
+                   AND NOT EXISTS (SELECT 1 FROM nutrition_checklist c
+                                    WHERE c.user_id = u.id AND c.entry_date = ?)''',
+            [*chunk, entry_date]).fetchall()
+        for user in users:
+            items = checklist_template(compute_nutrition_targets(user['height'], user['weight']), entry_date)
+            rows.extend((user['id'], entry_date, label, item_type) for label, item_type in items)
+            totals.append({'uid': user['id'], 'day': entry_date, 'items': len(items)})
+    db.executemany('INSERT INTO nutrition_checklist (user_id, entry_date, item_label, item_type) VALUES (?, ?, ?, ?)',
+                   rows)
+    db.executemany(ADD_TOTALS_SQL, totals)
+    if commit:
+        db.commit()
+    return len(totals)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Pre-generate daily checklists for active users.')
+    parser.add_argument('--db', default='neri.db')
+    parser.add_argument('--date', help='YYYY-MM-DD, defaults to tomorrow')
+    args = parser.parse_args(argv)
+
+    try:
+        day = datetime.date.fromisoformat(args.date) if args.date else datetime.date.today() + datetime.timedelta(days=1)
+    except ValueError:
+        print(f"Error: --date must be YYYY-MM-DD, got {args.date!r}")
+        return 1
+
+    from database import connect
+    db = connect(args.db)
+    try:
+        count = pregenerate(db, day.isoformat())
+    finally:
+        db.close()
+    print(f"Generated {day.isoformat()} checklists for {count} user(s).")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
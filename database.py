@@ -1,23 +1,124 @@
+import queue
 import sqlite3
-from flask import g
+import threading
+from migrations import migrate, current_version, MIGRATIONS
 
 DATABASE = 'neri.db'
 
-def get_db():
-    db = getattr(g, '_database', None)
-    if db is None:
-        db = g._database = sqlite3.connect(DATABASE)
-        db.row_factory = sqlite3.Row
+# Connection tuning, overridable through app.config
+DEFAULT_CONFIG = {
+    'SQLITE_JOURNAL_MODE': 'WAL',        # readers no longer block behind writers
+    'SQLITE_SYNCHRONOUS': 'NORMAL',      # safe with WAL, one fsync per checkpoint
+    'SQLITE_BUSY_TIMEOUT_MS': 5000,
+    'SQLITE_MMAP_SIZE': 64 * 1024 * 1024,
+    'SQLITE_CACHE_SIZE': -16000,         # negative = KiB, so ~16 MB per connection
+    'SQLITE_FOREIGN_KEYS': True,
+    'SQLITE_POOL_SIZE': 8,
+}
+
+def _setting(config, key):
+    return config.get(key, DEFAULT_CONFIG[key]) if config else DEFAULT_CONFIG[key]
+
+def connect(path=DATABASE, config=None, check_same_thread=True):
+    """Open a connection with the tuning pragmas applied.
+
+    Used by the request pool and by the maintenance scripts, so every
+    writer agrees on journal mode and busy handling.
+    """
+    timeout_ms = _setting(config, 'SQLITE_BUSY_TIMEOUT_MS')
+    db = sqlite3.connect(path, timeout=timeout_ms / 1000, check_same_thread=check_same_thread)
+    db.row_factory = sqlite3.Row
+    journal_mode = _setting(config, 'SQLITE_JOURNAL_MODE')
+    if journal_mode:
+        db.execute(f'PRAGMA journal_mode={journal_mode}')
+    db.execute(f"PRAGMA synchronous={_setting(config, 'SQLITE_SYNCHRONOUS')}")
+    db.execute(f'PRAGMA busy_timeout={int(timeout_ms)}')
+    db.execute(f"PRAGMA mmap_size={int(_setting(config, 'SQLITE_MMAP_SIZE'))}")
+    db.execute(f"PRAGMA cache_size={int(_setting(config, 'SQLITE_CACHE_SIZE'))}")
+    db.execute(f"PRAGMA foreign_keys={'ON' if _setting(config, 'SQLITE_FOREIGN_KEYS') else 'OFF'}")
     return db
 
-def close_connection(exception):
-    db = getattr(g, '_database', None)
-    if db is not None:
-        db.close()
 
-def init_db():
-    with sqlite3.connect(DATABASE) as db:
-        with open('schema.sql', mode='r') as f:
-            db.cursor().executescript(f.read())
-        db.commit()
-    print("Initialized the database.")
+def begin_immediate(db):
+    """Take the write lock now, before reads that decide a write.
+
+    sqlite3 only opens its implicit transaction at the first write, so a
+    plain SELECT ahead of an UPDATE can read a row another request is
+    about to change. No-op when a transaction is already open.
+    """
+    if not db.in_transaction:
+        db.execute('BEGIN IMMEDIATE')
+
+
+class ConnectionPool:
+    """Small bounded pool of tuned connections shared by a worker's threads.
+
+    Connections are handed to one request at a time; anything beyond
+    `size` idle connections is closed on release instead of kept, as is
+    every connection released after close().
+    """
+
+    def __init__(self, path, config=None):
+        self.path = path
+        self.config = dict(config or {})
+        self.closed = False
+        self._idle = queue.LifoQueue(maxsize=max(int(_setting(self.config, 'SQLITE_POOL_SIZE')), 1))
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return connect(self.path, self.config, check_same_thread=False)
+
+    def release(self, db):
+        if db.in_transaction:
+            db.rollback()
+        db.set_trace_callback(None)
+        if self.closed:
+            db.close()
+            return
+        try:
+            self._idle.put_nowait(db)
+        except queue.Full:
+            db.close()
+
+    def close(self):
+        self.closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+# Paths already brought up to date by this process
+_schema_ready = set()
+_schema_lock = threading.Lock()
+
+def ensure_schema(path=DATABASE, config=None):
+    """Apply any pending migrations to path, once per process.
+
+    The web app calls this from create_app() instead of on import; a
+    database already at the newest version costs one version read, and
+    later calls for the same path return without connecting.
+    """
+    if path in _schema_ready:
+        return []
+    with _schema_lock:
+        if path in _schema_ready:
+            return []
+        db = connect(path, config)
+        try:
+            applied = migrate(db) if current_version(db) < MIGRATIONS[-1][0] else []
+        finally:
+            db.close()
+        _schema_ready.add(path)
+    return applied
+
+def init_db(path=DATABASE):
+    db = connect(path)
+    try:
+        applied = migrate(db)
+    finally:
+        db.close()
+    print(f"Initialized the database ({len(applied)} migration(s) applied).")
@@ -0,0 +1,137 @@
+"""Day-view payloads (the date modal, the scheduler, the calendar side panel).
+
+One grouped aggregate gives every requested day's done/total counts; row
+lists are only fetched for the sections a caller asks for, with one query
+per list however many dates are requested.
+"""
+from migrations import ACTIVITY_SOURCES
+
+MAX_DATES = 31
+
+# (section, list) -> (table, date column, columns sent to the client)
+LISTS = {
+    ('physical', 'checklist'): ('nutrition_checklist', 'entry_date', 'id, item_label, item_type, is_checked'),
+    ('physical', 'goals'): ('physical_goals', 'goal_date',
+                            'id, goal_title, goal_category, goal_deadline, goal_notes, completed_count, total_count'),
+    ('physical', 'reminders'): ('reminders', 'reminder_date', 'id, title, is_done'),
+    ('physical', 'tasks_list'): ('tasks', 'task_date', 'id, title, is_completed'),
+    ('profession', 'tasks_list'): ('profession_tasks', 'task_date', 'id, title, is_completed, created_at'),
+}
+
+SECTIONS = ('overview', 'physical', 'profession', 'user')
+
+PROFILE_FIELDS = ('height', 'weight', 'blood_group', 'bmi')
+
+
+def completion_pct(done, total):
+    """Completion percentage, rounded half-up the same way the SQL deltas round"""
+    return int(done * 100 / total + 0.5) if total else 0
+
+
+def parse_fields(value):
+    """fields= query value -> {section: set of lists}; None means everything.
+
+    'physical' selects the section with all its lists, 'physical.goals'
+    the section's stats plus one list, 'physical.stats' the stats alone.
+    """
+    if not value:
+        return None
+    fields = {}
+    for name in value.split(','):
+        section, _, part = name.strip().partition('.')
+        if section not in SECTIONS:
+            raise ValueError(f'Unknown field {name!r}')
+        lists = fields.setdefault(section, set())
+        if not part:
+            lists.update(l for s, l in LISTS if s == section)
+        elif part != 'stats':
+            if (section, part) not in LISTS:
+                raise ValueError(f'Unknown field {name!r}')
+            lists.add(part)
+    return fields
+
+
+def project(payload, fields):
+    """Cut a full payload down to a parse_fields() selection"""
+    if fields is None:
+        return payload
+    out = {k: payload[k] for k in ('date', 'not_initiated', 'combined')}
+    for section, lists in fields.items():
+        if section in ('overview', 'user'):
+            out[section] = payload[section]
+        else:
+            out[section] = {k: v for k, v in payload[section].items() if (section, k) not in LISTS or k in lists}
+    return out
+
+
+def _in(values):
+    return ', '.join('?' * len(values))
+
+
+def day_counts(db, uid, dates):
+    """{date: (phys_done, phys_total, prof_done, prof_total)} from one grouped query"""
+    parts, params = [], []
+    for table, date_col, done, total, bucket in ACTIVITY_SOURCES:
+        if bucket == 'physical':
+            cols = f'{done} AS pd, {total} AS pt, 0 AS qd, 0 AS qt'
+        else:
+            cols = f'0 AS pd, 0 AS pt, {done} AS qd, {total} AS qt'
+        parts.append(f'SELECT {date_col} AS day, {cols} FROM {table} '
+                     f'WHERE user_id = ? AND {date_col} IN ({_in(dates)})')
+        params += [uid, *dates]
+    counts = {d: (0, 0, 0, 0) for d in dates}
+    rows = db.execute(f"SELECT day, SUM(pd), SUM(pt), SUM(qd), SUM(qt) FROM ({' UNION ALL '.join(parts)}) "
+                      f"GROUP BY day", params)
+    for row in rows:
+        counts[row[0]] = tuple(row[1:])
+    return counts
+
+
+def _lists(db, uid, dates, wanted):
+    """{(section, list): {date: [row dicts]}} for the wanted lists, one query each"""
+    out = {}
+    for key in wanted:
+        table, date_col, columns = LISTS[key]
+        by_day = out[key] = {d: [] for d in dates}
+        rows = db.execute(f'SELECT {date_col} AS day, {columns} FROM {table} '
+                          f'WHERE user_id = ? AND {date_col} IN ({_in(dates)}) ORDER BY id', [uid, *dates])
+        for row in rows:
+            item = dict(row)
+            by_day[item.pop('day')].append(item)
+    return out
+
+
+def build_day_views(db, uid, dates, fields=None, profile=None):
+    """{date: payload} for each ISO date, limited to `fields` (see parse_fields)"""
+    sections = SECTIONS if fields is None else fields
+    wanted = [key for key in LISTS if fields is None or key[1] in fields.get(key[0], ())]
+    counts = day_counts(db, uid, dates)
+    lists = _lists(db, uid, dates, wanted)
+    notes = {}
+    if 'overview' in sections:
+        notes = dict(db.execute(f'SELECT entry_date, day_note FROM daily_activity '
+                                f'WHERE user_id = ? AND entry_date IN ({_in(dates)})', [uid, *dates]).fetchall())
+
+    views = {}
+    for day in dates:
+        phys_done, phys_total, prof_done, prof_total = counts[day]
+        phys_pct = completion_pct(phys_done, phys_total)
+        prof_pct = completion_pct(prof_done, prof_total)
+        view = {'date': day, 'not_initiated': False, 'combined': round((phys_pct + prof_pct) / 2)}
+        if 'overview' in sections:
+            view['overview'] = {
+                'physical_completion_pct': phys_pct,
+                'profession_completion_pct': prof_pct,
+                'total_points': phys_done + prof_done,
+                'day_note': notes.get(day),
+            }
+        if 'physical' in sections:
+            view['physical'] = {'percentage': phys_pct, 'phys_done': phys_done, 'phys_total': phys_total}
+        if 'profession' in sections:
+            view['profession'] = {'tasks_total': prof_total, 'tasks_done': prof_done, 'percentage': prof_pct}
+        for (section, name), by_day in lists.items():
+            view[section][name] = by_day[day]
+        if 'user' in sections:
+            view['user'] = {k: (profile or {}).get(k) for k in PROFILE_FIELDS}
+        views[day] = view
+    return views
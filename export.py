@@ -0,0 +1,181 @@
+"""Stream a user's full history as NDJSON or CSV.
+
+    python export.py --user ID|--username NAME [--format ndjson|csv] [--tables tasks,reminders]
+                     [--since YYYY-MM-DD] [--until YYYY-MM-DD] [--gzip] [--out PATH] [--db neri.db]
+
+Rows are read through a cursor in FETCH_ROWS batches and written out as
+they arrive, so memory stays flat however long the history is. All
+tables are read inside one read transaction and see the same snapshot.
+NDJSON puts every table in one stream, one {"table": ..., ...} object
+per line; CSV is one file per table (--out is then a directory).
+/api/export in app.py serves the same generators.
+"""
+import io
+import os
+import sys
+import csv
+import json
+import zlib
+import argparse
+import datetime
+
+FETCH_ROWS = 500
+
+# table -> date column, in export order
+EXPORT_TABLES = {
+    'daily_activity': 'entry_date',
+    'daily_physical': 'entry_date',
+    'nutrition_checklist': 'entry_date',
+    'tasks': 'task_date',
+    'reminders': 'reminder_date',
+    'physical_goals': 'goal_date',
+    'profession_tasks': 'task_date',
+}
+
+FORMATS = ('ndjson', 'csv')
+
+
+def parse_tables(value):
+    """Comma-separated table names -> list in export order; None/'' means all"""
+    if not value:
+        return list(EXPORT_TABLES)
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in names if name not in EXPORT_TABLES]
+    if unknown:
+        raise ValueError(f"Unknown table {unknown[0]!r}")
+    return [name for name in EXPORT_TABLES if name in names]
+
+
+def columns(db, table):
+    """Exported columns of table: everything but user_id"""
+    return [row[1] for row in db.execute(f'PRAGMA table_info({table})') if row[1] != 'user_id']
+
+
+def iter_rows(db, uid, table, since=None, until=None):
+    """Yield lists of row tuples for uid, FETCH_ROWS at a time, in date order"""
+    date_col = EXPORT_TABLES[table]
+    clauses, params = ['user_id = ?'], [uid]
+    if since:
+        clauses.append(f'{date_col} >= ?')
+        params.append(since)
+    if until:
+        clauses.append(f'{date_col} <= ?')
+        params.append(until)
+    cursor = db.execute(f"SELECT {', '.join(columns(db, table))} FROM {table} "
+                        f"WHERE {' AND '.join(clauses)} ORDER BY {date_col}, id", params)
+    cursor.arraysize = FETCH_ROWS
+    while True:
+        batch = cursor.fetchmany()
+        if not batch:
+            return
+        yield batch
+
+
+def ndjson_chunks(db, uid, tables, since=None, until=None):
+    """NDJSON text, one chunk per fetched batch"""
+    for table in tables:
+        names = columns(db, table)
+        for batch in iter_rows(db, uid, table, since, until):
+            yield ''.join(json.dumps({'table': table, **dict(zip(names, row))}, separators=(',', ':')) + '\n'
+                          for row in batch)
+
+
+def csv_chunks(db, uid, table, since=None, until=None):
+    """CSV text for one table: the header, then one chunk per fetched batch"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns(db, table))
+    for batch in iter_rows(db, uid, table, since, until):
+        writer.writerows(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def snapshot(db, chunks):
+    """Run a chunk generator inside one read transaction"""
+    db.execute('BEGIN')
+    try:
+        yield from chunks
+    finally:
+        db.rollback()
+
+
+def encode(chunks, compress=False):
+    """Text chunks -> bytes, optionally as one gzip stream"""
+    if not compress:
+        for chunk in chunks:
+            yield chunk.encode()
+        return
+    gz = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    for chunk in chunks:
+        data = gz.compress(chunk.encode())
+        if data:
+            yield data
+    yield gz.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export a user's history as NDJSON or CSV.")
+    who = parser.add_mutually_exclusive_group(required=True)
+    who.add_argument('--user', type=int, help='user id')
+    who.add_argument('--username')
+    parser.add_argument('--format', choices=FORMATS, default='ndjson')
+    parser.add_argument('--tables', help=f"comma-separated subset of: {', '.join(EXPORT_TABLES)}")
+    parser.add_argument('--since', help='YYYY-MM-DD')
+    parser.add_argument('--until', help='YYYY-MM-DD')
+    parser.add_argument('--gzip', action='store_true', help='gzip the output (CSV files get a .gz suffix)')
+    parser.add_argument('--out', help='NDJSON: file, default stdout; CSV: directory, default current')
+    parser.add_argument('--db', default='neri.db')
+    args = parser.parse_args(argv)
+
+    try:
+        tables = parse_tables(args.tables)
+        for value in (args.since, args.until):
+            if value:
+                datetime.date.fromisoformat(value)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+
+    from database import connect
+    db = connect(args.db)
+    try:
+        if args.username:
+            row = db.execute('SELECT id FROM users WHERE username = ?', (args.username,)).fetchone()
+        else:
+            row = db.execute('SELECT id FROM users WHERE id = ?', (args.user,)).fetchone()
+        if row is None:
+            print("Error: no such user")
+            return 1
+        uid = row['id']
+
+        if args.format == 'ndjson':
+            chunks = encode(snapshot(db, ndjson_chunks(db, uid, tables, args.since, args.until)), args.gzip)
+            if args.out:
+                with open(args.out, 'wb') as f:
+                    f.writelines(chunks)
+            else:
+                sys.stdout.buffer.writelines(chunks)
+            return 0
+
+        out_dir = args.out or '.'
+        os.makedirs(out_dir, exist_ok=True)
+        db.execute('BEGIN')
+        try:
+            for table in tables:
+                path = os.path.join(out_dir, f"{table}.csv{'.gz' if args.gzip else ''}")
+                with open(path, 'wb') as f:
+                    f.writelines(encode(csv_chunks(db, uid, table, args.since, args.until), args.gzip))
+                print(f"Wrote {path}", file=sys.stderr)
+        finally:
+            db.rollback()
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
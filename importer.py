@@ -0,0 +1,381 @@
+"""Bulk import of a user's history from NDJSON or CSV.
+
+    python importer.py --user ID [--format ndjson|csv] [--table TABLE] FILE [--db neri.db]
+
+The input is the export.py format: NDJSON lines of {"table": ..., column:
+value, ...}, or a CSV with a header row for a single table. Rows are
+parsed one at a time and validated. Valid rows go in with executemany,
+BATCH_ROWS rows per table at a time. The import commits every
+COMMIT_ROWS rows, so concurrent writers get the lock between chunks.
+Invalid rows are skipped and reported.
+
+daily_activity is recomputed once per affected date at the end, with
+one grouped count query per chunk of dates. It is not maintained row by
+row. Export-only columns (ids, derived counters) are ignored, so an
+export imports cleanly.
+
+ImportJobs runs imports on a background thread for /api/import.
+"""
+import io
+import os
+import csv
+import sys
+import json
+import uuid
+import queue
+import argparse
+import datetime
+import threading
+
+from analytics import refresh_streaks
+from day_view import day_counts, completion_pct
+from migrations import ACTIVITY_COUNTS_VERSION, ACTIVITY_SOURCES
+
+BATCH_ROWS = 500
+COMMIT_ROWS = 5000
+MAX_ERRORS = 50
+MAX_TEXT = 1000
+
+# Dates per day_counts() call when recomputing daily_activity
+RECOMPUTE_CHUNK = 200
+
+FORMATS = ('ndjson', 'csv')
+
+# Default for a missing created_at: the time of the import, as CURRENT_TIMESTAMP would give
+NOW = object()
+
+# table -> (date column, {column: (kind, default)}); a default of None marks a required column
+IMPORT_TABLES = {
+    'tasks': ('task_date', {
+        'title': ('text', None), 'task_date': ('date', None), 'is_completed': ('bool', 0)}),
+    'profession_tasks': ('task_date', {
+        'title': ('text', None), 'task_date': ('date', None), 'is_completed': ('bool', 0),
+        'created_at': ('timestamp', NOW)}),
+    # Undated reminders (shown every day) export with an empty reminder_date
+    'reminders': ('reminder_date', {
+        'title': ('text', None), 'reminder_date': ('date', ''), 'is_done': ('bool', 0),
+        'created_at': ('timestamp', NOW)}),
+    'physical_goals': ('goal_date', {
+        'goal_title': ('text', None), 'goal_date': ('date', None), 'goal_category': ('text', 'general'),
+        'goal_deadline': ('time', ''), 'goal_notes': ('text', ''), 'completed_count': ('int', 0),
+        'total_count': ('int', 1)}),
+    'nutrition_checklist': ('entry_date', {
+        'item_label': ('text', None), 'item_type': ('text', None), 'entry_date': ('date', None),
+        'is_checked': ('bool', 0)}),
+    # One row per day: an imported day replaces the stored one
+    'daily_physical': ('entry_date', {
+        'entry_date': ('date', None), 'water_intake_liters': ('float', 0.0), 'protein_intake_grams': ('float', 0.0),
+        'food_log': ('text', '')}),
+    # Only the note; the counters are recomputed
+    'daily_activity': ('entry_date', {
+        'entry_date': ('date', None), 'day_note': ('text', '')}),
+}
+
+# Written by export.py but assigned or derived here
+IGNORED_COLUMNS = {'table', 'id', 'user_id', 'created_at', 'updated_at', 'counts_version',
+                   'physical_points', 'profession_points', 'total_points', 'physical_total_count',
+                   'profession_total_count', 'physical_completion_pct', 'profession_completion_pct'}
+
+# Tables whose rows feed daily_activity's counters (the note table creates the row)
+COUNTED_TABLES = {table for table, *_ in ACTIVITY_SOURCES} | {'daily_activity'}
+
+# Tables with one row per user and day; an imported row updates it in place
+UPSERT_KEYS = {'daily_physical': ('user_id', 'entry_date'), 'daily_activity': ('user_id', 'entry_date')}
+
+ACTIVITY_UPSERT_SQL = '''
+    INSERT INTO daily_activity (user_id, entry_date, physical_points, physical_total_count,
+                                profession_points, profession_total_count, total_points,
+                                physical_completion_pct, profession_completion_pct, counts_version)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(user_id, entry_date) DO UPDATE SET
+        physical_points=excluded.physical_points, physical_total_count=excluded.physical_total_count,
+        profession_points=excluded.profession_points, profession_total_count=excluded.profession_total_count,
+        total_points=excluded.total_points, physical_completion_pct=excluded.physical_completion_pct,
+        profession_completion_pct=excluded.profession_completion_pct, counts_version=excluded.counts_version'''
+
+
+# ── Parsing and validation ───────────────────────────────────────────────────
+_TRUE = {'1', 'true', 'yes', 'y', 't'}
+_FALSE = {'0', 'false', 'no', 'n', 'f'}
+
+def _coerce(kind, value):
+    if kind == 'text':
+        text = str(value).strip()
+        if len(text) > MAX_TEXT:
+            raise ValueError(f'longer than {MAX_TEXT} characters')
+        return text
+    if kind == 'date':
+        return datetime.date.fromisoformat(str(value).strip()).isoformat()
+    if kind == 'timestamp':
+        return datetime.datetime.fromisoformat(str(value).strip()).strftime('%Y-%m-%d %H:%M:%S')
+    if kind == 'time':
+        return datetime.time.fromisoformat(str(value).strip()).strftime('%H:%M')
+    if kind == 'bool':
+        if isinstance(value, bool) or value in (0, 1):
+            return int(value)
+        text = str(value).strip().lower()
+        if text in _TRUE:
+            return 1
+        if text in _FALSE:
+            return 0
+        raise ValueError('not a boolean')
+    if kind == 'int':
+        number = float(value)
+        if not number.is_integer() or number < 0:
+            raise ValueError('not a whole number')
+        return int(number)
+    if kind == 'float':
+        return float(value)
+    raise ValueError(f'unknown kind {kind}')
+
+
+def validate(table, record):
+    """Import record -> tuple of column values in IMPORT_TABLES order; raises ValueError"""
+    spec = IMPORT_TABLES.get(table)
+    if spec is None:
+        raise ValueError(f'unknown table {table!r}')
+    if not isinstance(record, dict):
+        raise ValueError('row is not an object')
+    unknown = [k for k in record if k not in spec[1] and k not in IGNORED_COLUMNS]
+    if unknown:
+        raise ValueError(f'unknown column {unknown[0]!r} for {table}')
+    values = []
+    for column, (kind, default) in spec[1].items():
+        value = record.get(column)
+        if value is None or value == '':
+            if default is None:
+                raise ValueError(f'{column} is required')
+            if default is NOW:
+                default = datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+            # '' defaults are stored as NULL, like the add endpoints do
+            values.append(None if default == '' else default)
+            continue
+        try:
+            values.append(_coerce(kind, value))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f'{column}: {e}') from None
+    return tuple(values)
+
+
+def read_ndjson(stream):
+    """Binary stream -> (line number, table, record); bad lines give an exception as the record"""
+    for line_no, raw in enumerate(stream, 1):
+        line = raw.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield line_no, None, ValueError('invalid JSON')
+            continue
+        yield line_no, record.get('table') if isinstance(record, dict) else None, record
+
+
+def read_csv(stream, table):
+    """Binary CSV stream for one table -> (line number, table, record)"""
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+    for record in reader:
+        if None in record:
+            yield reader.line_num, table, ValueError('more fields than the header')
+            continue
+        yield reader.line_num, table, record
+
+
+# ── Writing ──────────────────────────────────────────────────────────────────
+def insert_sql(table):
+    columns = ['user_id', *IMPORT_TABLES[table][1]]
+    sql = (f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})")
+    key = UPSERT_KEYS.get(table)
+    if key:
+        sql += (f" ON CONFLICT({', '.join(key)}) DO UPDATE SET "
+                + ', '.join(f'{c}=excluded.{c}' for c in columns if c not in key))
+    return sql
+
+
+def recompute_days(db, uid, days):
+    """Rewrite daily_activity's counters for uid on each of days (no commit)"""
+    days = sorted(days)
+    for start in range(0, len(days), RECOMPUTE_CHUNK):
+        counts = day_counts(db, uid, days[start:start + RECOMPUTE_CHUNK])
+        db.executemany(ACTIVITY_UPSERT_SQL, [
+            (uid, day, pd, pt, qd, qt, pd + qd, completion_pct(pd, pt), completion_pct(qd, qt),
+             ACTIVITY_COUNTS_VERSION)
+            for day, (pd, pt, qd, qt) in counts.items()])
+    refresh_streaks(db, uid)
+    return len(days)
+
+
+def import_rows(db, uid, rows, progress=None):
+    """Validate and insert (line number, table, record) rows for uid.
+
+    Returns a summary dict. progress(summary) is called after each
+    committed chunk. Rows committed before a database error stay, and
+    their days are still recomputed.
+    """
+    summary = {'rows_read': 0, 'rows_imported': 0, 'rows_rejected': 0, 'tables': {}, 'errors': [],
+               'days_recomputed': 0}
+    pending = {table: [] for table in IMPORT_TABLES}
+    pending_days, days = set(), set()
+    uncommitted = 0
+
+    def flush(table):
+        batch = pending[table]
+        if batch:
+            db.executemany(insert_sql(table), batch)
+            summary['tables'][table] = summary['tables'].get(table, 0) + len(batch)
+            summary['rows_imported'] += len(batch)
+            batch.clear()
+
+    def commit():
+        for table in pending:
+            flush(table)
+        db.commit()
+        days.update(pending_days)
+        pending_days.clear()
+        if progress:
+            progress(summary)
+
+    try:
+        for line_no, table, record in rows:
+            summary['rows_read'] += 1
+            try:
+                if isinstance(record, Exception):
+                    raise record
+                values = validate(table, record)
+            except ValueError as e:
+                summary['rows_rejected'] += 1
+                if len(summary['errors']) < MAX_ERRORS:
+                    summary['errors'].append({'line': line_no, 'error': str(e)})
+                continue
+            pending[table].append((uid, *values))
+            if table in COUNTED_TABLES:
+                date_col, spec = IMPORT_TABLES[table]
+                day = values[list(spec).index(date_col)]
+                if day:
+                    pending_days.add(day)
+            if len(pending[table]) >= BATCH_ROWS:
+                flush(table)
+            uncommitted += 1
+            if uncommitted >= COMMIT_ROWS:
+                commit()
+                uncommitted = 0
+        commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        if days:
+            summary['days_recomputed'] = recompute_days(db, uid, days)
+            db.commit()
+    return summary
+
+
+# ── Background jobs ──────────────────────────────────────────────────────────
+class ImportJobs:
+    """Imports queued from the web app, run one at a time on a daemon thread.
+
+    `connect` returns a new connection for each job; `on_done(uid)` runs
+    after every job (the app drops the user's cached payloads). Finished
+    jobs are kept in memory, the newest `keep` of them.
+    """
+
+    def __init__(self, connect, on_done=None, keep=200):
+        self.connect = connect
+        self.on_done = on_done
+        self.keep = keep
+        self._jobs = {}
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, uid, path, fmt, table=None, size=0):
+        """Queue an import of the file at path (deleted once read); returns the job"""
+        job = {'id': uuid.uuid4().hex, 'user_id': uid, 'state': 'queued', 'format': fmt, 'table': table,
+               'bytes': size, 'created': datetime.datetime.now().isoformat(timespec='seconds'),
+               'started': None, 'finished': None, 'error': None,
+               'rows_read': 0, 'rows_imported': 0, 'rows_rejected': 0, 'tables': {}, 'errors': [],
+               'days_recomputed': 0}
+        with self._lock:
+            self._jobs[job['id']] = job
+            while len(self._jobs) > self.keep:
+                oldest = next(iter(self._jobs))
+                if self._jobs[oldest]['state'] in ('queued', 'running'):
+                    break
+                del self._jobs[oldest]
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='import', daemon=True)
+                self._thread.start()
+        self._queue.put((job['id'], path))
+        return self.get(job['id'])
+
+    def get(self, job_id):
+        """Copy of the job's current state, or None"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return json.loads(json.dumps(job)) if job else None
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            self._jobs[job_id].update(fields)
+
+    def run_job(self, job_id, path):
+        job = self.get(job_id)
+        self._update(job_id, state='running', started=datetime.datetime.now().isoformat(timespec='seconds'))
+        progress = lambda summary: self._update(job_id, **json.loads(json.dumps(summary)))
+        try:
+            db = self.connect()
+            try:
+                with open(path, 'rb') as f:
+                    rows = read_csv(f, job['table']) if job['format'] == 'csv' else read_ndjson(f)
+                    summary = import_rows(db, job['user_id'], rows, progress)
+            finally:
+                db.close()
+            self._update(job_id, state='done', **summary)
+        except Exception as e:
+            self._update(job_id, state='failed', error=str(e))
+        finally:
+            self._update(job_id, finished=datetime.datetime.now().isoformat(timespec='seconds'))
+            os.remove(path)
+            if self.on_done:
+                self.on_done(job['user_id'])
+
+    def _run(self):
+        while True:
+            job_id, path = self._queue.get()
+            self.run_job(job_id, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import a user's history from NDJSON or CSV.")
+    parser.add_argument('file')
+    parser.add_argument('--user', type=int, required=True, help='user id')
+    parser.add_argument('--format', choices=FORMATS, default='ndjson')
+    parser.add_argument('--table', choices=list(IMPORT_TABLES), help='table a CSV file holds')
+    parser.add_argument('--db', default='neri.db')
+    args = parser.parse_args(argv)
+    if args.format == 'csv' and not args.table:
+        print("Error: --table is required for CSV")
+        return 1
+
+    from database import connect
+    db = connect(args.db)
+    try:
+        if db.execute('SELECT 1 FROM users WHERE id = ?', (args.user,)).fetchone() is None:
+            print("Error: no such user")
+            return 1
+        with open(args.file, 'rb') as f:
+            rows = read_csv(f, args.table) if args.format == 'csv' else read_ndjson(f)
+            summary = import_rows(db, args.user, rows,
+                                  progress=lambda s: print(f"  {s['rows_imported']} rows imported", file=sys.stderr))
+    finally:
+        db.close()
+    for error in summary['errors']:
+        print(f"  line {error['line']}: {error['error']}")
+    print(f"Imported {summary['rows_imported']} of {summary['rows_read']} rows "
+          f"({summary['rows_rejected']} rejected), recomputed {summary['days_recomputed']} days: "
+          + ', '.join(f"{n} {table}" for table, n in summary['tables'].items()))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
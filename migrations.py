@@ -0,0 +1,398 @@
+import os
+import sqlite3
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schema.sql')
+
+# Stamped on daily_activity rows whose counters were computed from the source
+# tables by the current rules; bump it when those rules change so readers
+# recompute older rows instead of trusting them.
+ACTIVITY_COUNTS_VERSION = 1
+
+# What a day's counters count: (table, date column, done expression, total expression, bucket)
+ACTIVITY_SOURCES = [
+    ('nutrition_checklist', 'entry_date', 'CASE WHEN is_checked THEN 1 ELSE 0 END', '1', 'physical'),
+    ('tasks', 'task_date', 'CASE WHEN is_completed THEN 1 ELSE 0 END', '1', 'physical'),
+    ('reminders', 'reminder_date', 'CASE WHEN is_done THEN 1 ELSE 0 END', '1', 'physical'),
+    ('physical_goals', 'goal_date', 'COALESCE(completed_count, 0)', 'COALESCE(total_count, 0)', 'physical'),
+    ('profession_tasks', 'task_date', 'CASE WHEN is_completed THEN 1 ELSE 0 END', '1', 'profession'),
+]
+
+# A day counts toward a streak once it has this many completed items
+ACTIVE_DAY_MIN_POINTS = 1
+
+# Per-user rollups of daily_activity: table -> (period column, period of a date expression)
+ACTIVITY_ROLLUPS = {
+    'weekly_activity': ('week_start', "date({date}, 'weekday 0', '-6 days')"),  # the Monday
+    'monthly_activity': ('month', "strftime('%Y-%m', {date})"),
+    'yearly_activity': ('year', "strftime('%Y', {date})"),
+}
+
+# Rollup column -> the daily_activity column it sums; every rollup also
+# counts its days and active days
+ROLLUP_SUMS = {
+    'physical_points': 'physical_points',
+    'physical_total_count': 'physical_total_count',
+    'profession_points': 'profession_points',
+    'profession_total_count': 'profession_total_count',
+    'total_points': 'total_points',
+    'physical_pct_sum': 'physical_completion_pct',
+    'profession_pct_sum': 'profession_completion_pct',
+}
+
+def rollup_terms(row=''):
+    """Rollup column -> what one daily_activity row adds to it; row is '', 'NEW.' or 'OLD.'"""
+    terms = {'days': '1', 'active_days': f'COALESCE({row}total_points, 0) >= {ACTIVE_DAY_MIN_POINTS}'}
+    terms.update({c: f'COALESCE({row}{source}, 0)' for c, source in ROLLUP_SUMS.items()})
+    return terms
+
+def rollup_sql(table, where='1'):
+    """SELECT computing table's rows from daily_activity, in the table's column order"""
+    period, expr = ACTIVITY_ROLLUPS[table]
+    key = expr.format(date='entry_date')
+    sums = ', '.join(f'SUM({term}) AS {c}' for c, term in rollup_terms().items())
+    return f'SELECT user_id, {key} AS {period}, {sums} FROM daily_activity WHERE {where} GROUP BY user_id, {key}'
+
+# A profession task counted in profession_stats.completed_count
+PROFESSION_DONE = 'is_completed IS 1'
+
+# Tables the cached calendar payloads are built from, with the column
+# naming the owning user; every write bumps that user's user_data_version
+# (migration 9), which the web workers check before serving a cached copy
+DATA_VERSION_SOURCES = {table: 'user_id' for table, *_ in ACTIVITY_SOURCES}
+DATA_VERSION_SOURCES.update({'daily_activity': 'user_id', 'users': 'id'})
+
+# The dated ones among them, with their date column: since migration 10 a
+# write to these bumps only the (user, month) it lands in, so a change
+# today leaves the cached payloads of other months valid. users keeps the
+# per-user stamp, as the profile shows on every day.
+MONTH_VERSION_SOURCES = {table: date_col for table, date_col, *_ in ACTIVITY_SOURCES}
+MONTH_VERSION_SOURCES['daily_activity'] = 'entry_date'
+
+# ── Migration steps ──────────────────────────────────────────────────────────
+# Each step must be idempotent: it may run against a database that already
+# has the change applied by hand (e.g. the old migrate_profession_date.py).
+
+def _baseline(db):
+    with open(SCHEMA_PATH, 'r') as f:
+        db.executescript(f.read())
+
+def _profession_task_date(db):
+    cols = [r[1] for r in db.execute('PRAGMA table_info(profession_tasks)').fetchall()]
+    if 'task_date' not in cols:
+        db.execute('ALTER TABLE profession_tasks ADD COLUMN task_date DATE')
+    # created_at is like '2026-02-25 04:43:17'
+    db.execute("UPDATE profession_tasks SET task_date = COALESCE(substr(created_at, 1, 10), date('now')) "
+               "WHERE task_date IS NULL")
+
+def _per_user_date_indexes(db):
+    # Every hot query filters on (user_id, <date column>); the trailing
+    # status columns make the per-day counting queries index-only.
+    db.execute('CREATE INDEX IF NOT EXISTS idx_tasks_user_date '
+               'ON tasks (user_id, task_date, is_completed)')
+    db.execute('CREATE INDEX IF NOT EXISTS idx_nutrition_checklist_user_date '
+               'ON nutrition_checklist (user_id, entry_date, is_checked)')
+    db.execute('CREATE INDEX IF NOT EXISTS idx_reminders_user_date '
+               'ON reminders (user_id, reminder_date, is_done)')
+    db.execute('CREATE INDEX IF NOT EXISTS idx_physical_goals_user_date '
+               'ON physical_goals (user_id, goal_date, completed_count, total_count)')
+    db.execute('CREATE INDEX IF NOT EXISTS idx_profession_tasks_user_date '
+               'ON profession_tasks (user_id, task_date, is_completed)')
+    db.execute('CREATE INDEX IF NOT EXISTS idx_profession_tasks_user_status '
+               'ON profession_tasks (user_id, is_completed, created_at)')
+    db.execute('CREATE INDEX IF NOT EXISTS idx_profession_stats_user '
+               'ON profession_stats (user_id)')
+
+def _daily_quotes(db):
+    # Last good quote per day, so a restarted worker doesn't wait on the quote API
+    db.execute('''CREATE TABLE IF NOT EXISTS daily_quotes (
+                      quote_date DATE PRIMARY KEY,
+                      quote TEXT NOT NULL,
+                      author TEXT,
+                      fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+
+def _activity_counts_version(db):
+    # Existing rows start at 0, i.e. stale until the next full recompute
+    cols = [r[1] for r in db.execute('PRAGMA table_info(daily_activity)').fetchall()]
+    if 'counts_version' not in cols:
+        db.execute('ALTER TABLE daily_activity ADD COLUMN counts_version INTEGER NOT NULL DEFAULT 0')
+
+def _activity_summaries(db):
+    # Per-weekday sums and the streak bookkeeping behind analytics.py, kept
+    # current by triggers so every writer (app, scripts, imports) updates them
+    db.execute('''CREATE TABLE IF NOT EXISTS activity_weekday (
+                      user_id INTEGER NOT NULL,
+                      weekday INTEGER NOT NULL,            -- strftime('%w'): 0 = Sunday
+                      days INTEGER NOT NULL DEFAULT 0,
+                      active_days INTEGER NOT NULL DEFAULT 0,
+                      physical_pct_sum INTEGER NOT NULL DEFAULT 0,
+                      profession_pct_sum INTEGER NOT NULL DEFAULT 0,
+                      points_sum INTEGER NOT NULL DEFAULT 0,
+                      PRIMARY KEY (user_id, weekday)) WITHOUT ROWID''')
+    db.execute('''CREATE TABLE IF NOT EXISTS activity_streaks (
+                      user_id INTEGER PRIMARY KEY,
+                      dirty_from DATE,                     -- earliest day whose active state changed
+                      changes INTEGER NOT NULL DEFAULT 0,  -- bumped with dirty_from, guards refreshes
+                      latest_start DATE,
+                      latest_end DATE,
+                      longest_start DATE,
+                      longest_end DATE,
+                      longest_len INTEGER NOT NULL DEFAULT 0)''')
+
+    def add_day(row, sign):
+        """Statements adding (sign=1) or removing (sign=-1) a NEW/OLD row from activity_weekday"""
+        return f'''
+            INSERT INTO activity_weekday (user_id, weekday) VALUES ({row}.user_id, strftime('%w', {row}.entry_date))
+            ON CONFLICT(user_id, weekday) DO NOTHING;
+            UPDATE activity_weekday SET
+                days = days + {sign},
+                active_days = active_days + {sign} * ({row}.total_points >= {ACTIVE_DAY_MIN_POINTS}),
+                physical_pct_sum = physical_pct_sum + {sign} * {row}.physical_completion_pct,
+                profession_pct_sum = profession_pct_sum + {sign} * {row}.profession_completion_pct,
+                points_sum = points_sum + {sign} * {row}.total_points
+             WHERE user_id = {row}.user_id AND weekday = strftime('%w', {row}.entry_date);'''
+
+    def mark_dirty(row, condition):
+        return f'''
+            INSERT INTO activity_streaks (user_id, dirty_from, changes)
+            SELECT {row}.user_id, {row}.entry_date, 1 WHERE {condition}
+            ON CONFLICT(user_id) DO UPDATE SET
+                changes = changes + 1,
+                dirty_from = MIN(COALESCE(dirty_from, excluded.dirty_from), excluded.dirty_from);'''
+
+    def active(row):
+        return f'{row}.total_points >= {ACTIVE_DAY_MIN_POINTS}'
+
+    db.execute(f'''CREATE TRIGGER IF NOT EXISTS daily_activity_summary_insert
+                   AFTER INSERT ON daily_activity
+                   BEGIN {add_day('NEW', 1)} {mark_dirty('NEW', active('NEW'))} END''')
+    db.execute(f'''CREATE TRIGGER IF NOT EXISTS daily_activity_summary_update
+                   AFTER UPDATE OF total_points, physical_completion_pct, profession_completion_pct
+                   ON daily_activity
+                   WHEN OLD.total_points IS NOT NEW.total_points
+                     OR OLD.physical_completion_pct IS NOT NEW.physical_completion_pct
+                     OR OLD.profession_completion_pct IS NOT NEW.profession_completion_pct
+                   BEGIN {add_day('OLD', -1)} {add_day('NEW', 1)}
+                         {mark_dirty('NEW', f"({active('OLD')}) != ({active('NEW')})")} END''')
+    db.execute(f'''CREATE TRIGGER IF NOT EXISTS daily_activity_summary_delete
+                   AFTER DELETE ON daily_activity
+                   BEGIN {add_day('OLD', -1)} {mark_dirty('OLD', active('OLD'))} END''')
+
+    # Backfill; streaks start dirty from each user's first day, so the first read computes them
+    db.execute(f'''INSERT OR IGNORE INTO activity_weekday (user_id, weekday, days, active_days, physical_pct_sum,
+                                                          profession_pct_sum, points_sum)
+                   SELECT user_id, strftime('%w', entry_date), COUNT(*),
+                          SUM(total_points >= {ACTIVE_DAY_MIN_POINTS}), SUM(physical_completion_pct),
+                          SUM(profession_completion_pct), SUM(total_points)
+                     FROM daily_activity GROUP BY user_id, strftime('%w', entry_date)''')
+    db.execute('''INSERT OR IGNORE INTO activity_streaks (user_id, dirty_from, changes)
+                  SELECT user_id, MIN(entry_date), 1 FROM daily_activity GROUP BY user_id''')
+
+def _activity_rollups(db):
+    # Week/month/year sums of daily_activity, kept by triggers in the same
+    # transaction as the day write. Emptied periods are deleted, so each
+    # table always equals rollup_sql() over daily_activity (rollups.py --verify)
+    columns = list(rollup_terms())
+    for table, (period, _) in ACTIVITY_ROLLUPS.items():
+        db.execute(f'''CREATE TABLE IF NOT EXISTS {table} (
+                           user_id INTEGER NOT NULL,
+                           {period} TEXT NOT NULL,
+                           {', '.join(f'{c} INTEGER NOT NULL DEFAULT 0' for c in columns)},
+                           PRIMARY KEY (user_id, {period})) WITHOUT ROWID''')
+
+    def add_day(row, sign):
+        """Statements adding (sign=1) or removing (sign=-1) a NEW/OLD row from every rollup"""
+        sums = ', '.join(f'{c} = {c} + {sign} * ({term})' for c, term in rollup_terms(row + '.').items())
+        statements = []
+        for table, (period, expr) in ACTIVITY_ROLLUPS.items():
+            key = expr.format(date=f'{row}.entry_date')
+            statements.append(f'''
+                INSERT INTO {table} (user_id, {period}) VALUES ({row}.user_id, {key})
+                ON CONFLICT(user_id, {period}) DO NOTHING;
+                UPDATE {table} SET {sums} WHERE user_id = {row}.user_id AND {period} = {key};''')
+            if sign < 0:
+                statements.append(f'''
+                DELETE FROM {table} WHERE user_id = {row}.user_id AND {period} = {key} AND days = 0;''')
+        return ''.join(statements)
+
+    def apply_delta():
+        """Statements moving an updated row's counters from OLD to NEW within its periods"""
+        new, old = rollup_terms('NEW.'), rollup_terms('OLD.')
+        sums = ', '.join(f'{c} = {c} + ({new[c]}) - ({old[c]})' for c in new if c != 'days')
+        return ''.join(f'''
+                UPDATE {table} SET {sums}
+                 WHERE user_id = NEW.user_id AND {period} = {expr.format(date='NEW.entry_date')};'''
+                       for table, (period, expr) in ACTIVITY_ROLLUPS.items())
+
+    counters = list(ROLLUP_SUMS.values())
+    db.execute(f'''CREATE TRIGGER IF NOT EXISTS daily_activity_rollup_insert
+                   AFTER INSERT ON daily_activity
+                   BEGIN {add_day('NEW', 1)} END''')
+    db.execute(f'''CREATE TRIGGER IF NOT EXISTS daily_activity_rollup_update
+                   AFTER UPDATE OF {', '.join(counters)} ON daily_activity
+                   WHEN OLD.user_id IS NEW.user_id AND OLD.entry_date IS NEW.entry_date
+                    AND ({' OR '.join(f'OLD.{c} IS NOT NEW.{c}' for c in counters)})
+                   BEGIN {apply_delta()} END''')
+    db.execute(f'''CREATE TRIGGER IF NOT EXISTS daily_activity_rollup_move
+                   AFTER UPDATE OF user_id, entry_date ON daily_activity
+                   WHEN OLD.user_id IS NOT NEW.user_id OR OLD.entry_date IS NOT NEW.entry_date
+                   BEGIN {add_day('OLD', -1)} {add_day('NEW', 1)} END''')
+    db.execute(f'''CREATE TRIGGER IF NOT EXISTS daily_activity_rollup_delete
+                   AFTER DELETE ON daily_activity
+                   BEGIN {add_day('OLD', -1)} END''')
+
+    # Backfill
+    for table, (period, _) in ACTIVITY_ROLLUPS.items():
+        db.execute(f"DELETE FROM {table}")
+        db.execute(f"INSERT INTO {table} (user_id, {period}, {', '.join(columns)}) {rollup_sql(table)}")
+
+def _profession_stats_counters(db):
+    # completed_count / target_count follow profession_tasks through
+    # triggers, so a toggle reads two counters instead of counting the
+    # whole notebook (reconcile_stats.py repairs any drift)
+    def ensure_row(row):
+        return f'''
+            INSERT INTO profession_stats (user_id) SELECT {row}.user_id
+             WHERE NOT EXISTS (SELECT 1 FROM profession_stats WHERE user_id = {row}.user_id);'''
+
+    def bump(row, sign):
+        return f'''
+            UPDATE profession_stats SET
+                target_count = COALESCE(target_count, 0) + {sign},
+                completed_count = COALESCE(completed_count, 0) + {sign} * ({row}.{PROFESSION_DONE})
+             WHERE user_id = {row}.user_id;'''
+
+    db.execute(f'''CREATE TRIGGER IF NOT EXISTS profession_tasks_stats_insert
+                   AFTER INSERT ON profession_tasks
+                   BEGIN {ensure_row('NEW')} {bump('NEW', 1)} END''')
+    db.execute(f'''CREATE TRIGGER IF NOT EXISTS profession_tasks_stats_update
+                   AFTER UPDATE OF user_id, is_completed ON profession_tasks
+                   WHEN OLD.user_id IS NOT NEW.user_id OR (OLD.{PROFESSION_DONE}) != (NEW.{PROFESSION_DONE})
+                   BEGIN {bump('OLD', -1)} {ensure_row('NEW')} {bump('NEW', 1)} END''')
+    db.execute(f'''CREATE TRIGGER IF NOT EXISTS profession_tasks_stats_delete
+                   AFTER DELETE ON profession_tasks
+                   BEGIN {bump('OLD', -1)} END''')
+
+    # Backfill: add and delete never updated the counters, so recount everyone
+    db.execute('''INSERT INTO profession_stats (user_id)
+                  SELECT DISTINCT user_id FROM profession_tasks t
+                   WHERE NOT EXISTS (SELECT 1 FROM profession_stats s WHERE s.user_id = t.user_id)''')
+    db.execute(f'''UPDATE profession_stats SET
+                       completed_count = (SELECT COUNT(*) FROM profession_tasks t
+                                           WHERE t.user_id = profession_stats.user_id AND t.{PROFESSION_DONE}),
+                       target_count = (SELECT COUNT(*) FROM profession_tasks t
+                                        WHERE t.user_id = profession_stats.user_id)''')
+
+def _user_data_version(db):
+    # One counter per user, moved by any write to the tables the calendar
+    # payloads read, whoever makes it (another worker, the importer,
+    # recalculate_all.py, rollover.py)
+    db.execute('''CREATE TABLE IF NOT EXISTS user_data_version (
+                      user_id INTEGER PRIMARY KEY,
+                      version INTEGER NOT NULL DEFAULT 0)''')
+
+    def bump(owner):
+        return f'''
+            INSERT INTO user_data_version (user_id, version) VALUES ({owner}, 1)
+            ON CONFLICT(user_id) DO UPDATE SET version = version + 1;'''
+
+    for table, column in DATA_VERSION_SOURCES.items():
+        db.execute(f'''CREATE TRIGGER IF NOT EXISTS {table}_data_version_insert
+                       AFTER INSERT ON {table}
+                       BEGIN {bump(f'NEW.{column}')} END''')
+        db.execute(f'''CREATE TRIGGER IF NOT EXISTS {table}_data_version_update
+                       AFTER UPDATE ON {table}
+                       BEGIN {bump(f'NEW.{column}')} END''')
+        db.execute(f'''CREATE TRIGGER IF NOT EXISTS {table}_data_version_move
+                       AFTER UPDATE OF {column} ON {table}
+                       WHEN OLD.{column} IS NOT NEW.{column}
+                       BEGIN {bump(f'OLD.{column}')} END''')
+        db.execute(f'''CREATE TRIGGER IF NOT EXISTS {table}_data_version_delete
+                       AFTER DELETE ON {table}
+                       BEGIN {bump(f'OLD.{column}')} END''')
+
+def _month_data_version(db):
+    db.execute('''CREATE TABLE IF NOT EXISTS month_data_version (
+                      user_id INTEGER NOT NULL,
+                      ym TEXT NOT NULL,
+                      version INTEGER NOT NULL DEFAULT 0,
+                      PRIMARY KEY (user_id, ym)) WITHOUT ROWID''')
+
+    def bump(row, date_col):
+        return f'''
+            INSERT INTO month_data_version (user_id, ym, version)
+            VALUES ({row}.user_id, substr({row}.{date_col}, 1, 7), 1)
+            ON CONFLICT(user_id, ym) DO UPDATE SET version = version + 1;'''
+
+    for table, date_col in MONTH_VERSION_SOURCES.items():
+        for event in ('insert', 'update', 'move', 'delete'):
+            db.execute(f'DROP TRIGGER IF EXISTS {table}_data_version_{event}')
+        db.execute(f'''CREATE TRIGGER IF NOT EXISTS {table}_month_version_insert
+                       AFTER INSERT ON {table} WHEN NEW.{date_col} IS NOT NULL
+                       BEGIN {bump('NEW', date_col)} END''')
+        db.execute(f'''CREATE TRIGGER IF NOT EXISTS {table}_month_version_update
+                       AFTER UPDATE ON {table} WHEN NEW.{date_col} IS NOT NULL
+                       BEGIN {bump('NEW', date_col)} END''')
+        db.execute(f'''CREATE TRIGGER IF NOT EXISTS {table}_month_version_move
+                       AFTER UPDATE OF user_id, {date_col} ON {table}
+                       WHEN OLD.{date_col} IS NOT NULL
+                        AND (OLD.user_id IS NOT NEW.user_id
+                             OR substr(OLD.{date_col}, 1, 7) IS NOT substr(NEW.{date_col}, 1, 7))
+                       BEGIN {bump('OLD', date_col)} END''')
+        db.execute(f'''CREATE TRIGGER IF NOT EXISTS {table}_month_version_delete
+                       AFTER DELETE ON {table} WHEN OLD.{date_col} IS NOT NULL
+                       BEGIN {bump('OLD', date_col)} END''')
+
+MIGRATIONS = [
+    (1, 'baseline schema.sql', _baseline),
+    (2, 'profession_tasks.task_date with backfill', _profession_task_date),
+    (3, 'per-user/per-date covering indexes', _per_user_date_indexes),
+    (4, 'daily_quotes cache table', _daily_quotes),
+    (5, 'daily_activity.counts_version stamp', _activity_counts_version),
+    (6, 'activity_weekday / activity_streaks summaries with triggers', _activity_summaries),
+    (7, 'weekly / monthly / yearly activity rollups with triggers', _activity_rollups),
+    (8, 'profession_stats counters kept by triggers', _profession_stats_counters),
+    (9, 'user_data_version stamps kept by triggers', _user_data_version),
+    (10, 'per-month month_data_version stamps for dated tables', _month_data_version),
+]
+
+# ── Runner ───────────────────────────────────────────────────────────────────
+def current_version(db):
+    db.execute('''CREATE TABLE IF NOT EXISTS schema_version (
+                      version INTEGER PRIMARY KEY,
+                      description TEXT,
+                      applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+    row = db.execute('SELECT MAX(version) FROM schema_version').fetchone()
+    return row[0] or 0
+
+def migrate(db, verbose=False):
+    """Apply every migration newer than the recorded schema_version.
+
+    Each step is committed together with its schema_version row, so an
+    interrupted run resumes at the first missing version.
+    """
+    version = current_version(db)
+    db.commit()
+    applied = []
+    for number, description, step in MIGRATIONS:
+        if number <= version:
+            continue
+        if verbose:
+            print(f"Applying migration {number}: {description}")
+        step(db)
+        db.execute('INSERT INTO schema_version (version, description) VALUES (?, ?)', (number, description))
+        db.commit()
+        applied.append(number)
+    return applied
+
+def migrate_path(path, verbose=False):
+    db = sqlite3.connect(path)
+    try:
+        return migrate(db, verbose=verbose)
+    finally:
+        db.close()
+
+if __name__ == '__main__':
+    import sys
+    db_path = sys.argv[1] if len(sys.argv) > 1 else 'neri.db'
+    done = migrate_path(db_path, verbose=True)
+    print(f"{db_path}: applied {len(done)} migration(s), now at version {MIGRATIONS[-1][0]}.")
@@ -0,0 +1,60 @@
+import time
+import threading
+from collections import OrderedDict
+
+# Never handed to templates or cached
+PRIVATE_COLUMNS = ('password_hash',)
+
+
+class ProfileCache:
+    """Bounded LRU of user profiles plus the values derived from them.
+
+    Each entry is {'user': {...users row...}, 'targets': ..., 'bmi_status': ...};
+    derived values are computed once when the profile is stored. Entries
+    expire after `ttl` seconds so other worker processes pick up profile
+    edits eventually; in this process the profile endpoints call
+    invalidate() after committing. Entries are shared, treat them as read-only.
+    """
+
+    def __init__(self, max_entries=1024, ttl=300, derive=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.derive = derive
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, uid):
+        with self._lock:
+            entry = self._entries.get(uid)
+            if entry is None:
+                return None
+            if time.monotonic() - entry['stored_at'] > self.ttl:
+                del self._entries[uid]
+                return None
+            self._entries.move_to_end(uid)
+            return entry
+
+    def put(self, uid, row):
+        user = {k: row[k] for k in row.keys() if k not in PRIVATE_COLUMNS}
+        entry = {'user': user, 'stored_at': time.monotonic()}
+        if self.derive:
+            entry.update(self.derive(user))
+        if self.max_entries <= 0:
+            return entry
+        with self._lock:
+            self._entries[uid] = entry
+            self._entries.move_to_end(uid)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, uid):
+        with self._lock:
+            self._entries.pop(uid, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,131 @@
+import time
+import datetime
+import threading
+
+DEFAULT_URL = 'https://api.quotable.io/random?tags=motivational,success,technology'
+
+FALLBACK_QUOTES = [
+    {"quote": "The secret of getting ahead is getting started.", "author": "Mark Twain"},
+    {"quote": "It always seems impossible until it's done.", "author": "Nelson Mandela"},
+    {"quote": "Don't watch the clock; do what it does — keep going.", "author": "Sam Levenson"},
+    {"quote": "Success is the sum of small efforts repeated day in and day out.", "author": "Robert Collier"},
+    {"quote": "The future depends on what you do today.", "author": "Mahatma Gandhi"},
+    {"quote": "Discipline is choosing between what you want now and what you want most.", "author": "Augusta F. Kantra"},
+    {"quote": "An investment in knowledge pays the best interest.", "author": "Benjamin Franklin"},
+]
+
+
+def fallback_quote(day):
+    """A consistent fallback for the day so it doesn't change on reload"""
+    pick = FALLBACK_QUOTES[day.toordinal() % len(FALLBACK_QUOTES)]
+    return {'date': day.isoformat(), 'quote': pick['quote'], 'author': pick['author']}
+
+
+def parse_quote(data):
+    # quotable answers /random with an object and /quotes/random with a list
+    if isinstance(data, list):
+        data = data[0] if data else {}
+    if not isinstance(data, dict) or not data.get('content'):
+        raise ValueError('no quote in response')
+    return data['content'], data.get('author') or 'Unknown'
+
+
+class QuoteProvider:
+    """Daily quote fetched off the request path.
+
+    current() only reads memory: today's fetched quote if there is one,
+    otherwise today's fallback. A daemon thread fetches a new quote once
+    per day; failures back off exponentially from `min_backoff` to
+    `max_backoff` seconds before the next attempt. The last good quote
+    goes through `save` and is read back with `load` on start, so a
+    restart serves it without waiting on the network.
+    """
+
+    def __init__(self, url=DEFAULT_URL, load=None, save=None, timeout=3,
+                 poll_interval=300, min_backoff=60, max_backoff=3600):
+        self.url = url
+        self.load = load
+        self.save = save
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.backoff = 0
+        self.retry_at = 0.0
+        self.failures = 0
+        self._quote = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ── Request path ─────────────────────────────────────────────────────────
+    def current(self):
+        today = datetime.date.today()
+        quote = self._quote
+        if quote and quote['date'] == today.isoformat():
+            return quote
+        self._wake.set()
+        return fallback_quote(today)
+
+    # ── Background refresh ───────────────────────────────────────────────────
+    def start(self):
+        """Warm from storage and start the refresh thread (idempotent)"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            if self.load:
+                try:
+                    self._quote = self.load()
+                except Exception:
+                    self._quote = None
+            if not self.url:
+                self._thread = False
+                return
+            self._thread = threading.Thread(target=self._run, name='quote-provider', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=self.timeout + 1)
+
+    def due(self):
+        quote = self._quote
+        if quote and quote['date'] == datetime.date.today().isoformat():
+            return False
+        return time.monotonic() >= self.retry_at
+
+    def refresh(self):
+        """Fetch once; returns True on success. Never raises."""
+        today = datetime.date.today().isoformat()
+        try:
+            import requests
+            res = requests.get(self.url, timeout=self.timeout)
+            res.raise_for_status()
+            text, author = parse_quote(res.json())
+        except Exception:
+            self.failures += 1
+            self.backoff = min(max(self.backoff * 2, self.min_backoff), self.max_backoff)
+            self.retry_at = time.monotonic() + self.backoff
+            return False
+        self._quote = {'date': today, 'quote': text, 'author': author}
+        self.backoff = 0
+        self.retry_at = 0.0
+        if self.save:
+            try:
+                self.save(self._quote)
+            except Exception:
+                pass
+        return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self.due():
+                self.refresh()
+            wait = self.poll_interval
+            if self.retry_at:
+                wait = min(wait, max(self.retry_at - time.monotonic(), 0))
+            self._wake.wait(wait)
+            self._wake.clear()
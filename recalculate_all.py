@@ -1,50 +1,176 @@
-import sqlite3
+"""Rebuild (or verify) daily_activity for every user and day in one pass.
+
+    python recalculate_all.py [--user ID] [--since YYYY-MM-DD] [--verify] [--db neri.db]
+
+Per-day done/total counts are computed with one grouped UNION ALL
+aggregate over the source tables and upserted in chunks inside a single
+transaction. --verify reports drift without writing.
+"""
 import os
-from app import recalculate_daily_activity
-
-db_path = 'neri.db'
-if not os.path.exists(db_path):
-    print(f"Error: {db_path} not found")
-    exit(1)
-
-conn = sqlite3.connect(db_path)
-conn.row_factory = sqlite3.Row
-db = conn.cursor()
-
-# Get all unique dates from all tables
-dates = set()
-for table, col in [('tasks', 'task_date'), ('nutrition_checklist', 'entry_date'), 
-                   ('reminders', 'reminder_date'), ('physical_goals', 'goal_date'),
-                   ('profession_tasks', 'task_date'), ('daily_activity', 'entry_date')]:
+import sys
+import time
+import argparse
+import datetime
+
+from analytics import refresh_dirty_streaks
+from database import connect
+from migrations import ACTIVITY_COUNTS_VERSION, ACTIVITY_SOURCES
+
+CHUNK_ROWS = 5000
+
+COUNTER_COLUMNS = ('physical_points', 'physical_total_count', 'profession_points', 'profession_total_count',
+                   'total_points', 'physical_completion_pct', 'profession_completion_pct')
+
+
+def _scope(date_col, user_id, since, alias=''):
+    date_col = alias + date_col
+    clauses, params = [f'{date_col} IS NOT NULL'], []
+    if user_id is not None:
+        clauses.append(f'{alias}user_id = ?')
+        params.append(user_id)
+    if since:
+        clauses.append(f'{date_col} >= ?')
+        params.append(since)
+    return ' AND '.join(clauses), params
+
+
+def aggregate_sql(user_id=None, since=None):
+    """One grouped query yielding the full counter set per (user_id, day)"""
+    parts, params = [], []
+    for table, date_col, done, total, bucket in ACTIVITY_SOURCES:
+        where, p = _scope(date_col, user_id, since)
+        if bucket == 'physical':
+            cols = f'{done} AS pd, {total} AS pt, 0 AS qd, 0 AS qt'
+        else:
+            cols = f'0 AS pd, 0 AS pt, {done} AS qd, {total} AS qt'
+        parts.append(f'SELECT user_id, {date_col} AS day, {cols} FROM {table} WHERE {where}')
+        params.extend(p)
+    sql = f'''
+        SELECT user_id, day,
+               SUM(pd) AS physical_points, SUM(pt) AS physical_total_count,
+               SUM(qd) AS profession_points, SUM(qt) AS profession_total_count,
+               SUM(pd) + SUM(qd) AS total_points,
+               CASE WHEN SUM(pt) > 0 THEN CAST(SUM(pd) * 100.0 / SUM(pt) + 0.5 AS INTEGER) ELSE 0 END
+                   AS physical_completion_pct,
+               CASE WHEN SUM(qt) > 0 THEN CAST(SUM(qd) * 100.0 / SUM(qt) + 0.5 AS INTEGER) ELSE 0 END
+                   AS profession_completion_pct
+          FROM ({' UNION ALL '.join(parts)})
+         GROUP BY user_id, day'''
+    return sql, params
+
+
+def _stage(db, user_id, since):
+    db.execute('DROP TABLE IF EXISTS temp.rebuild_activity')
+    sql, params = aggregate_sql(user_id, since)
+    # Declared types give the key columns the same affinity as daily_activity,
+    # so the NOT EXISTS / JOIN probes below can use the primary key
+    db.execute(f'''CREATE TEMP TABLE rebuild_activity (
+                       user_id INTEGER NOT NULL, day DATE NOT NULL,
+                       {', '.join(f'{c} INTEGER' for c in COUNTER_COLUMNS)},
+                       PRIMARY KEY (user_id, day))''')
+    db.execute(f"INSERT INTO temp.rebuild_activity (user_id, day, {', '.join(COUNTER_COLUMNS)}) {sql}", params)
+    return db.execute('SELECT COUNT(*) FROM temp.rebuild_activity').fetchone()[0]
+
+
+def rebuild(db, user_id=None, since=None, progress=print):
+    """Recompute daily_activity counters for the selected scope in one transaction.
+
+    Returns (days_written, stale_rows_zeroed).
+    """
+    started = time.perf_counter()
+    total = _stage(db, user_id, since)
+    progress(f"Aggregated {total} user-days in {time.perf_counter() - started:.2f}s")
+
+    cols = ', '.join(COUNTER_COLUMNS)
+    updates = ', '.join(f'{c}=excluded.{c}' for c in COUNTER_COLUMNS + ('counts_version',))
+    written = 0
+    last_rowid = 0
+    while True:
+        row = db.execute('SELECT MAX(rowid) FROM (SELECT rowid FROM temp.rebuild_activity WHERE rowid > ? '
+                         'ORDER BY rowid LIMIT ?)', (last_rowid, CHUNK_ROWS)).fetchone()
+        if row[0] is None:
+            break
+        cur = db.execute(f'''INSERT INTO daily_activity (user_id, entry_date, {cols}, counts_version)
+                             SELECT user_id, day, {cols}, ? FROM temp.rebuild_activity
+                              WHERE rowid > ? AND rowid <= ?
+                             ON CONFLICT(user_id, entry_date) DO UPDATE SET {updates}''',
+                         (ACTIVITY_COUNTS_VERSION, last_rowid, row[0]))
+        written += cur.rowcount
+        last_rowid = row[0]
+        progress(f"  upserted {written}/{total} days")
+
+    # Rows whose source items were all deleted keep their note but lose their counts
+    where, params = _scope('entry_date', user_id, since)
+    zero = ', '.join(f'{c}=0' for c in COUNTER_COLUMNS)
+    stale = db.execute(f'''UPDATE daily_activity SET {zero}, counts_version = {ACTIVITY_COUNTS_VERSION}
+                            WHERE {where}
+                              AND ({' OR '.join(f'{c} != 0' for c in COUNTER_COLUMNS)}
+                                   OR counts_version < {ACTIVITY_COUNTS_VERSION})
+                              AND NOT EXISTS (SELECT 1 FROM temp.rebuild_activity r
+                                               WHERE r.user_id = daily_activity.user_id
+                                                 AND r.day = daily_activity.entry_date)''', params).rowcount
+    refresh_dirty_streaks(db, None if user_id is None else [user_id])
+    db.commit()
+    db.execute('DROP TABLE IF EXISTS temp.rebuild_activity')
+    progress(f"Rebuilt {written} days, reset {stale} stale rows in {time.perf_counter() - started:.2f}s")
+    return written, stale
+
+
+def verify(db, user_id=None, since=None):
+    """List (user_id, day, {column: (stored, expected)}) for every drifted day; writes nothing"""
+    _stage(db, user_id, since)
+    where, params = _scope('entry_date', user_id, since, alias='a.')
+    drift = []
+    rows = db.execute(f'''
+        SELECT r.user_id, r.day, {', '.join(f'a.{c} AS s_{c}, r.{c} AS e_{c}' for c in COUNTER_COLUMNS)}
+          FROM temp.rebuild_activity r
+          LEFT JOIN daily_activity a ON a.user_id = r.user_id AND a.entry_date = r.day
+        UNION ALL
+        SELECT a.user_id, a.entry_date, {', '.join(f'a.{c}, 0' for c in COUNTER_COLUMNS)}
+          FROM daily_activity a
+         WHERE {where}
+           AND NOT EXISTS (SELECT 1 FROM temp.rebuild_activity r WHERE r.user_id = a.user_id AND r.day = a.entry_date)
+    ''', params)
+    for row in rows:
+        diff = {c: (row[f's_{c}'], row[f'e_{c}']) for c in COUNTER_COLUMNS if (row[f's_{c}'] or 0) != row[f'e_{c}']}
+        if diff:
+            drift.append((row['user_id'], row['day'], diff))
+    db.execute('DROP TABLE IF EXISTS temp.rebuild_activity')
+    return drift
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Rebuild daily_activity from the source tables.')
+    parser.add_argument('--db', default='neri.db')
+    parser.add_argument('--user', type=int, help='only this user id')
+    parser.add_argument('--since', help='only days on or after YYYY-MM-DD')
+    parser.add_argument('--verify', action='store_true', help='report drift without writing')
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"Error: {args.db} not found")
+        return 1
+    if args.since:
+        try:
+            args.since = datetime.date.fromisoformat(args.since).isoformat()
+        except ValueError:
+            print(f"Error: --since must be YYYY-MM-DD, got {args.since!r}")
+            return 1
+
+    db = connect(args.db)
     try:
-        rows = conn.execute(f"SELECT DISTINCT {col} FROM {table}").fetchall()
-        for r in rows:
-            if r[0]: dates.add(r[0])
-    except:
-        pass
-
-print(f"Recalculating for {len(dates)} unique dates...")
-
-# Get all user IDs
-users = [r[0] for r in conn.execute("SELECT id FROM users").fetchall()]
-
-for uid in users:
-    for date_str in sorted(list(dates)):
-        # Check if there is any data for this user on this date before recalculating
-        # to avoid creating empty daily_activity records for every date for every user
-        has_data = False
-        for table, col in [('tasks', 'task_date'), ('nutrition_checklist', 'entry_date'), 
-                           ('reminders', 'reminder_date'), ('physical_goals', 'goal_date'),
-                           ('profession_tasks', 'task_date')]:
-            row = conn.execute(f"SELECT 1 FROM {table} WHERE user_id=? AND {col}=? LIMIT 1", (uid, date_str)).fetchone()
-            if row:
-                has_data = True
-                break
-        
-        if has_data:
-            print(f"Updating data for user {uid} on {date_str}")
-            recalculate_daily_activity(conn, uid, date_str)
-
-conn.commit()
-conn.close()
-print("Recalculation complete.")
+        if args.verify:
+            drift = verify(db, args.user, args.since)
+            for uid, day, diff in drift:
+                print(f"Drift for user {uid} on {day}: {diff}")
+            print(f"Verification complete. {len(drift)} drifted day(s).")
+            return 1 if drift else 0
+        rebuild(db, args.user, args.since)
+        print("Recalculation complete.")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
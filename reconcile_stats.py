@@ -0,0 +1,72 @@
+"""Reconcile profession_stats counters with profession_tasks.
+
+    python reconcile_stats.py [--user ID] [--verify] [--db neri.db]
+
+completed_count and target_count are kept by triggers on profession_tasks
+(migration 8); this recounts them with one grouped query and repairs any
+user whose counters drifted, e.g. after rows were edited with the
+triggers dropped. Users with tasks but no profession_stats row get one.
+--verify only reports.
+"""
+import os
+import sys
+import argparse
+
+from database import connect
+from migrations import PROFESSION_DONE
+
+
+def drift(db, user_id=None):
+    """List (user_id, stored, expected) where stored/expected are (completed, target); stored None = no row"""
+    where, params = ('user_id = ?', [user_id]) if user_id is not None else ('1', [])
+    expected = {r[0]: (r[1], r[2]) for r in db.execute(
+        f'SELECT user_id, SUM({PROFESSION_DONE}), COUNT(*) FROM profession_tasks WHERE {where} GROUP BY user_id',
+        params)}
+    stored = {r[0]: (r[1], r[2]) for r in db.execute(
+        f'SELECT user_id, completed_count, target_count FROM profession_stats WHERE {where}', params)}
+    rows = []
+    for uid in sorted(stored.keys() | expected.keys()):
+        want = expected.get(uid, (0, 0))
+        if stored.get(uid) != want:
+            rows.append((uid, stored.get(uid), want))
+    return rows
+
+
+def repair(db, rows):
+    """Write the expected counters for drift() rows, in one transaction"""
+    for uid, stored, (completed, target) in rows:
+        if stored is None:
+            db.execute('INSERT INTO profession_stats (user_id) VALUES (?)', (uid,))
+        db.execute('UPDATE profession_stats SET completed_count = ?, target_count = ? WHERE user_id = ?',
+                   (completed, target, uid))
+    db.commit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Recount profession_stats from profession_tasks.')
+    parser.add_argument('--db', default='neri.db')
+    parser.add_argument('--user', type=int, help='only this user id')
+    parser.add_argument('--verify', action='store_true', help='report drift without writing')
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"Error: {args.db} not found")
+        return 1
+
+    db = connect(args.db)
+    try:
+        rows = drift(db, args.user)
+        for uid, stored, expected in rows:
+            print(f"Drift for user {uid}: stored (completed, target) {stored}, expected {expected}")
+        if args.verify:
+            print(f"Verification complete. {len(rows)} drifted user(s).")
+            return 1 if rows else 0
+        repair(db, rows)
+        print(f"Reconciled {len(rows)} user(s).")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""Pre-create the next day's per-user rows before anyone asks for them.
+
+    python rollover.py [--db neri.db] [--date YYYY-MM-DD] [--batch 200]
+
+For every recently active user this materializes daily_physical and
+the nutrition checklist for the day (tomorrow by default), a batch of
+users per transaction with a short pause between batches, so page GETs
+after midnight find their rows and only read. daily_activity is left to
+the first real write of the day; until then the overview computes the
+day's stats without storing them, so idle days add no empty rows to the
+streak, weekday and rollup summaries.
+Safe to re-run: users that already have a row are skipped. It also
+finishes the streak refreshes writers deferred (a broken record streak
+needs a full-history scan; see analytics.py).
+
+RolloverWorker runs the same job inside the web process (set
+ROLLOVER_IN_PROCESS=1), shortly before each midnight.
+"""
+import sys
+import time
+import argparse
+import datetime
+import threading
+
+from analytics import refresh_dirty_streaks
+from checklists import active_user_ids, pregenerate
+
+BATCH_USERS = 200
+BATCH_PAUSE_S = 0.05
+
+# Run this long before midnight so the rows exist when the day starts
+LEAD_MINUTES = 30
+
+
+def _in(ids):
+    return ', '.join('?' * len(ids))
+
+
+def _physical_sql(ids):
+    return f'''INSERT INTO daily_physical (user_id, entry_date)
+               SELECT id, ? FROM users WHERE id IN ({_in(ids)})
+               ON CONFLICT(user_id, entry_date) DO NOTHING'''
+
+
+def materialize(db, day, user_ids):
+    """Create day's rows for user_ids in one transaction; returns rows created per table"""
+    created = {}
+    created['daily_physical'] = db.execute(_physical_sql(user_ids), [day, *user_ids]).rowcount
+    created['nutrition_checklist'] = pregenerate(db, day, user_ids, commit=False)
+    db.commit()
+    return created
+
+
+def rollover(db, day, batch_size=BATCH_USERS, pause=BATCH_PAUSE_S, progress=None):
+    """Materialize day for every active user, batch_size users per transaction,
+    then finish the deferred streak refreshes"""
+    user_ids = active_user_ids(db, day)
+    totals = {'daily_physical': 0, 'nutrition_checklist': 0}
+    for start in range(0, len(user_ids), batch_size):
+        created = materialize(db, day, user_ids[start:start + batch_size])
+        for table, count in created.items():
+            totals[table] += count
+        if progress:
+            progress(f"  {min(start + batch_size, len(user_ids))}/{len(user_ids)} users")
+        if pause and start + batch_size < len(user_ids):
+            time.sleep(pause)
+    totals['activity_streaks'] = refresh_dirty_streaks(db)
+    db.commit()
+    return totals
+
+
+class RolloverWorker:
+    """Daemon thread running rollover() for tomorrow LEAD_MINUTES before each midnight.
+
+    On start it also covers today, in case the process came up after
+    midnight. `connect` returns a new connection for each run.
+    """
+
+    def __init__(self, connect, lead_minutes=LEAD_MINUTES, batch_size=BATCH_USERS):
+        self.connect = connect
+        self.lead = datetime.timedelta(minutes=lead_minutes)
+        self.batch_size = batch_size
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='rollover', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def run_once(self, day):
+        try:
+            db = self.connect()
+            try:
+                return rollover(db, day.isoformat(), self.batch_size)
+            finally:
+                db.close()
+        except Exception as e:
+            self.last_error = e
+
+    def seconds_until_next_run(self, now=None):
+        now = now or datetime.datetime.now()
+        next_run = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time()) - self.lead
+        if next_run <= now:
+            next_run += datetime.timedelta(days=1)
+        return (next_run - now).total_seconds()
+
+    def _run(self):
+        today = datetime.date.today()
+        self.run_once(today)
+        if self.seconds_until_next_run() > 86400 - self.lead.total_seconds():
+            # Started inside the lead window: tomorrow's run is already due
+            self.run_once(today + datetime.timedelta(days=1))
+        while not self._stop.wait(self.seconds_until_next_run()):
+            self.run_once(datetime.date.today() + datetime.timedelta(days=1))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Pre-create daily rows for active users.')
+    parser.add_argument('--db', default='neri.db')
+    parser.add_argument('--date', help='YYYY-MM-DD, defaults to tomorrow')
+    parser.add_argument('--batch', type=int, default=BATCH_USERS, help='users per transaction')
+    args = parser.parse_args(argv)
+
+    try:
+        day = datetime.date.fromisoformat(args.date) if args.date else datetime.date.today() + datetime.timedelta(days=1)
+    except ValueError:
+        print(f"Error: --date must be YYYY-MM-DD, got {args.date!r}")
+        return 1
+
+    from database import connect
+    db = connect(args.db)
+    started = time.perf_counter()
+    try:
+        totals = rollover(db, day.isoformat(), max(args.batch, 1), progress=print)
+    finally:
+        db.close()
+    print(f"Rolled over {day.isoformat()} in {time.perf_counter() - started:.2f}s: "
+          + ', '.join(f"{count} {table}" for table, count in totals.items()))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
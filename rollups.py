@@ -0,0 +1,85 @@
+"""Verify (or rebuild) the weekly/monthly/yearly activity rollups.
+
+    python rollups.py [--user ID] [--verify] [--db neri.db]
+
+The rollup tables are kept by triggers on daily_activity (migration 7),
+so they only drift if those triggers were bypassed, e.g. rows copied in
+with the triggers dropped. --verify compares every rollup row with a
+fresh GROUP BY over daily_activity and writes nothing; without it each
+table is recomputed in one transaction.
+"""
+import os
+import sys
+import time
+import argparse
+
+from database import connect
+from migrations import ACTIVITY_ROLLUPS, rollup_sql, rollup_terms
+
+
+def _scope(user_id):
+    return ('user_id = ?', [user_id]) if user_id is not None else ('1', [])
+
+
+def rebuild(db, user_id=None, progress=print):
+    """Recompute every rollup table for the selected users; returns rows written per table"""
+    where, params = _scope(user_id)
+    columns = ', '.join(rollup_terms())
+    written = {}
+    started = time.perf_counter()
+    for table, (period, _) in ACTIVITY_ROLLUPS.items():
+        db.execute(f'DELETE FROM {table} WHERE {where}', params)
+        written[table] = db.execute(f'INSERT INTO {table} (user_id, {period}, {columns}) '
+                                    f'{rollup_sql(table, where)}', params).rowcount
+        progress(f"  {table}: {written[table]} rows")
+    db.commit()
+    progress(f"Rebuilt rollups in {time.perf_counter() - started:.2f}s")
+    return written
+
+
+def verify(db, user_id=None):
+    """List (table, user_id, period, {column: (stored, expected)}) for every drifted rollup row"""
+    where, params = _scope(user_id)
+    columns = list(rollup_terms())
+    drift = []
+    for table, (period, _) in ACTIVITY_ROLLUPS.items():
+        stored = {(r[0], r[1]): r[2:] for r in db.execute(
+            f"SELECT user_id, {period}, {', '.join(columns)} FROM {table} WHERE {where}", params)}
+        expected = {(r[0], r[1]): r[2:] for r in db.execute(rollup_sql(table, where), params)}
+        for key in sorted(stored.keys() | expected.keys()):
+            got, want = stored.get(key), expected.get(key)
+            diff = {c: (got[i] if got else None, want[i] if want else None)
+                    for i, c in enumerate(columns) if (got and got[i]) != (want and want[i])}
+            if diff:
+                drift.append((table, key[0], key[1], diff))
+    return drift
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Verify or rebuild the activity rollup tables.')
+    parser.add_argument('--db', default='neri.db')
+    parser.add_argument('--user', type=int, help='only this user id')
+    parser.add_argument('--verify', action='store_true', help='report drift without writing')
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"Error: {args.db} not found")
+        return 1
+
+    db = connect(args.db)
+    try:
+        if args.verify:
+            drift = verify(db, args.user)
+            for table, uid, period, diff in drift:
+                print(f"Drift in {table} for user {uid}, {period}: {diff}")
+            print(f"Verification complete. {len(drift)} drifted rollup row(s).")
+            return 1 if drift else 0
+        rebuild(db, args.user)
+        print("Rollup rebuild complete.")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""Per-request SQL timing for the web app.
+
+app.get_db() wraps the pooled connection in InstrumentedConnection when
+SQL_PERF is on (it is off by default; set SQL_PERF=1 or pass it to
+create_app()): every statement is timed (fetches included) and
+counted on the request's QueryLog. At the end of the request app.py
+hands the log to PerfRegistry.finish(), which logs statements slower
+than SLOW_QUERY_MS with their query plan and folds the totals into
+per-route aggregates for /debug/perf; server_timing() builds the
+Server-Timing header.
+"""
+import json
+import time
+import sqlite3
+import logging
+import threading
+from collections import deque
+
+slow_log = logging.getLogger('neri.slow_query')
+
+# Distinct statements remembered per route (IN-lists of different lengths are distinct)
+MAX_STATEMENTS = 50
+
+
+class QueryLog:
+    """Statements run by one request: [sql, params, seconds, rows, many] each"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = []
+
+    def add(self, sql, params, many=False):
+        record = [sql, params, 0.0, 0, many]
+        self.queries.append(record)
+        return record
+
+    @property
+    def seconds(self):
+        return sum(q[2] for q in self.queries)
+
+    @property
+    def rows(self):
+        return sum(q[3] for q in self.queries)
+
+
+class TimedCursor:
+    """sqlite3 cursor proxy that charges execute and fetch time to a QueryLog record"""
+
+    def __init__(self, cursor, log):
+        self._cursor = cursor
+        self._log = log
+        self._record = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def _run(self, method, sql, params, many):
+        self._record = self._log.add(sql, params, many)
+        started = time.perf_counter()
+        try:
+            method(sql, params)
+        finally:
+            self._record[2] += time.perf_counter() - started
+        return self
+
+    def execute(self, sql, params=()):
+        return self._run(self._cursor.execute, sql, params, False)
+
+    def executemany(self, sql, seq_of_params):
+        return self._run(self._cursor.executemany, sql, seq_of_params, True)
+
+    def _fetch(self, method, *args):
+        started = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            if self._record is not None:
+                self._record[2] += time.perf_counter() - started
+
+    def fetchone(self):
+        row = self._fetch(self._cursor.fetchone)
+        if row is not None and self._record is not None:
+            self._record[3] += 1
+        return row
+
+    def fetchall(self):
+        rows = self._fetch(self._cursor.fetchall)
+        if self._record is not None:
+            self._record[3] += len(rows)
+        return rows
+
+    def fetchmany(self, size=None):
+        rows = self._fetch(self._cursor.fetchmany, size or self._cursor.arraysize)
+        if self._record is not None:
+            self._record[3] += len(rows)
+        return rows
+
+    def __iter__(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
+
+
+class InstrumentedConnection:
+    """Connection proxy whose statements and commits are recorded on `log`"""
+
+    def __init__(self, db, log):
+        self.raw = db
+        self.log = log
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+    def cursor(self):
+        return TimedCursor(self.raw.cursor(), self.log)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self.cursor().executemany(sql, seq_of_params)
+
+    def commit(self):
+        record = self.log.add('COMMIT', ())
+        started = time.perf_counter()
+        try:
+            self.raw.commit()
+        finally:
+            record[2] += time.perf_counter() - started
+
+
+def explain(db, sql, params):
+    """EXPLAIN QUERY PLAN lines for sql, or None if it can't be explained"""
+    head = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ''
+    if head not in ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH'):
+        return None
+    try:
+        return [row[3] for row in db.execute('EXPLAIN QUERY PLAN ' + sql, params).fetchall()]
+    except sqlite3.Error:
+        return None
+
+
+def server_timing(log, seconds):
+    """Server-Timing header value: time in SQL and in the whole request"""
+    return (f'db;dur={log.seconds * 1000:.2f};desc="{len(log.queries)} queries", '
+            f'app;dur={seconds * 1000:.2f}')
+
+
+class PerfRegistry:
+    """Per-route totals since startup plus the most recent slow statements"""
+
+    def __init__(self, slow_keep=100):
+        self._routes = {}
+        self._lock = threading.Lock()
+        self.slow = deque(maxlen=slow_keep)
+
+    def finish(self, route, seconds, log, db=None, slow_ms=None):
+        """Record one finished request; logs (and returns) its slow statements"""
+        slow = []
+        if slow_ms is not None:
+            for sql, params, spent, rows, many in log.queries:
+                if spent * 1000 < slow_ms:
+                    continue
+                entry = {
+                    'route': route,
+                    'sql': ' '.join(sql.split()),
+                    'ms': round(spent * 1000, 2),
+                    'rows': rows,
+                    'plan': None if many or db is None else explain(db, sql, params),
+                }
+                slow.append(entry)
+                slow_log.warning(json.dumps(entry))
+
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = {'calls': 0, 'seconds': 0.0, 'db_seconds': 0.0, 'max_seconds': 0.0,
+                                               'queries': 0, 'rows': 0, 'statements': {}}
+            stats['calls'] += 1
+            stats['seconds'] += seconds
+            stats['max_seconds'] = max(stats['max_seconds'], seconds)
+            stats['queries'] += len(log.queries)
+            for sql, params, spent, rows, many in log.queries:
+                stats['db_seconds'] += spent
+                stats['rows'] += rows
+                statement = stats['statements'].get(sql)
+                if statement is None:
+                    if len(stats['statements']) >= MAX_STATEMENTS:
+                        continue
+                    statement = stats['statements'][sql] = [0, 0.0]
+                statement[0] += 1
+                statement[1] += spent
+            self.slow.extend(slow)
+        return slow
+
+    def snapshot(self, top=3):
+        """Routes by total time, each with its `top` most-run statements"""
+        with self._lock:
+            routes = []
+            for route, s in self._routes.items():
+                calls = s['calls']
+                statements = sorted(s['statements'].items(), key=lambda kv: -kv[1][0])[:top]
+                routes.append({
+                    'route': route,
+                    'calls': calls,
+                    'total_ms': round(s['seconds'] * 1000, 2),
+                    'avg_ms': round(s['seconds'] * 1000 / calls, 2),
+                    'max_ms': round(s['max_seconds'] * 1000, 2),
+                    'db_ms': round(s['db_seconds'] * 1000, 2),
+                    'queries_per_call': round(s['queries'] / calls, 2),
+                    'rows_per_call': round(s['rows'] / calls, 2),
+                    'top_statements': [{'sql': ' '.join(sql.split()), 'per_call': round(n / calls, 2),
+                                        'ms': round(spent * 1000, 2)} for sql, (n, spent) in statements],
+                })
+        return sorted(routes, key=lambda r: -r['total_ms'])
+
+    def clear(self):
+        with self._lock:
+            self._routes.clear()
+            self.slow.clear()
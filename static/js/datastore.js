@@ -0,0 +1,137 @@
+// ─── Client Data Layer ───
+// Month and day payloads kept in IndexedDB, keyed by URL and stamped with
+// the server's ETag. Immutable (past) payloads are served without touching
+// the network; everything else renders from cache and revalidates with
+// If-None-Match in the background. Payloads the server rendered into the
+// page are primed: the first load() of their URL returns them without a
+// request, unless a mutation was sent in between.
+
+const NeriStore = (() => {
+    const DB_VERSION = 1;
+    const STORE = 'responses';
+    // Past payloads only change through a profile edit; recheck them daily
+    const IMMUTABLE_MAX_AGE_MS = 24 * 60 * 60 * 1000;
+
+    const userId = document.body && document.body.dataset.userId;
+    const dbName = userId ? `neri-data-${userId}` : null;
+    let dbPromise = null;
+    const primed = new Map();
+
+    function openDb() {
+        if (!dbName || !window.indexedDB) return Promise.resolve(null);
+        if (!dbPromise) {
+            dbPromise = new Promise(resolve => {
+                const req = indexedDB.open(dbName, DB_VERSION);
+                req.onupgradeneeded = () => req.result.createObjectStore(STORE, { keyPath: 'url' });
+                req.onsuccess = () => resolve(req.result);
+                req.onerror = () => resolve(null);   // private mode etc.: run uncached
+            });
+        }
+        return dbPromise;
+    }
+
+    async function tx(mode, fn) {
+        const db = await openDb();
+        if (!db) return null;
+        return new Promise(resolve => {
+            const t = db.transaction(STORE, mode);
+            const req = fn(t.objectStore(STORE));
+            t.oncomplete = () => resolve(req ? req.result : null);
+            t.onerror = t.onabort = () => resolve(null);
+        });
+    }
+
+    const read = url => tx('readonly', s => s.get(url));
+    const write = record => tx('readwrite', s => s.put(record));
+
+    // Conditional GET; returns the record to use (fresh, revalidated or cached)
+    async function revalidate(url, cached) {
+        const headers = cached ? { 'If-None-Match': `"${cached.etag}"` } : {};
+        let res;
+        try {
+            res = await fetch(url, { headers });
+        } catch (e) {
+            if (cached) return cached;
+            throw e;
+        }
+        if (res.status === 304 && cached) {
+            const record = { ...cached, checkedAt: Date.now() };
+            write(record);
+            return record;
+        }
+        if (!res.ok) {
+            if (cached) return cached;
+            throw new Error(`${url}: ${res.status}`);
+        }
+        const data = await res.json();
+        const etag = (res.headers.get('ETag') || '').replace(/^W\//, '').replace(/"/g, '');
+        const record = { url, etag, data, checkedAt: Date.now() };
+        if (etag) write(record);
+        return record;
+    }
+
+    /**
+     * Load a JSON payload.
+     *   immutable: the payload can't change (past month/day) — no network while fresh
+     *   onUpdate:  render from cache now and call onUpdate(data) if revalidation finds newer data;
+     *              without it, mutable payloads wait for the (usually 304) revalidation
+     */
+    async function load(url, { immutable = false, onUpdate = null } = {}) {
+        const data = take(url);
+        if (data !== undefined) return data;
+        const cached = await read(url);
+        if (cached && immutable && Date.now() - cached.checkedAt < IMMUTABLE_MAX_AGE_MS) {
+            return cached.data;
+        }
+        if (cached && onUpdate) {
+            revalidate(url, cached).then(record => {
+                if (record.etag !== cached.etag) onUpdate(record.data);
+            }).catch(() => { });
+            return cached.data;
+        }
+        return (await revalidate(url, cached)).data;
+    }
+
+    // Server-rendered payload for url: served once by load()/take() and stored
+    // with its ETag so later loads revalidate it
+    function prime(url, etag, data) {
+        primed.set(url, data);
+        write({ url, etag, data, checkedAt: Date.now() });
+    }
+
+    function take(url) {
+        const data = primed.get(url);
+        primed.delete(url);
+        return data;
+    }
+
+    // A write may change any primed payload; fetch them normally from now on
+    function discardPrimed() {
+        primed.clear();
+    }
+
+    // Warm the cache when the browser is idle
+    function prefetch(url, options = {}) {
+        const run = () => load(url, options).catch(() => { });
+        if ('requestIdleCallback' in window) requestIdleCallback(run, { timeout: 2000 });
+        else setTimeout(run, 200);
+    }
+
+    function forget(url) {
+        return tx('readwrite', s => s.delete(url));
+    }
+
+    function clear() {
+        primed.clear();
+        const pending = dbPromise || Promise.resolve(null);
+        dbPromise = null;
+        return pending.then(db => {
+            if (db) db.close();
+            if (dbName && window.indexedDB) indexedDB.deleteDatabase(dbName);
+        });
+    }
+
+    return { load, prime, take, discardPrimed, prefetch, forget, clear };
+})();
+
+window.NeriStore = NeriStore;
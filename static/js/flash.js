@@ -0,0 +1,8 @@
+// Convert server-side flash messages to toast notifications
+document.addEventListener('DOMContentLoaded', () => {
+    document.querySelectorAll('.flash').forEach(el => {
+        const type = el.classList.contains('success') ? 'success'
+            : el.classList.contains('error') ? 'error' : 'info';
+        if (typeof showToast === 'function') showToast(el.textContent.trim(), type);
+    });
+});
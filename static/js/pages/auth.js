@@ -0,0 +1,14 @@
+// Use JS to swap classes for smooth sliding animation
+function toggleAuthMode(targetMode) {
+    const container = document.getElementById('authContainer');
+    if (targetMode === 'signup') {
+        container.classList.remove('state-login');
+        container.classList.add('state-signup');
+        // Optional history push logic here if you want back buttons to work without reload
+        window.history.pushState(null, '', '/auth/signup');
+    } else {
+        container.classList.remove('state-signup');
+        container.classList.add('state-login');
+        window.history.pushState(null, '', '/auth/login');
+    }
+}
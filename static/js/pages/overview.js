@@ -0,0 +1,799 @@
+// ── Reminders ──────────────────────────────────────────────────────────────
+const checkSVG = () => `<svg width="9" height="9" viewBox="0 0 10 10" fill="none"><path d="M1.5 5l2.5 2.5 5-5" stroke="#000" stroke-width="1.8" stroke-linecap="round"/></svg>`;
+
+async function addReminder() {
+    const input = document.getElementById('newReminderInput');
+    const title = input.value.trim();
+    if (!title) return;
+
+    const res = await postJSON('/api/reminders/add', { title });
+    if (res.ok) {
+        const data = await res.json();
+        const list = document.getElementById('reminderList');
+        const empty = document.getElementById('reminderEmpty');
+        if (empty) empty.remove();
+
+        const li = document.createElement('li');
+        li.className = 'reminder-item';
+        li.setAttribute('data-id', data.id);
+        li.innerHTML = `
+        <div class="reminder-check" onclick="toggleReminder(${data.id}, this)"></div>
+        <span class="reminder-text">${title}</span>
+        <button class="reminder-del" onclick="deleteReminder(${data.id}, this.closest('li'))">✕</button>`;
+        list.prepend(li);
+        input.value = '';
+    }
+}
+
+async function toggleReminder(id, el) {
+    const li = el.closest('li');
+    const text = li.querySelector('.reminder-text');
+    const isDone = !el.classList.contains('checked');
+    el.classList.toggle('checked', isDone);
+    el.innerHTML = isDone ? checkSVG() : '';
+    li.classList.toggle('done', isDone);
+    text.classList.toggle('done-text', isDone);
+
+    await queueMutation({ type: 'reminder', op: 'toggle', id, done: isDone });
+}
+
+async function deleteReminder(id, li) {
+    if (!li) return;
+    const res = await postJSON('/api/reminders/delete', { id });
+    if (res.ok) {
+        li.style.opacity = '0';
+        li.style.transform = 'translateX(20px)';
+        li.style.transition = '0.25s ease';
+        setTimeout(() => li.remove(), 250);
+    }
+}
+
+// ── Calendar Functions ─────────────────────────────────────────────────────
+let calendarViewDate = new Date();
+let activitiesMap = {};
+let selectedDateStr = null;
+
+// Payloads overview() rendered into the page, keyed by API URL: this month
+// and today's day view, so the first calendar render and the first click on
+// today need no request
+function primeBootstrap() {
+    const el = document.getElementById('overviewBootstrap');
+    if (!el) return;
+    Object.entries(JSON.parse(el.textContent)).forEach(([url, { etag, data }]) => NeriStore.prime(url, etag, data));
+}
+
+async function initCalendar() {
+    primeBootstrap();
+    await renderCalendar();
+}
+
+function localDateStr(d) {
+    return `${d.getFullYear()}-${String(d.getMonth() + 1).padStart(2, '0')}-${String(d.getDate()).padStart(2, '0')}`;
+}
+
+function monthUrl(year, month) {
+    return `/api/calendar/month?year=${year}&month=${month}`;
+}
+
+// Months that ended before today can't be edited any more
+function isPastMonth(year, month) {
+    const now = new Date();
+    return year < now.getFullYear() || (year === now.getFullYear() && month < now.getMonth() + 1);
+}
+
+function prefetchAdjacentMonths(year, month) {
+    [-1, 1].forEach(step => {
+        const d = new Date(year, month - 1 + step, 1);
+        const y = d.getFullYear(), m = d.getMonth() + 1;
+        NeriStore.prefetch(monthUrl(y, m), { immutable: isPastMonth(y, m) });
+    });
+}
+
+async function renderCalendar(cachedMap) {
+    const year = calendarViewDate.getFullYear();
+    const month = calendarViewDate.getMonth() + 1;
+
+    // Update header
+    const monthNames = ['January', 'February', 'March', 'April', 'May', 'June',
+        'July', 'August', 'September', 'October', 'November', 'December'];
+    document.getElementById('monthYearDisplay').textContent = `${monthNames[month - 1]} ${year}`;
+
+    // Activities for this month: from the local store, revalidated in the background
+    if (cachedMap) {
+        activitiesMap = cachedMap;
+    } else {
+        activitiesMap = await NeriStore.load(monthUrl(year, month), {
+            immutable: isPastMonth(year, month),
+            onUpdate: fresh => {
+                if (calendarViewDate.getFullYear() === year && calendarViewDate.getMonth() + 1 === month) {
+                    renderCalendar(fresh);
+                }
+            }
+        });
+        prefetchAdjacentMonths(year, month);
+    }
+
+    // Build calendar grid
+    const grid = document.getElementById('calendarGrid');
+    grid.innerHTML = '';
+
+    // Add day headers
+    const dayHeaders = ['Sun', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat'];
+    dayHeaders.forEach(day => {
+        const header = document.createElement('div');
+        header.style.cssText = 'text-align:center; font-weight:600; font-size:0.75rem; color:var(--text-muted); padding:8px 0; min-height:30px; display:flex; align-items:center; justify-content:center;';
+        header.textContent = day;
+        grid.appendChild(header);
+    });
+
+    // Get first day of month and number of days
+    const firstDay = new Date(year, month - 1, 1).getDay();
+    const daysInMonth = new Date(year, month, 0).getDate();
+    const today = new Date();
+    today.setHours(0, 0, 0, 0);
+    // Create today's date string using local date (not UTC) to avoid timezone issues
+    const todayYear = today.getFullYear();
+    const todayMonth = today.getMonth() + 1;
+    const todayDate = today.getDate();
+    const todayStr = `${todayYear}-${String(todayMonth).padStart(2, '0')}-${String(todayDate).padStart(2, '0')}`;
+
+    // Add empty cells before first day
+    for (let i = 0; i < firstDay; i++) {
+        const empty = document.createElement('div');
+        grid.appendChild(empty);
+    }
+
+    // Add day cells
+    for (let day = 1; day <= daysInMonth; day++) {
+        const dateStr = `${year}-${String(month).padStart(2, '0')}-${String(day).padStart(2, '0')}`;
+        const dayDate = new Date(year, month - 1, day);
+        dayDate.setHours(0, 0, 0, 0);
+
+        const cell = document.createElement('div');
+        cell.className = 'calendar-cell';
+        cell.setAttribute('data-date', dateStr);
+
+        const isToday = dateStr === todayStr;
+        const isPast = dayDate < today;
+        const activity = activitiesMap[dateStr];
+
+        let borderColor = 'rgba(255,255,255,0.08)';
+        let bgColor = 'rgba(255,255,255,0.02)';
+        let cursor = 'pointer';
+
+        if (isToday) {
+            bgColor = 'rgba(0, 212, 255, 0.1)';
+            borderColor = 'rgba(0, 212, 255, 0.3)';
+        } else if (isPast) {
+            bgColor = 'rgba(255,255,255,0.01)';
+            opacity = '0.5';
+            cursor = 'default';
+        } else {
+            cursor = 'pointer';
+        }
+
+        cell.style.cssText = `padding:10px; border:1px solid ${borderColor}; border-radius:8px; text-align:center; position:relative; transition:all 0.2s; min-height:65px; display:flex; flex-direction:column; align-items:center; justify-content:center; background:${bgColor}; cursor:${cursor};`;
+
+        let html = `<div style="font-weight:600; font-size:0.95rem;">${day}`;
+        if (isToday) html += ` <span style="font-size:0.6rem; color:var(--primary-color);">●</span>`;
+        html += `</div>`;
+
+        if (activity) {
+            const pct = activity.overall_score ?? 0;
+            const color = pct >= 75 ? '#10b981' : pct >= 40 ? '#00d4ff' : '#f59e0b';
+            if (isPast || isToday) {
+                html += `<div style="font-size:0.75rem; margin-top:4px; color:${color}; font-weight:700;">${pct}%</div>`;
+            }
+
+            const note = activity.day_note || activity.keyword || "";
+            if (note) {
+                html += `<div style="font-size:0.65rem; color:var(--text-muted); margin-top:2px; font-weight:500; overflow:hidden; text-overflow:ellipsis; white-space:nowrap; width:100%; border-top:1px solid rgba(255,255,255,0.05); padding-top:2px;">${note}</div>`;
+            }
+        } else {
+            // No activity data for this date
+            let dots = '';
+
+            if (isToday) {
+                html += `<div style="font-size:0.65rem; color:var(--primary-color); margin-top:4px; font-weight:600;">Today</div>`;
+            }
+            // Future dots (goals/reminders scheduled)
+            const act = activitiesMap[dateStr];
+            if (act?.has_goals) dots += `<span style="color:#10b981; margin:0 2px;">●</span>`;
+            if (act?.has_reminders) dots += `<span style="color:#00d4ff; margin:0 2px;">●</span>`;
+            if (dots && !isToday) {
+                html += `<div style="font-size:0.6rem; margin-top:4px;">${dots}</div>`;
+            }
+        }
+
+        cell.innerHTML = html;
+        cell.onclick = () => {
+            // Remove previous selection highlight
+            document.querySelectorAll('.calendar-cell.selected').forEach(c => {
+                c.classList.remove('selected');
+            });
+            // Add highlight to clicked cell
+            cell.classList.add('selected');
+            showDateInfo(dateStr);
+        };
+        grid.appendChild(cell);
+    }
+}
+
+// One day-view endpoint for the side panel, the scheduler and the date modal;
+// `fields` limits the payload to the sections the caller renders
+async function fetchDayView(dateStr, fields) {
+    const params = new URLSearchParams({ date: dateStr });
+    // A primed full view holds every section a projection would
+    const full = NeriStore.take(`/api/date-view?${params}`);
+    if (full !== undefined) return full;
+    if (fields) params.set('fields', fields);
+    // Past days are read-only, so their stored copy is served as-is
+    return NeriStore.load(`/api/date-view?${params}`, { immutable: dateStr < localDateStr(new Date()) });
+}
+
+async function showDateInfo(dateStr) {
+    selectedDateStr = dateStr;
+    const view = await fetchDayView(dateStr, 'overview,physical.tasks_list,physical.reminders,profession.stats');
+    const started = view.physical.phys_total || view.profession.tasks_total || view.overview.day_note;
+    const data = {
+        activity: started ? view.overview : null,
+        tasks: view.physical.tasks_list,
+        reminders: view.physical.reminders
+    };
+
+    const dateObj = new Date(dateStr + 'T00:00:00');
+    const options = { weekday: 'short', year: 'numeric', month: 'short', day: 'numeric' };
+    const dateText = dateObj.toLocaleDateString('en-US', options);
+
+    // Create today's date string using local date for proper comparison
+    const today = new Date();
+    const todayYear = today.getFullYear();
+    const todayMonth = today.getMonth() + 1;
+    const todayDate = today.getDate();
+    const todayStr = `${todayYear}-${String(todayMonth).padStart(2, '0')}-${String(todayDate).padStart(2, '0')}`;
+
+    let status = '';
+    let dateType = 'today';
+    if (dateStr < todayStr) {
+        status = 'PAST (Read-only)';
+        dateType = 'past';
+        document.getElementById('selectedDateInfo').style.display = 'none';
+        // Open date view modal for past dates
+        await openDateViewModal(dateStr, dateText);
+        return;
+    } else if (dateStr === todayStr) {
+        status = 'TODAY';
+        dateType = 'today';
+        document.getElementById('selectedDateInfo').style.display = 'block';
+    } else {
+        status = 'FUTURE (Add Goals)';
+        dateType = 'future';
+        document.getElementById('selectedDateInfo').style.display = 'none';
+        // Open task scheduler for future dates
+        openTaskScheduler(dateStr, dateText);
+        return;
+    }
+
+    document.getElementById('selectedDateText').textContent = dateText;
+    document.getElementById('dateStatus').textContent = status;
+
+    let statsHtml = '';
+    if (data.activity) {
+        statsHtml += `<div><span style="color:var(--text-muted);">Completion:</span> <strong style="color:${data.activity.physical_completion_pct >= 75 ? '#10b981' : '#f59e0b'};">${data.activity.physical_completion_pct}%</strong></div>`;
+        statsHtml += `<div><span style="color:var(--text-muted);">Points:</span> <strong style="color:#00d4ff;">${data.activity.total_points || 0}</strong></div>`;
+    } else {
+        statsHtml = '<span style="color:var(--text-muted); font-size:0.8rem;">No activities recorded</span>';
+    }
+    document.getElementById('dateStats').innerHTML = statsHtml;
+
+    // Show action buttons based on date type
+    let actionsHtml = '';
+    if (dateType === 'today') {
+        actionsHtml = `<span style="color:var(--primary-color); font-size:0.8rem;">✓ Visit Physical page to manage today's tasks</span>`;
+    }
+    document.getElementById('dateActions').innerHTML = actionsHtml;
+
+    let tasksHtml = '';
+    if ((data.tasks && data.tasks.length > 0) || (data.reminders && data.reminders.length > 0)) {
+        if (data.tasks.length > 0) {
+            tasksHtml += '<strong style="display:block; margin-bottom:8px; font-size:0.9rem; color:var(--success-color);">Physical Tasks:</strong>';
+            data.tasks.forEach(t => {
+                const color = t.is_completed ? 'var(--success-color)' : 'var(--text-muted)';
+                const icon = t.is_completed ? '✓' : '○';
+                tasksHtml += `<div style="padding:6px 0; font-size:0.8rem; color:${color}; margin-left:10px;">
+                    <span style="margin-right:6px;">${icon}</span>${t.title}</div>`;
+            });
+        }
+        if (data.reminders && data.reminders.length > 0) {
+            tasksHtml += '<strong style="display:block; margin:12px 0 8px; font-size:0.9rem; color:var(--primary-color);">Scheduled Reminders:</strong>';
+            data.reminders.forEach(r => {
+                const color = r.is_done ? 'var(--primary-color)' : 'var(--text-muted)';
+                const icon = r.is_done ? '✓' : '○';
+                tasksHtml += `<div style="padding:6px 0; font-size:0.8rem; color:${color}; margin-left:10px;">
+                    <span style="margin-right:6px;">${icon}</span>${r.title}</div>`;
+            });
+        }
+    } else {
+        tasksHtml = '<span style="color:var(--text-muted); font-size:0.8rem;">No tasks or reminders scheduled</span>';
+    }
+    document.getElementById('dateTasksList').innerHTML = tasksHtml;
+    document.getElementById('selectedDateInfo').style.display = 'block';
+}
+
+async function openTaskScheduler(dateStr, dateText) {
+    try {
+        selectedDateStr = dateStr;
+
+        // UI Isolation: Hide the 'Today's Focus' sidebar if we are planning for another day
+        const today = new Date();
+        const todayStr = `${today.getFullYear()}-${String(today.getMonth() + 1).padStart(2, '0')}-${String(today.getDate()).padStart(2, '0')}`;
+        const sidebar = document.getElementById('selectedDateInfo');
+        if (sidebar && dateStr !== todayStr) {
+            sidebar.style.display = 'none';
+        }
+
+        // Apply background blur to main dashboard areas
+        const cards = document.querySelector('.score-cards-grid');
+        const calGrid = document.querySelector('#calendarGrid');
+        const pageHeader = document.querySelector('.page-header');
+        const quoteBanner = document.querySelector('.quote-banner');
+
+        if (cards) cards.classList.add('blurred');
+        if (calGrid) calGrid.classList.add('blurred');
+        if (pageHeader) pageHeader.classList.add('blurred');
+        if (quoteBanner) quoteBanner.classList.add('blurred');
+
+        const input = document.getElementById('schedulerReminderInput');
+        if (input) {
+            input.value = '';
+            input.focus();
+        }
+
+        // Clear container before loading to prevent 'inheritance'
+        const container = document.getElementById('schedulerGoalsContainer');
+        if (container) container.innerHTML = '<div style="text-align:center; padding:20px;"><div class="spinner-small"></div></div>';
+
+        // Load existing goals and reminders for this date
+        const data = await fetchDayView(dateStr, 'overview,physical.goals,physical.reminders');
+
+        // Populate day note
+        const noteInput = document.getElementById('dayNoteInput');
+        if (noteInput) {
+            noteInput.value = data.overview.day_note || '';
+            // Reset save button if note is changed
+            const saveBtn = document.querySelector('button[onclick="saveDayNote()"]');
+            if (saveBtn) saveBtn.textContent = 'Save';
+            // Add oninput listener to reset button text
+            noteInput.oninput = () => {
+                if (saveBtn) saveBtn.textContent = 'Save';
+                saveBtn.style.background = 'var(--success-color)';
+            };
+        }
+
+        // Accurate percentage calculation for the title
+        const pct = data.overview.physical_completion_pct || 0;
+        document.getElementById('schedulerTitle').innerHTML = `${dateStr === todayStr ? 'Today\'s' : dateText} Focus <span style="color:var(--primary-color); font-size:0.9rem; margin-left:10px;">(${pct}%)</span>`;
+
+        let itemsHtml = '';
+        // Unify both goals and reminders into a single list
+        const allItems = [
+            ...(data.physical.goals || []).map(g => ({ id: g.id, title: g.goal_title, type: 'goal', is_done: g.completed_count > 0 })),
+            ...(data.physical.reminders || []).map(r => ({ id: r.id, title: r.title, type: 'reminder', is_done: r.is_done }))
+        ];
+
+        if (allItems.length > 0) {
+            itemsHtml = '<div style="margin-bottom:10px;">';
+            allItems.forEach(item => {
+                const isGoal = item.type === 'goal';
+                const deleteFn = isGoal ? `deleteGoal(${item.id}, '${dateStr}')` : `deleteReminderDirect(${item.id}, '${dateStr}')`;
+                const typeColor = isGoal ? '#10b981' : '#00d4ff';
+                const typeLabel = isGoal ? 'Goal' : 'Reminder';
+                const typeIcon = isGoal ? '🎯' : '📌';
+
+                itemsHtml += `
+                    <div class="reminder-item" style="margin-bottom:8px; background:rgba(255,255,255,0.03); padding:10px 14px; border-radius:10px; border:1px solid rgba(255,255,255,0.05);">
+                        <div style="display:flex; align-items:center; gap:12px; width:100%;">
+                            <span style="font-size:1rem; flex-shrink:0;">${typeIcon}</span>
+                            <div style="flex:1;">
+                                <span style="font-size:0.9rem; color:var(--text-color);">${item.title}</span>
+                                <span style="font-size:0.7rem; color:${typeColor}; margin-left:8px; font-weight:600;">${typeLabel}</span>
+                            </div>
+                            <button onclick="event.stopPropagation(); if(confirm('Delete this item?')) ${deleteFn}" style="background:none; border:none; color:#ef4444; cursor:pointer; font-size:1.1rem; padding:4px; opacity:0.6;" onmouseover="this.style.opacity=1" onmouseout="this.style.opacity=0.6" title="Delete">✕</button>
+                        </div>
+                    </div>`;
+            });
+            itemsHtml += '</div>';
+        } else {
+            itemsHtml = '<div style="text-align:center; padding:30px 0; color:var(--text-muted); font-size:0.85rem;">No things scheduled for this day yet.</div>';
+        }
+
+        if (container) container.innerHTML = itemsHtml;
+        document.getElementById('taskSchedulerModal').style.display = 'flex';
+    } catch (e) {
+        console.error('Scheduler error:', e);
+        alert('Failed to open scheduler. Refreshing...');
+        location.reload();
+    }
+}
+
+async function deleteGoal(goalId, dateStr) {
+    const res = await postJSON('/api/physical-goals/delete', { id: goalId });
+
+    if (res.ok) {
+        const dateText = new Date(dateStr + 'T00:00:00').toLocaleDateString('en-US', { weekday: 'short', month: 'short', day: 'numeric' });
+        await openTaskScheduler(dateStr, dateText);
+        renderCalendar();
+    }
+}
+
+function closeTaskScheduler() {
+    document.getElementById('taskSchedulerModal').style.display = 'none';
+    const main = document.getElementById('mainContainer');
+}
+
+async function saveDayNote() {
+    const note = document.getElementById('dayNoteInput').value;
+    const res = await postJSON('/api/activity/note/update', { date: selectedDateStr, note: note });
+    if (res.ok) {
+        renderCalendar();
+        // Success feedback
+        const btn = document.querySelector('button[onclick="saveDayNote()"]');
+        if (btn) {
+            btn.textContent = 'Saved!';
+            btn.style.background = 'var(--primary-color)';
+        }
+    }
+}
+
+async function saveFutureReminder() {
+    const input = document.getElementById('schedulerReminderInput');
+    const title = input.value.trim();
+    if (!title) return;
+
+    const res = await postJSON('/api/reminders/add', { title: title, date: selectedDateStr });
+
+    if (res.ok) {
+        input.value = '';
+        const dateText = new Date(selectedDateStr + 'T00:00:00').toLocaleDateString('en-US', { weekday: 'short', month: 'short', day: 'numeric' });
+        await openTaskScheduler(selectedDateStr, dateText);
+        renderCalendar();
+    }
+}
+
+async function toggleReminderDirect(id, done, dateStr) {
+    const res = await postJSON('/api/reminders/toggle', { id: id, done: done });
+    if (res.ok) {
+        const dateText = new Date(dateStr + 'T00:00:00').toLocaleDateString('en-US', { weekday: 'short', month: 'short', day: 'numeric' });
+        await openTaskScheduler(dateStr, dateText);
+        renderCalendar();
+    }
+}
+
+async function toggleGoalDirect(id, completed, dateStr) {
+    const res = await postJSON('/api/physical-goals/toggle', { id: id, completed: completed });
+    if (res.ok) {
+        const dateText = new Date(dateStr + 'T00:00:00').toLocaleDateString('en-US', { weekday: 'short', month: 'short', day: 'numeric' });
+        await openTaskScheduler(dateStr, dateText);
+        renderCalendar();
+    }
+}
+
+async function deleteReminderDirect(id, dateStr) {
+    const res = await postJSON('/api/reminders/delete', { id: id });
+    if (res.ok) {
+        const dateText = new Date(dateStr + 'T00:00:00').toLocaleDateString('en-US', { weekday: 'short', month: 'short', day: 'numeric' });
+        await openTaskScheduler(dateStr, dateText);
+        renderCalendar();
+    }
+}
+
+document.getElementById('taskSchedulerModal')?.addEventListener('click', function (e) {
+    if (e.target === this) closeTaskScheduler();
+});
+
+async function openDateViewModal(dateStr, dateText) {
+    try {
+        // UI Isolation: Hide the 'Today's Focus' sidebar if viewing another date
+        const today = new Date();
+        const todayStr = `${today.getFullYear()}-${String(today.getMonth() + 1).padStart(2, '0')}-${String(today.getDate()).padStart(2, '0')}`;
+        const sidebar = document.getElementById('selectedDateInfo');
+        if (sidebar && dateStr !== todayStr) {
+            sidebar.style.display = 'none';
+        }
+
+        // Apply background blur to main dashboard areas
+        const cards = document.querySelector('.score-cards-grid');
+        const calGrid = document.querySelector('#calendarGrid');
+        const pageHeader = document.querySelector('.page-header');
+        const quoteBanner = document.querySelector('.quote-banner');
+
+        if (cards) cards.classList.add('blurred');
+        if (calGrid) calGrid.classList.add('blurred');
+        if (pageHeader) pageHeader.classList.add('blurred');
+        if (quoteBanner) quoteBanner.classList.add('blurred');
+
+        document.getElementById('modalDateHeader').textContent = dateText;
+
+        // Clear containers to prevent inheritance
+        document.getElementById('ovPhysicalPct').textContent = '...%';
+        document.getElementById('ovPhysicalTasks').textContent = '...';
+        document.getElementById('ovProfessionPct').textContent = '...%';
+        document.getElementById('ovProfessionTasks').textContent = '...';
+        document.getElementById('ovCombinedScore').textContent = '...%';
+        document.getElementById('dateViewTasksList').innerHTML = '';
+        document.getElementById('dateViewGoalsList').innerHTML = '';
+        document.getElementById('dateViewHealthMetrics').innerHTML = '';
+        document.getElementById('dateViewNutritionChecklist').innerHTML = '';
+
+        const data = await fetchDayView(dateStr);
+
+        // Populate overview tab
+        const physPct = data.overview.physical_completion_pct || 0;
+        const profPct = data.overview.profession_completion_pct || 0;
+        const physDone = data.physical.phys_done || 0;
+        const physTotal = data.physical.phys_total || 0;
+        const profDone = data.profession.tasks_done || 0;
+        const profTotal = data.profession.tasks_total || 0;
+
+        document.getElementById('ovPhysicalPct').textContent = physPct + '%';
+        document.getElementById('ovPhysicalTasks').textContent = `${physDone}/${physTotal} items`;
+        document.getElementById('ovProfessionPct').textContent = profPct + '%';
+        document.getElementById('ovProfessionTasks').textContent = `${profDone}/${profTotal} tasks`;
+        document.getElementById('ovCombinedScore').textContent = (data.combined || 0) + '%';
+
+        // Populate Task Log Breakdown in Overview
+        let logHtml = '';
+        const allTasks = [
+            ...(data.physical.tasks_list || []).map(t => ({ title: t.title, done: t.is_completed, type: 'Task' })),
+            ...(data.physical.reminders || []).map(r => ({ title: r.title, done: r.is_done, type: 'Reminder' })),
+            ...(data.physical.goals || []).map(g => ({ title: g.goal_title, done: g.completed_count >= g.total_count, type: 'Goal' })),
+            ...(data.physical.checklist || []).map(c => ({ title: c.item_label, done: c.is_checked, type: 'Nutrition' })),
+            ...(data.profession.tasks_list || []).map(t => ({ title: t.title, done: t.is_completed, type: 'Profession' }))
+        ];
+
+        if (allTasks.length === 0) {
+            logHtml = '<div style="text-align:center; padding:20px; color:var(--text-muted); font-size:0.85rem; background:rgba(255,255,255,0.02); border-radius:8px;">No tasks recorded for this date.</div>';
+        } else {
+            allTasks.forEach(task => {
+                const statusIcon = task.done ? '✓' : '○';
+                const statusColor = task.done ? 'var(--success-color)' : 'var(--text-muted)';
+                const bg = task.done ? 'rgba(16,185,129,0.04)' : 'rgba(255,255,255,0.02)';
+                const border = task.done ? 'rgba(16,185,129,0.1)' : 'rgba(255,255,255,0.05)';
+
+                logHtml += `
+                    <div style="display:flex; align-items:center; gap:12px; padding:10px 14px; background:${bg}; border:1px solid ${border}; border-radius:10px;">
+                        <span style="color:${statusColor}; font-weight:bold; font-size:1.1rem;">${statusIcon}</span>
+                        <div style="flex:1;">
+                            <div style="font-size:0.88rem; color:${task.done ? 'var(--text-muted)' : 'var(--text-color)'}; ${task.done ? 'text-decoration:line-through' : ''}">${task.title}</div>
+                            <div style="font-size:0.65rem; color:var(--text-muted); text-transform:uppercase; margin-top:2px;">${task.type}</div>
+                        </div>
+                    </div>`;
+            });
+        }
+        document.getElementById('ovTaskLog').innerHTML = logHtml;
+
+
+        // Populate physical tab
+        populateDateViewPhysical(data);
+
+        // Populate profession tab
+        populateDateViewProfession(data);
+
+        document.getElementById('dateViewModal').style.display = 'flex';
+    } catch (e) {
+        console.error('Failed to load date view:', e);
+        alert('Failed to load record for ' + dateText + '. It might not have any data yet.');
+        // Don't reload, just ensure modal is closed
+        closeDateViewModal();
+    }
+}
+
+function populateDateViewPhysical(data) {
+    // Tasks
+    let tasksHtml = '';
+    if (data.physical.tasks_list.length === 0) {
+        tasksHtml = '<div style="color:var(--text-muted); font-size:0.85rem; text-align:center; padding:20px; border:1px dashed rgba(255,255,255,0.1); border-radius:12px;">No tasks scheduled</div>';
+    } else {
+        tasksHtml = '<div style="display:flex; flex-direction:column; gap:8px;">';
+        data.physical.tasks_list.forEach(t => {
+            const icon = t.is_completed ? '✓' : '○';
+            const color = t.is_completed ? 'var(--success-color)' : 'var(--text-muted)';
+            const bg = t.is_completed ? 'rgba(16,185,129,0.04)' : 'rgba(255,255,255,0.02)';
+            const border = t.is_completed ? 'rgba(16,185,129,0.1)' : 'rgba(255,255,255,0.05)';
+            const strikethrough = t.is_completed ? 'text-decoration:line-through; color:var(--text-muted);' : 'color:var(--text-color);';
+
+            tasksHtml += `
+                <div style="display:flex; align-items:center; gap:12px; padding:10px 14px; background:${bg}; border:1px solid ${border}; border-radius:10px;">
+                    <span style="color:${color}; font-weight:600; font-size:1.1rem;">${icon}</span>
+                    <div style="font-size:0.9rem; ${strikethrough}">${t.title}</div>
+                </div>`;
+        });
+        tasksHtml += '</div>';
+    }
+    document.getElementById('dateViewTasksList').innerHTML = tasksHtml;
+
+    // Physical Goals
+    let goalsHtml = '';
+    if (data.physical.goals && data.physical.goals.length > 0) {
+        goalsHtml = data.physical.goals.map(g => {
+            const categoryEmoji = {
+                'cardio': '🏃',
+                'strength': '💪',
+                'flexibility': '🧘',
+                'medical': '🏥',
+                'sports': '⚽',
+                'general': '🎯'
+            };
+            return `<div style="background:rgba(16,185,129,0.08); border:1px solid rgba(16,185,129,0.15); border-radius:6px; padding:12px; margin-bottom:8px;">
+                <div style="display:flex; align-items:center; gap:8px; margin-bottom:6px;">
+                    <span style="font-size:1.2rem;">${categoryEmoji[g.goal_category] || '🎯'}</span>
+                    <div style="flex:1;">
+                        <div style="font-weight:600; font-size:0.9rem; color:var(--text-color);">${g.goal_title}</div>
+                        <div style="font-size:0.75rem; color:var(--text-muted);">${g.goal_category}</div>
+                    </div>
+                </div>
+                ${g.goal_notes ? `<div style="font-size:0.8rem; color:var(--text-muted); padding-left:0; margin-top:8px;">Notes: ${g.goal_notes}</div>` : ''}
+            </div>`;
+        }).join('');
+    } else {
+        goalsHtml = '<div style="color:var(--text-muted); font-size:0.85rem;">No physical goals scheduled</div>';
+    }
+    document.getElementById('dateViewGoalsList').innerHTML = goalsHtml;
+
+    // Health metrics
+    let metricsHtml = '';
+    if (data.user.height) metricsHtml += `<div style="background:rgba(255,255,255,0.02); border-radius:6px; padding:12px; text-align:center;"><div style="font-size:0.9rem; font-weight:600;">${data.user.height}</div><div style="font-size:0.7rem; color:var(--text-muted);">Height (cm)</div></div>`;
+    if (data.user.weight) metricsHtml += `<div style="background:rgba(255,255,255,0.02); border-radius:6px; padding:12px; text-align:center;"><div style="font-size:0.9rem; font-weight:600;">${data.user.weight}</div><div style="font-size:0.7rem; color:var(--text-muted);">Weight (kg)</div></div>`;
+    if (data.user.bmi) metricsHtml += `<div style="background:rgba(255,255,255,0.02); border-radius:6px; padding:12px; text-align:center;"><div style="font-size:0.9rem; font-weight:600;">${data.user.bmi}</div><div style="font-size:0.7rem; color:var(--text-muted);">BMI</div></div>`;
+    if (data.user.blood_group) metricsHtml += `<div style="background:rgba(255,255,255,0.02); border-radius:6px; padding:12px; text-align:center;"><div style="font-size:0.9rem; font-weight:600;">${data.user.blood_group}</div><div style="font-size:0.7rem; color:var(--text-muted);">Blood Group</div></div>`;
+    document.getElementById('dateViewHealthMetrics').innerHTML = metricsHtml || '<div style="color:var(--text-muted); grid-column:span 4;">No health data</div>';
+
+    // Nutrition checklist
+    let nutritionHtml = '';
+    if (data.physical.checklist.length === 0) {
+        nutritionHtml = '<div style="color:var(--text-muted); font-size:0.85rem;">No nutrition data</div>';
+    } else {
+        const protein = data.physical.checklist.filter(c => c.item_type === 'protein');
+        const fiber = data.physical.checklist.filter(c => c.item_type === 'fiber');
+        const water = data.physical.checklist.filter(c => c.item_type === 'water');
+
+        if (protein.length > 0) {
+            nutritionHtml += '<div style="margin-bottom:16px;"><div style="font-size:0.85rem; font-weight:600; color:var(--accent-color); margin-bottom:8px;">Protein</div>';
+            nutritionHtml += protein.map(c => `<div style="font-size:0.8rem; color:var(--text-muted); margin-bottom:4px; padding-left:16px;"><span style="color:${c.is_checked ? 'var(--success-color)' : 'var(--text-muted)'};">${c.is_checked ? '✓' : '○'}</span> ${c.item_label}</div>`).join('');
+            nutritionHtml += '</div>';
+        }
+        if (fiber.length > 0) {
+            nutritionHtml += '<div style="margin-bottom:16px;"><div style="font-size:0.85rem; font-weight:600; color:var(--success-color); margin-bottom:8px;">Fiber</div>';
+            nutritionHtml += fiber.map(c => `<div style="font-size:0.8rem; color:var(--text-muted); margin-bottom:4px; padding-left:16px;"><span style="color:${c.is_checked ? 'var(--success-color)' : 'var(--text-muted)'};">${c.is_checked ? '✓' : '○'}</span> ${c.item_label}</div>`).join('');
+            nutritionHtml += '</div>';
+        }
+        if (water.length > 0) {
+            nutritionHtml += '<div style="margin-bottom:16px;"><div style="font-size:0.85rem; font-weight:600; color:var(--primary-color); margin-bottom:8px;">Water</div>';
+            nutritionHtml += water.map(c => `<div style="font-size:0.8rem; color:var(--text-muted); margin-bottom:4px; padding-left:16px;"><span style="color:${c.is_checked ? 'var(--success-color)' : 'var(--text-muted)'};">${c.is_checked ? '✓' : '○'}</span> ${c.item_label}</div>`).join('');
+            nutritionHtml += '</div>';
+        }
+    }
+    document.getElementById('dateViewNutritionChecklist').innerHTML = nutritionHtml;
+}
+
+function populateDateViewProfession(data) {
+    let profHtml = `<div style="background:rgba(0,212,255,0.06); border:1px solid rgba(0,212,255,0.15); border-radius:12px; padding:16px; margin-bottom:20px;">
+        <div style="font-size:0.8rem; color:var(--text-muted); text-transform:uppercase; letter-spacing:1px; margin-bottom:12px;">Overall Progress</div>
+        <div style="display:flex; align-items:baseline; gap:8px;">
+            <div style="font-size:2rem; font-weight:900; color:var(--primary-color);">${data.profession.tasks_done}/${data.profession.tasks_total}</div>
+            <div style="color:var(--text-muted); font-size:0.9rem;">tasks completed</div>
+        </div>
+        <div style="height:6px; background:rgba(255,255,255,0.05); border-radius:3px; margin-top:12px; overflow:hidden;">
+            <div style="height:100%; width:${data.profession.percentage}%; background:var(--primary-color); transition: width 0.6s ease;"></div>
+        </div>
+    </div>
+
+    <div style="font-size:0.9rem; font-weight:700; color:var(--text-color); margin-bottom:12px; display:flex; align-items:center; gap:8px;">
+        💼 Task Log
+    </div>`;
+
+    if (data.profession.tasks_list && data.profession.tasks_list.length > 0) {
+        profHtml += '<div style="display:flex; flex-direction:column; gap:8px;">';
+        data.profession.tasks_list.forEach(item => {
+            const icon = item.is_completed ? '✓' : '○';
+            const color = item.is_completed ? 'var(--success-color)' : 'var(--text-muted)';
+            const bg = item.is_completed ? 'rgba(16,185,129,0.04)' : 'rgba(255,255,255,0.02)';
+            const border = item.is_completed ? 'rgba(16,185,129,0.1)' : 'rgba(255,255,255,0.05)';
+            const strikethrough = item.is_completed ? 'text-decoration:line-through; color:var(--text-muted);' : 'color:var(--text-color);';
+
+            profHtml += `
+                <div style="display:flex; align-items:center; gap:12px; padding:10px 14px; background:${bg}; border:1px solid ${border}; border-radius:10px;">
+                    <span style="color:${color}; font-weight:600; font-size:1.1rem;">${icon}</span>
+                    <div style="font-size:0.9rem; ${strikethrough}">${item.title}</div>
+                </div>`;
+        });
+        profHtml += '</div>';
+    } else {
+        profHtml += '<div style="text-align:center; padding:30px; color:var(--text-muted); font-size:0.85rem; background:rgba(255,255,255,0.02); border:1px dashed rgba(255,255,255,0.1); border-radius:12px;">No tasks found in profession notebook.</div>';
+    }
+
+    document.getElementById('dateViewProfTasksList').innerHTML = profHtml;
+}
+
+function switchDateViewTab(tab) {
+    ['overview', 'physical', 'profession'].forEach(t => {
+        document.getElementById('dateView' + t.charAt(0).toUpperCase() + t.slice(1)).style.display = t === tab ? 'block' : 'none';
+        document.getElementById('tab' + t.charAt(0).toUpperCase() + t.slice(1)).style.color = t === tab ? 'var(--primary-color)' : 'var(--text-muted)';
+        document.getElementById('tab' + t.charAt(0).toUpperCase() + t.slice(1)).style.borderBottomColor = t === tab ? 'var(--primary-color)' : 'transparent';
+    });
+}
+
+function closeTaskScheduler() {
+    document.getElementById('taskSchedulerModal').style.display = 'none';
+
+    // Remove background blur from main dashboard areas
+    const cards = document.querySelector('.score-cards-grid');
+    const calGrid = document.querySelector('#calendarGrid');
+    const pageHeader = document.querySelector('.page-header');
+    const quoteBanner = document.querySelector('.quote-banner');
+
+    if (cards) cards.classList.remove('blurred');
+    if (calGrid) calGrid.classList.remove('blurred');
+    if (pageHeader) pageHeader.classList.remove('blurred');
+    if (quoteBanner) quoteBanner.classList.remove('blurred');
+
+    // Restore sidebar for today if it was hidden
+    const today = new Date();
+    const todayStr = `${today.getFullYear()}-${String(today.getMonth() + 1).padStart(2, '0')}-${String(today.getDate()).padStart(2, '0')}`;
+    if (selectedDateStr === todayStr) {
+        const sidebar = document.getElementById('selectedDateInfo');
+        if (sidebar) sidebar.style.display = 'block';
+    }
+}
+
+function closeDateViewModal() {
+    document.getElementById('dateViewModal').style.display = 'none';
+
+    // Remove background blur from main dashboard areas
+    const cards = document.querySelector('.score-cards-grid');
+    const calGrid = document.querySelector('#calendarGrid');
+    const pageHeader = document.querySelector('.page-header');
+    const quoteBanner = document.querySelector('.quote-banner');
+
+    if (cards) cards.classList.remove('blurred');
+    if (calGrid) calGrid.classList.remove('blurred');
+    if (pageHeader) pageHeader.classList.remove('blurred');
+    if (quoteBanner) quoteBanner.classList.remove('blurred');
+
+    // Restore sidebar for today if it was hidden
+    const today = new Date();
+    const todayStr = `${today.getFullYear()}-${String(today.getMonth() + 1).padStart(2, '0')}-${String(today.getDate()).padStart(2, '0')}`;
+    if (selectedDateStr === todayStr) {
+        const sidebar = document.getElementById('selectedDateInfo');
+        if (sidebar) sidebar.style.display = 'block';
+    }
+}
+
+document.getElementById('dateViewModal').addEventListener('click', function (e) {
+    if (e.target === this) closeDateViewModal();
+});
+
+function prevMonth() {
+    calendarViewDate.setMonth(calendarViewDate.getMonth() - 1);
+    renderCalendar();
+}
+
+function nextMonth() {
+    calendarViewDate.setMonth(calendarViewDate.getMonth() + 1);
+    renderCalendar();
+}
+
+// Initialize calendar and pie charts on page load
+document.addEventListener('DOMContentLoaded', () => {
+    initCalendar();
+
+    // Initialize pie charts with a slight delay to trigger CSS transition
+    setTimeout(() => {
+        document.querySelectorAll('.ring-fill').forEach(ring => {
+            const targetOffset = ring.getAttribute('data-target-offset');
+            if (targetOffset) {
+                ring.style.strokeDashoffset = targetOffset;
+            }
+        });
+    }, 150);
+});
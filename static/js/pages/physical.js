@@ -0,0 +1,33 @@
+function openProfileModal() {
+    document.getElementById('profileModal').style.display = 'flex';
+}
+function closeProfileModal() {
+    document.getElementById('profileModal').style.display = 'none';
+}
+document.getElementById('profileModal').addEventListener('click', function (e) {
+    if (e.target === this) closeProfileModal();
+});
+
+async function saveProfile() {
+    const height = document.getElementById('heightInput').value;
+    const weight = document.getElementById('weightInput').value;
+    const bg = document.getElementById('bgInput').value;
+    if (!height || !weight) {
+        showToast('Please enter both height and weight.', 'error');
+        return;
+    }
+    const res = await fetch('/api/physical/update', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ personal_info: { height, weight, blood_group: bg } })
+    });
+    if (res.ok) {
+        showToast('Health profile updated. Reloading nutrition insights…', 'success');
+        setTimeout(() => location.reload(), 1200);
+    }
+}
+
+// Removed old task-loading scripts that are no longer needed
+document.addEventListener('DOMContentLoaded', () => {
+    // Initialization if needed
+});
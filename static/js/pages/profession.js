@@ -0,0 +1,144 @@
+const checkSVG = () => `<svg width="10" height="10" viewBox="0 0 10 10" fill="none"><path d="M1.5 5l2.5 2.5 5-5" stroke="#000" stroke-width="1.5" stroke-linecap="round"/></svg>`;
+
+function updateProfStats() {
+    const todoCount = document.querySelectorAll('#profTodoList .prof-task-item').length;
+    const doneCount = document.querySelectorAll('#profDoneList .prof-task-item').length;
+    const total = todoCount + doneCount;
+    const pct = total > 0 ? Math.round(doneCount / total * 100) : 0;
+
+    const setText = (id, v) => { const el = document.getElementById(id); if (el) el.textContent = v; };
+    setText('statTotal', total);
+    setText('statDone', doneCount);
+    setText('statPending', todoCount);
+    setText('statPct', pct + '%');
+    setText('todoBadge', todoCount);
+    setText('doneBadge', doneCount);
+
+    const bar = document.getElementById('statBar');
+    if (bar) bar.style.width = pct + '%';
+}
+
+async function addProfTask() {
+    const input = document.getElementById('newProfTaskInput');
+    const title = input.value.trim();
+    if (!title) return;
+    const res = await fetch('/api/profession/tasks/add', {
+        method: 'POST', headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ title })
+    });
+    if (res.ok) {
+        const data = await res.json();
+        const todoList = document.getElementById('profTodoList');
+        const empty = document.getElementById('todoEmptyMsg');
+        if (empty) empty.remove();
+        const li = document.createElement('li');
+        li.className = 'prof-task-item'; li.setAttribute('data-id', data.id);
+        li.innerHTML = `
+        <div class="ptask-check" onclick="toggleProfTask(${data.id}, this)"></div>
+        <span class="ptask-text" contenteditable="true"
+              onblur="editProfTask(${data.id}, this)"
+              onkeydown="if(event.key==='Enter'){event.preventDefault(); this.blur();}">${title}</span>
+        <button class="ptask-del" onclick="deleteProfTask(${data.id}, this.closest('li'))">✕</button>`;
+        todoList.prepend(li);
+        input.value = '';
+        updateProfStats();
+    }
+}
+
+async function toggleProfTask(id, checkEl) {
+    const li = checkEl.closest('.prof-task-item');
+    const isDone = !checkEl.classList.contains('checked');
+    const textEl = li.querySelector('.ptask-text');
+    const res = await fetch('/api/profession/tasks/toggle', {
+        method: 'POST', headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ id, completed: isDone })
+    });
+    if (!res.ok) return;
+
+    if (isDone) {
+        checkEl.classList.add('checked');
+        checkEl.innerHTML = checkSVG();
+        li.classList.add('done');
+        if (textEl) { textEl.classList.add('done-text'); textEl.contentEditable = 'false'; }
+        const doneList = document.getElementById('profDoneList');
+        const doneEmpty = document.getElementById('doneEmptyMsg');
+        if (doneEmpty) doneEmpty.remove();
+        doneList.prepend(li);
+        const todoList = document.getElementById('profTodoList');
+        if (!todoList.querySelector('.prof-task-item')) {
+            const empty = document.createElement('li');
+            empty.id = 'todoEmptyMsg'; empty.className = 'task-empty';
+            empty.textContent = 'Nothing in the queue. Add a technical task above!';
+            todoList.appendChild(empty);
+        }
+    } else {
+        checkEl.classList.remove('checked'); checkEl.innerHTML = '';
+        li.classList.remove('done');
+        if (textEl) { textEl.classList.remove('done-text'); textEl.contentEditable = 'true'; }
+        const todoList = document.getElementById('profTodoList');
+        const todoEmpty = document.getElementById('todoEmptyMsg');
+        if (todoEmpty) todoEmpty.remove();
+        todoList.prepend(li);
+        const doneList = document.getElementById('profDoneList');
+        if (!doneList.querySelector('.prof-task-item')) {
+            const empty = document.createElement('li');
+            empty.id = 'doneEmptyMsg'; empty.className = 'task-empty';
+            empty.textContent = 'Completed tasks appear here. Keep pushing!';
+            doneList.appendChild(empty);
+        }
+    }
+    updateProfStats();
+}
+
+async function loadOlderPending(btn) {
+    btn.disabled = true;
+    const res = await fetch(`/api/profession/tasks/past-pending?cursor=${encodeURIComponent(btn.dataset.cursor)}`);
+    if (!res.ok) { btn.disabled = false; return; }
+    const data = await res.json();
+    const list = document.getElementById('profPastPendingList');
+    data.tasks.forEach(t => {
+        const li = document.createElement('li');
+        li.className = 'prof-task-item'; li.setAttribute('data-id', t.id);
+        li.innerHTML = `
+        <div class="ptask-check" onclick="toggleProfTask(${t.id}, this)"></div>
+        <span class="ptask-text" contenteditable="true"
+              onblur="editProfTask(${t.id}, this)"
+              onkeydown="if(event.key==='Enter'){event.preventDefault(); this.blur();}"></span>
+        <button class="ptask-del" onclick="deleteProfTask(${t.id}, this.closest('li'))" title="Delete task">✕</button>`;
+        const text = li.querySelector('.ptask-text');
+        text.textContent = t.title + ' ';
+        const small = document.createElement('small');
+        small.style.cssText = 'color:var(--text-muted); font-size:0.75rem;';
+        small.textContent = `(${t.task_date})`;
+        text.appendChild(small);
+        list.appendChild(li);
+    });
+    if (data.next_cursor) {
+        btn.dataset.cursor = data.next_cursor;
+        btn.disabled = false;
+    } else {
+        btn.remove();
+    }
+}
+
+async function editProfTask(id, el) {
+    const title = el.textContent.trim();
+    if (!title) return;
+    await fetch('/api/profession/tasks/edit', {
+        method: 'POST', headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ id, title })
+    });
+}
+
+async function deleteProfTask(id, li) {
+    if (!li) return;
+    const res = await fetch('/api/profession/tasks/delete', {
+        method: 'POST', headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ id })
+    });
+    if (res.ok) {
+        li.style.opacity = '0'; li.style.transform = 'translateX(20px)';
+        li.style.transition = 'all 0.25s ease';
+        setTimeout(() => { li.remove(); updateProfStats(); }, 250);
+    }
+}
@@ -76,6 +76,71 @@ function showToast(message, type = 'info') {
     }, 4000);
 }
 
+// ─── Batched Mutations ───────────────────────────────────────────────────────
+// Clicks are queued and flushed together through /api/batch, so "check all"
+// runs and fast double-clicks cost one round-trip instead of one per click.
+const BATCH_DELAY_MS = 300;
+const BATCH_MAX_OPS = 50;
+const mutationQueue = { ops: [], waiters: [], timer: null };
+
+function queueMutation(op) {
+    return new Promise((resolve, reject) => {
+        // A newer toggle of the same item replaces the queued one
+        const idx = op.op === 'toggle'
+            ? mutationQueue.ops.findIndex(o => o.op === 'toggle' && o.type === op.type && o.id === op.id)
+            : -1;
+        if (idx >= 0) {
+            mutationQueue.ops[idx] = op;
+            mutationQueue.waiters[idx].push({ resolve, reject });
+        } else {
+            mutationQueue.ops.push(op);
+            mutationQueue.waiters.push([{ resolve, reject }]);
+        }
+
+        clearTimeout(mutationQueue.timer);
+        if (mutationQueue.ops.length >= BATCH_MAX_OPS) flushMutations();
+        else mutationQueue.timer = setTimeout(flushMutations, BATCH_DELAY_MS);
+    });
+}
+
+async function flushMutations(keepalive = false) {
+    clearTimeout(mutationQueue.timer);
+    if (mutationQueue.ops.length === 0) return;
+    const ops = mutationQueue.ops.splice(0);
+    const waiters = mutationQueue.waiters.splice(0);
+    NeriStore.discardPrimed();
+
+    try {
+        const res = await fetch('/api/batch', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ ops }),
+            keepalive
+        });
+        if (!res.ok) throw new Error(`Batch failed (${res.status})`);
+        const data = await res.json();
+        waiters.forEach((list, i) => list.forEach(w => w.resolve(data.results[i])));
+    } catch (e) {
+        waiters.forEach(list => list.forEach(w => w.reject(e)));
+        showToast('Could not save your changes. Please retry.', 'error');
+    }
+}
+
+// Single (unbatched) JSON mutation
+function postJSON(url, body) {
+    NeriStore.discardPrimed();
+    return fetch(url, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(body)
+    });
+}
+
+// Don't lose queued clicks when the tab is closed or navigated away
+document.addEventListener('visibilitychange', () => {
+    if (document.visibilityState === 'hidden') flushMutations(true);
+});
+
 // ─── Calendar ───────────────────────────────────────────────────────────────
 let selectedDate = new Date().toISOString().split('T')[0];
 
@@ -196,11 +261,7 @@ async function toggleTask(id, li) {
     updateCombinedScore();
 
     if (id) {
-        await fetch('/api/task/toggle', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ id, completed: isNowDone })
-        });
+        await queueMutation({ type: 'task', op: 'toggle', id, completed: isNowDone });
     }
 }
 
@@ -549,11 +610,7 @@ async function toggleNutrition(id, li) {
     }
     if (text) text.classList.toggle('done-text', isChecked);
 
-    await fetch('/api/nutrition/checklist/toggle', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ id, checked: isChecked })
-    });
+    await queueMutation({ type: 'checklist', op: 'toggle', id, checked: isChecked });
 }
 // ─── Browser Notifications ──────────────────────────────────────────────────
 function initBrowserNotifications() {
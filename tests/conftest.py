@@ -0,0 +1,32 @@
+import os
+import sys
+import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+
+TODAY = datetime.date.today().isoformat()
+
+
+@pytest.fixture
+def app(tmp_path):
+    return create_app({'DATABASE': str(tmp_path / 'neri.db'), 'TESTING': True, 'QUOTE_API_URL': ''})
+
+
+def login(app, uid=1):
+    """A test client signed in as uid"""
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = uid
+    return client
+
+
+@pytest.fixture
+def client(app):
+    """Client for a freshly signed-up user (id 1)"""
+    client = app.test_client()
+    client.post('/auth/signup', data={'username': 'tester', 'password': 'secret'})
+    return client
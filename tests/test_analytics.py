@@ -0,0 +1,94 @@
+"""Streaks are kept current by writers; GET /api/analytics only reads."""
+import datetime
+import random
+
+from analytics import RUNS_SQL, current_streaks, refresh_dirty_streaks
+from database import connect
+from rollover import rollover
+from conftest import TODAY
+
+
+def days_ago(n):
+    return (datetime.date.today() - datetime.timedelta(days=n)).isoformat()
+
+
+def complete_tasks(client, days):
+    for n, day in enumerate(days, 1):
+        client.post('/api/task/add', json={'title': f'task {n}', 'date': day})
+        client.post('/api/task/toggle', json={'id': n, 'completed': True})
+
+
+def test_writes_refresh_streaks(app, client):
+    complete_tasks(client, [days_ago(2), days_ago(1), TODAY])
+    db = connect(app.config['DATABASE'])
+    row = db.execute('SELECT * FROM activity_streaks WHERE user_id = 1').fetchone()
+    db.close()
+    assert row['dirty_from'] is None and row['longest_len'] == 3
+
+    streaks = client.get('/api/analytics').get_json()['streaks']
+    assert (streaks['current'], streaks['longest']) == (3, 3)
+
+
+def test_analytics_get_writes_nothing(app, client):
+    complete_tasks(client, [days_ago(1), TODAY])
+    db = connect(app.config['DATABASE'])
+    # A write that skipped the refresh (e.g. hand-edited rows) leaves the summary dirty
+    db.execute('UPDATE daily_activity SET total_points = 0 WHERE entry_date = ?', (TODAY,))
+    db.commit()
+    before = db.execute('PRAGMA data_version').fetchone()[0]
+
+    streaks = client.get('/api/analytics').get_json()['streaks']
+
+    assert db.execute('PRAGMA data_version').fetchone()[0] == before
+    assert db.execute('SELECT dirty_from FROM activity_streaks WHERE user_id = 1').fetchone()[0] == TODAY
+    db.close()
+    assert (streaks['current'], streaks['longest']) == (1, 1)
+
+
+def test_refresh_only_on_active_flip(app, client, monkeypatch):
+    import activity
+    calls = []
+    monkeypatch.setattr(activity, 'refresh_streaks', lambda db, uid: calls.append(uid))
+    for title in ('a', 'b'):
+        client.post('/api/task/add', json={'title': title, 'date': TODAY})
+    calls.clear()
+    client.post('/api/task/toggle', json={'id': 1, 'completed': True})
+    client.post('/api/task/toggle', json={'id': 2, 'completed': True})
+    client.post('/api/task/toggle', json={'id': 2, 'completed': False})
+    assert calls == [1]
+
+
+def test_broken_record_is_deferred(app, client):
+    complete_tasks(client, [days_ago(6), days_ago(5), days_ago(4), days_ago(1), TODAY])
+    # Breaks the record run in the middle
+    client.post('/api/task/toggle', json={'id': 2, 'completed': False})
+    db = connect(app.config['DATABASE'])
+    assert db.execute('SELECT dirty_from FROM activity_streaks WHERE user_id = 1').fetchone()[0] == days_ago(5)
+
+    streaks = client.get('/api/analytics').get_json()['streaks']
+    assert (streaks['current'], streaks['longest']) == (2, 2)
+
+    assert rollover(db, TODAY, pause=0)['activity_streaks'] == 1
+    row = db.execute('SELECT * FROM activity_streaks WHERE user_id = 1').fetchone()
+    db.close()
+    assert row['dirty_from'] is None and row['longest_len'] == 2
+
+
+def test_incremental_streaks_match_full_scan(app, client):
+    rng = random.Random(11)
+    days = [days_ago(n) for n in range(40, -1, -1)]
+    complete_tasks(client, days)
+    done = dict.fromkeys(range(1, len(days) + 1), True)
+    db = connect(app.config['DATABASE'])
+    for _ in range(150):
+        task = rng.randint(1, len(days))
+        done[task] = not done[task]
+        client.post('/api/task/toggle', json={'id': task, 'completed': done[task]})
+        if rng.random() < 0.1:
+            refresh_dirty_streaks(db)
+            db.commit()
+        runs = [tuple(r) for r in db.execute(RUNS_SQL, (1, '0000-01-01'))]
+        row = current_streaks(db, 1)
+        assert (row['latest_start'], row['latest_end']) == (runs[-1][:2] if runs else (None, None))
+        assert row['longest_len'] == max((r[2] for r in runs), default=0)
+    db.close()
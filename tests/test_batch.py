@@ -0,0 +1,54 @@
+"""/api/batch: ops applied in order in one transaction, errors reported per op."""
+from database import connect
+from conftest import TODAY, login
+
+
+def batch(client, *ops):
+    return client.post('/api/batch', json={'ops': list(ops)})
+
+
+def task_rows(app):
+    db = connect(app.config['DATABASE'])
+    rows = [tuple(r) for r in db.execute('SELECT id, user_id, title, is_completed FROM tasks ORDER BY id')]
+    db.close()
+    return rows
+
+
+def test_add_then_toggle(app, client):
+    resp = batch(client, {'type': 'task', 'op': 'add', 'title': 'run', 'date': TODAY},
+                 {'type': 'task', 'op': 'toggle', 'id': 1, 'completed': True})
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert [r['status'] for r in body['results']] == ['success', 'success']
+    assert body['days'][TODAY]['phys_done'] == 1
+    assert task_rows(app) == [(1, 1, 'run', 1)]
+
+
+def test_bad_ops_reported_per_op(app, client):
+    resp = batch(client,
+                 {'type': 'task', 'op': 'add', 'title': 'run', 'date': TODAY},
+                 {'type': 'task', 'op': 'toggle', 'id': [1], 'completed': True},
+                 {'type': 'task', 'op': 'delete', 'id': {'id': 1}},
+                 {'type': 'task', 'op': 'edit', 'id': 1, 'title': 42},
+                 {'type': 'task', 'op': 'add', 'title': 'swim', 'date': 'tomorrow'},
+                 {'type': 'task', 'op': 'toggle', 'completed': True},
+                 {'type': 'habit', 'op': 'add'},
+                 'toggle',
+                 {'type': 'task', 'op': 'toggle', 'id': '1', 'completed': True})
+    assert resp.status_code == 200
+    results = resp.get_json()['results']
+    assert [r['status'] for r in results] == ['success'] + ['error'] * 7 + ['success']
+    assert results[1]['message'] == 'id must be a positive integer'
+    assert results[4]['message'] == 'date must be a YYYY-MM-DD date'
+    assert task_rows(app) == [(1, 1, 'run', 1)]
+
+
+def test_other_users_ids_are_not_found(app, client):
+    other = app.test_client()
+    other.post('/auth/signup', data={'username': 'other', 'password': 'secret'})
+    other.post('/api/task/add', json={'title': 'theirs', 'date': TODAY})
+
+    resp = batch(login(app, 1), {'type': 'task', 'op': 'toggle', 'id': 1, 'completed': True},
+                 {'type': 'task', 'op': 'delete', 'id': 1})
+    assert [r['message'] for r in resp.get_json()['results']] == ['Not found', 'Not found']
+    assert task_rows(app) == [(1, 2, 'theirs', 0)]
@@ -0,0 +1,86 @@
+"""Cached calendar payloads follow writes made outside the serving worker."""
+import datetime
+
+from app import create_app
+from database import connect
+from conftest import TODAY, login
+
+
+def second_worker(app):
+    """Another app on the same database, as a second gunicorn worker would be"""
+    return create_app({'DATABASE': app.config['DATABASE'], 'TESTING': True, 'QUOTE_API_URL': ''})
+
+
+def test_write_in_other_worker_refreshes_cache(app, client):
+    client.post('/api/task/add', json={'title': 'run', 'date': TODAY})
+    day_url = f'/api/date-view?date={TODAY}'
+    first = client.get(day_url)
+    etag = first.headers['ETag']
+    assert client.get(day_url, headers={'If-None-Match': etag}).status_code == 304
+
+    login(second_worker(app)).post('/api/task/toggle', json={'id': 1, 'completed': True})
+
+    fresh = client.get(day_url, headers={'If-None-Match': etag})
+    assert fresh.status_code == 200
+    assert fresh.get_json()['physical']['phys_done'] == 1
+
+
+def test_script_write_refreshes_month(app, client):
+    client.post('/api/reminders/add', json={'title': 'stretch', 'date': TODAY})
+    year, month = TODAY[:4], int(TODAY[5:7])
+    month_url = f'/api/calendar/month?year={year}&month={month}'
+    before = client.get(month_url).get_json()[TODAY]
+
+    # e.g. an import or recalculate_all.py writing straight to the database
+    db = connect(app.config['DATABASE'])
+    db.execute("UPDATE daily_activity SET day_note = 'from a script' WHERE user_id = 1")
+    db.commit()
+    db.close()
+
+    after = client.get(month_url).get_json()[TODAY]
+    assert before.get('day_note') is None and after['day_note'] == 'from a script'
+
+
+def test_unchanged_data_is_served_from_cache(app, client):
+    client.post('/api/task/add', json={'title': 'run', 'date': TODAY})
+    day_url = f'/api/date-view?date={TODAY}'
+    client.get(day_url)
+    cache = app.extensions['neri']['calendar_cache']
+    entry = cache._entries[('day', 1, TODAY)]
+    client.get(day_url)
+    assert cache._entries[('day', 1, TODAY)] is entry
+
+
+def test_write_today_keeps_past_month_cached(app, client):
+    past = (datetime.date.fromisoformat(TODAY).replace(day=1) - datetime.timedelta(days=1)).isoformat()
+    client.post('/api/task/add', json={'title': 'run', 'date': past})
+    month_url = f'/api/calendar/month?year={past[:4]}&month={int(past[5:7])}'
+    day_url = f'/api/date-view?date={past}'
+    client.get(month_url)
+    client.get(day_url)
+    cache = app.extensions['neri']['calendar_cache']
+    month_key, day_key = ('month', 1, int(past[:4]), int(past[5:7])), ('day', 1, past)
+    entries = cache._entries[month_key], cache._entries[day_key]
+
+    # Written by another worker, so only the version stamps can tell
+    login(second_worker(app)).post('/api/task/add', json={'title': 'swim', 'date': TODAY})
+
+    assert client.get(month_url).status_code == 200
+    assert client.get(day_url).status_code == 200
+    assert cache._entries[month_key] is entries[0] and cache._entries[day_key] is entries[1]
+
+
+def test_profile_change_refreshes_every_month(app, client):
+    past = (datetime.date.fromisoformat(TODAY).replace(day=1) - datetime.timedelta(days=1)).isoformat()
+    day_url = f'/api/date-view?date={past}'
+    client.get(day_url)
+    cache = app.extensions['neri']['calendar_cache']
+    entry = cache._entries[('day', 1, past)]
+
+    db = connect(app.config['DATABASE'])
+    db.execute('UPDATE users SET weight = 70 WHERE id = 1')
+    db.commit()
+    db.close()
+
+    client.get(day_url)
+    assert cache._entries[('day', 1, past)] is not entry
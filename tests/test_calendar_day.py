@@ -0,0 +1,30 @@
+"""/api/calendar/day keeps its row-shaped response; ?fields= opts into the day view projection."""
+from conftest import TODAY
+
+
+def test_rows_as_stored(client):
+    assert client.get(f'/api/calendar/day?date={TODAY}').get_json() == {'activity': None, 'tasks': [], 'reminders': []}
+
+    client.post('/api/task/add', json={'title': 'run', 'date': TODAY})
+    client.post('/api/task/toggle', json={'id': 1, 'completed': True})
+    client.post('/api/reminders/add', json={'title': 'stretch', 'date': TODAY})
+    body = client.get(f'/api/calendar/day?date={TODAY}').get_json()
+
+    assert body['activity']['entry_date'] == TODAY
+    assert (body['activity']['total_points'], body['activity']['physical_total_count']) == (1, 2)
+    assert {'user_id', 'counts_version', 'day_note', 'physical_completion_pct'} <= body['activity'].keys()
+    assert body['tasks'] == [{'id': 1, 'user_id': 1, 'title': 'run', 'task_date': TODAY, 'is_completed': 1}]
+    assert [(r['title'], r['reminder_date'], r['is_done']) for r in body['reminders']] == [('stretch', TODAY, 0)]
+
+
+def test_fields_projection(client):
+    client.post('/api/task/add', json={'title': 'run', 'date': TODAY})
+    fields = 'overview,physical.tasks_list'
+    projected = client.get(f'/api/calendar/day?date={TODAY}&fields={fields}').get_json()
+    assert projected == client.get(f'/api/date-view?date={TODAY}&fields={fields}').get_json()
+    assert projected['physical']['tasks_list'][0]['title'] == 'run'
+
+
+def test_bad_arguments(client):
+    assert client.get('/api/calendar/day?date=someday').status_code == 400
+    assert client.get(f'/api/calendar/day?date={TODAY}&fields=nonsense').status_code == 400
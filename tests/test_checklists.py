@@ -0,0 +1,76 @@
+"""Checklist pregeneration: who gets one, and what it does to daily_activity."""
+import datetime
+
+import pytest
+
+from activity import stored_daily_activity, verify_daily_activity
+from checklists import active_user_ids, checklist_template, pregenerate
+from database import connect
+from migrations import ACTIVITY_COUNTS_VERSION
+from conftest import TODAY
+
+TOMORROW = (datetime.date.fromisoformat(TODAY) + datetime.timedelta(days=1)).isoformat()
+
+
+def days_ago(n):
+    return (datetime.date.fromisoformat(TODAY) - datetime.timedelta(days=n)).isoformat()
+
+
+@pytest.fixture
+def db(app, client):
+    db = connect(app.config['DATABASE'])
+    yield db
+    db.close()
+
+
+def checklist(db, day, uid=1):
+    return db.execute('SELECT item_label, item_type FROM nutrition_checklist WHERE user_id = ? AND entry_date = ? '
+                      'ORDER BY id', (uid, day)).fetchall()
+
+
+def test_active_users(client, db):
+    assert active_user_ids(db, TOMORROW) == []
+    # An empty row (as older rollovers left behind) is not activity
+    db.execute('INSERT INTO daily_activity (user_id, entry_date) VALUES (1, ?)', (TODAY,))
+    db.commit()
+    assert active_user_ids(db, TOMORROW) == []
+
+    db.execute('UPDATE daily_activity SET day_note = ?', ('rest day',))
+    db.commit()
+    assert active_user_ids(db, TOMORROW) == [1]
+    assert active_user_ids(db, days_ago(-20)) == []
+
+
+def test_scheduled_items_count_as_activity(client, db):
+    client.post('/api/reminders/add', json={'title': 'stretch', 'date': days_ago(3)})
+    assert active_user_ids(db, TOMORROW) == [1]
+
+
+def test_pregenerate_skips_existing(client, db):
+    client.post('/api/task/add', json={'title': 'run', 'date': TOMORROW})
+    assert pregenerate(db, TOMORROW) == 1
+    items = checklist(db, TOMORROW)
+    assert [tuple(r) for r in items] == list(checklist_template(None, TOMORROW))
+    assert pregenerate(db, TOMORROW) == 0
+    assert len(checklist(db, TOMORROW)) == len(items)
+
+
+def test_pregenerate_adds_to_existing_row(client, db):
+    client.post('/api/task/add', json={'title': 'run', 'date': TOMORROW})
+    pregenerate(db, TOMORROW)
+    row = db.execute('SELECT counts_version FROM daily_activity WHERE user_id = 1 AND entry_date = ?',
+                     (TOMORROW,)).fetchone()
+    assert row['counts_version'] == ACTIVITY_COUNTS_VERSION
+    assert stored_daily_activity(db, 1, TOMORROW) is not None
+    assert verify_daily_activity(db, 1, TOMORROW) == {}
+
+
+def test_pregenerate_creates_no_activity_row(client, db):
+    client.post('/api/task/add', json={'title': 'run', 'date': TODAY})
+    assert pregenerate(db, TOMORROW) == 1
+    assert db.execute('SELECT COUNT(*) FROM daily_activity WHERE entry_date = ?', (TOMORROW,)).fetchone()[0] == 0
+
+    # The first mutation of the day counts the pregenerated items
+    client.post('/api/task/add', json={'title': 'swim', 'date': TOMORROW})
+    assert verify_daily_activity(db, 1, TOMORROW) == {}
+    assert stored_daily_activity(db, 1, TOMORROW)['phys_total'] == len(checklist(db, TOMORROW)) + 1
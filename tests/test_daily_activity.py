@@ -0,0 +1,95 @@
+"""daily_activity counters: the stored row the overview trusts, its
+counts_version stamp, and incremental deltas against a full recompute."""
+import random
+
+import pytest
+
+from activity import compute_daily_activity, stored_daily_activity, verify_daily_activity
+from app import load_daily_activity
+from database import connect
+from migrations import ACTIVITY_COUNTS_VERSION
+from conftest import TODAY
+
+
+@pytest.fixture
+def db(app, client):
+    db = connect(app.config['DATABASE'])
+    yield db
+    db.close()
+
+
+def stored_row(db):
+    return db.execute('SELECT * FROM daily_activity WHERE user_id = 1 AND entry_date = ?', (TODAY,)).fetchone()
+
+
+def test_load_computes_missing_row(app, client, db):
+    client.post('/api/task/add', json={'title': 'run', 'date': TODAY})
+    db.execute('DELETE FROM daily_activity')
+    db.commit()
+    with app.app_context():
+        stats = load_daily_activity(db, 1, TODAY)
+    assert stats == compute_daily_activity(db, 1, TODAY)
+    # The day's first mutation creates the row, not a read
+    assert stored_row(db) is None
+
+
+def test_load_trusts_current_row(app, client, db):
+    client.post('/api/task/add', json={'title': 'run', 'date': TODAY})
+    # A current-version row is served as stored, without a recount
+    db.execute('UPDATE daily_activity SET physical_points = 7, physical_total_count = 9')
+    db.commit()
+    with app.app_context():
+        stats = load_daily_activity(db, 1, TODAY)
+    assert (stats['phys_done'], stats['phys_total']) == (7, 9)
+
+
+def test_load_recounts_outdated_row(app, client, db):
+    client.post('/api/task/add', json={'title': 'run', 'date': TODAY})
+    db.execute('UPDATE daily_activity SET physical_points = 7, physical_total_count = 9, counts_version = ?',
+               (ACTIVITY_COUNTS_VERSION - 1,))
+    db.commit()
+    assert stored_daily_activity(db, 1, TODAY) is None
+    with app.app_context():
+        stats = load_daily_activity(db, 1, TODAY)
+    assert stats == compute_daily_activity(db, 1, TODAY)
+    assert stored_row(db)['counts_version'] == ACTIVITY_COUNTS_VERSION
+    assert verify_daily_activity(db, 1, TODAY) == {}
+
+
+def test_deltas_match_recalculate(app, client, db):
+    rng = random.Random(7)
+    ids = {'task': 0, 'reminder': 0, 'goal': 0, 'profession': 0}
+    adds = {
+        'task': ('/api/task/add', lambda n: {'title': f'task {n}', 'date': TODAY}),
+        'reminder': ('/api/reminders/add', lambda n: {'title': f'reminder {n}', 'date': TODAY}),
+        'goal': ('/api/physical-goals/add', lambda n: {'goal_title': f'goal {n}', 'goal_date': TODAY}),
+        'profession': ('/api/profession/tasks/add', lambda n: {'title': f'ticket {n}', 'date': TODAY}),
+    }
+    toggles = {
+        'task': ('/api/task/toggle', 'completed'),
+        'reminder': ('/api/reminders/toggle', 'done'),
+        'goal': ('/api/physical-goals/toggle', 'completed'),
+        'profession': ('/api/profession/tasks/toggle', 'completed'),
+    }
+    deletes = {'reminder': '/api/reminders/delete', 'goal': '/api/physical-goals/delete',
+               'profession': '/api/profession/tasks/delete'}
+
+    for step in range(200):
+        kind = rng.choice(list(adds))
+        action = rng.random()
+        if action < 0.3 or not ids[kind]:
+            url, body = adds[kind]
+            ids[kind] += 1
+            client.post(url, json=body(ids[kind]))
+        elif action < 0.85:
+            url, flag = toggles[kind]
+            client.post(url, json={'id': rng.randint(1, ids[kind]), flag: rng.random() < 0.5})
+        elif kind in deletes:
+            client.post(deletes[kind], json={'id': rng.randint(1, ids[kind])})
+        else:
+            client.post('/api/batch', json={'ops': [{'type': 'task', 'op': 'delete', 'id': rng.randint(1, ids[kind])}]})
+        assert verify_daily_activity(db, 1, TODAY) == {}, f'drift after step {step}'
+
+    stats = stored_daily_activity(db, 1, TODAY)
+    assert stats == compute_daily_activity(db, 1, TODAY)
+    assert stats['phys_pct'] <= 100 and stats['prof_pct'] <= 100
@@ -0,0 +1,94 @@
+"""Exporting a history and importing it for another user gives the same rows."""
+import datetime
+import gzip
+import time
+
+import pytest
+
+from database import connect
+from export import EXPORT_TABLES
+from importer import IMPORT_TABLES
+from conftest import TODAY, login
+
+# daily_activity's counters aren't imported but recomputed, so they must match too
+COUNTERS = ('physical_points', 'physical_total_count', 'profession_points', 'profession_total_count',
+            'total_points', 'physical_completion_pct', 'profession_completion_pct')
+
+
+def signup(app, username):
+    client = app.test_client()
+    client.post('/auth/signup', data={'username': username, 'password': 'secret'})
+    return client
+
+
+def days_from_today(days):
+    return (datetime.date.fromisoformat(TODAY) + datetime.timedelta(days=days)).isoformat()
+
+
+@pytest.fixture
+def history(app, client):
+    """User 1's rows in every exported table, entered through the API"""
+    yesterday = days_from_today(-1)
+    client.get('/physical')
+    client.post('/api/physical/update', json={'water': 1.5, 'food_log': 'oats, "rice", lentils'})
+    client.post('/api/nutrition/checklist/toggle', json={'id': 1, 'checked': True})
+    for title, day in (('run', yesterday), ('swim, then stretch', TODAY)):
+        client.post('/api/task/add', json={'title': title, 'date': day})
+    client.post('/api/task/toggle', json={'id': 1, 'completed': True})
+    client.post('/api/reminders/add', json={'title': 'call the doctor', 'date': TODAY})
+    client.post('/api/reminders/add', json={'title': 'someday'})
+    client.post('/api/physical-goals/add', json={'goal_title': 'leg day', 'goal_date': days_from_today(1)})
+    client.post('/api/profession/tasks/add', json={'title': 'review PR', 'date': yesterday})
+    client.post('/api/profession/tasks/toggle', json={'id': 1, 'completed': True})
+    client.post('/api/activity/note/update', json={'date': yesterday, 'note': 'long day\nbut fine'})
+    return client
+
+
+def rows(app, uid):
+    """{table: sorted rows of the columns an import carries over}"""
+    db = connect(app.config['DATABASE'])
+    result = {}
+    for table in EXPORT_TABLES:
+        cols = list(IMPORT_TABLES[table][1]) + (list(COUNTERS) if table == 'daily_activity' else [])
+        result[table] = [tuple(r) for r in db.execute(
+            f"SELECT {', '.join(cols)} FROM {table} WHERE user_id = ? ORDER BY {', '.join(cols)}", (uid,))]
+    db.close()
+    return result
+
+
+def import_and_wait(client, body, **args):
+    resp = client.post('/api/import', query_string=args, data=body)
+    assert resp.status_code == 202
+    for _ in range(200):
+        job = client.get(resp.get_json()['status_url']).get_json()['job']
+        if job['state'] in ('done', 'failed'):
+            return job
+        time.sleep(0.05)
+    raise AssertionError('import did not finish')
+
+
+def test_ndjson_round_trip(app, history):
+    plain = history.get('/api/export?gzip=0').data
+    packed = history.get('/api/export', headers={'Accept-Encoding': 'gzip'})
+    assert packed.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(packed.data) == plain
+
+    job = import_and_wait(signup(app, 'copy'), gzip.decompress(packed.data), format='ndjson')
+    assert (job['state'], job['rows_rejected']) == ('done', 0)
+    assert job['rows_imported'] == len(plain.splitlines())
+    assert rows(app, 2) == rows(app, 1)
+    assert all(rows(app, 1).values())
+
+
+def test_csv_round_trip(app, history):
+    copy = signup(app, 'copy')
+    for table in EXPORT_TABLES:
+        body = history.get(f'/api/export?format=csv&tables={table}&gzip=0').data
+        job = import_and_wait(copy, body, format='csv', table=table)
+        assert (job['state'], job['rows_rejected']) == ('done', 0), job['errors']
+    assert rows(app, 2) == rows(app, 1)
+
+
+def test_export_is_per_user(app, history):
+    signup(app, 'other')
+    assert login(app, 2).get('/api/export?gzip=0').data == b''
@@ -0,0 +1,91 @@
+"""Import jobs: malformed lines are rejected one by one, database errors fail the job."""
+import json
+import os
+import time
+
+import importer
+from database import connect
+from importer import ImportJobs
+from conftest import TODAY
+
+
+def ndjson(*records):
+    return ''.join((r if isinstance(r, str) else json.dumps(r)) + '\n' for r in records).encode()
+
+
+def wait(client, resp):
+    assert resp.status_code == 202
+    for _ in range(200):
+        job = client.get(resp.get_json()['status_url']).get_json()['job']
+        if job['state'] in ('done', 'failed'):
+            return job
+        time.sleep(0.05)
+    raise AssertionError('import did not finish')
+
+
+def count(app, table):
+    db = connect(app.config['DATABASE'])
+    n = db.execute(f'SELECT COUNT(*) FROM {table} WHERE user_id = 1').fetchone()[0]
+    db.close()
+    return n
+
+
+def test_malformed_lines_are_rejected(app, client):
+    body = ndjson({'table': 'tasks', 'title': 'run', 'task_date': TODAY, 'is_completed': True},
+                  '{"table": "tasks", "title": ',
+                  {'table': 'tasks', 'title': 'swim', 'task_date': 'someday'},
+                  {'table': 'habits', 'title': 'read'},
+                  {'table': 'tasks', 'title': 'walk', 'task_date': TODAY, 'colour': 'red'},
+                  {'table': 'reminders', 'reminder_date': TODAY},
+                  ['not', 'an', 'object'],
+                  '',
+                  {'table': 'tasks', 'title': 'row', 'task_date': TODAY, 'is_completed': 'maybe'},
+                  {'table': 'profession_tasks', 'title': 'review', 'task_date': TODAY})
+    job = wait(client, client.post('/api/import?format=ndjson', data=body))
+
+    assert job['state'] == 'done'
+    assert (job['rows_read'], job['rows_imported'], job['rows_rejected']) == (9, 2, 7)
+    assert [e['line'] for e in job['errors']] == [2, 3, 4, 5, 6, 7, 9]
+    assert job['errors'][0]['error'] == 'invalid JSON'
+    assert job['errors'][1]['error'].startswith('task_date:')
+    assert (count(app, 'tasks'), count(app, 'profession_tasks')) == (1, 1)
+    assert job['days_recomputed'] == 1
+    assert client.get(f'/api/date-view?date={TODAY}').get_json()['overview']['total_points'] == 1
+
+
+def test_csv_row_with_extra_fields(app, client):
+    body = f'title,task_date\nrun,{TODAY}\nswim,{TODAY},extra\n'.encode()
+    job = wait(client, client.post('/api/import?format=csv&table=tasks', data=body))
+    assert job['errors'] == [{'line': 3, 'error': 'more fields than the header'}]
+    assert count(app, 'tasks') == 1
+
+
+def test_database_error_fails_the_job(app, client, monkeypatch, tmp_path):
+    # Commit after every row, then break the statement for reminders
+    monkeypatch.setattr(importer, 'BATCH_ROWS', 1)
+    monkeypatch.setattr(importer, 'COMMIT_ROWS', 1)
+    insert_sql = importer.insert_sql
+    broken = 'INSERT INTO no_such_table VALUES (1)'
+    monkeypatch.setattr(importer, 'insert_sql', lambda table: broken if table == 'reminders' else insert_sql(table))
+    path = tmp_path / 'import.ndjson'
+    path.write_bytes(ndjson({'table': 'tasks', 'title': 'run', 'task_date': TODAY, 'is_completed': 1},
+                            {'table': 'reminders', 'title': 'stretch', 'reminder_date': TODAY},
+                            {'table': 'tasks', 'title': 'swim', 'task_date': TODAY}))
+    done = []
+    jobs = ImportJobs(lambda: connect(app.config['DATABASE']), on_done=done.append)
+    job = jobs.submit(1, str(path), 'ndjson')
+    for _ in range(200):
+        if done:  # on_done runs last
+            break
+        time.sleep(0.05)
+    job = jobs.get(job['id'])
+
+    assert job['state'] == 'failed' and 'no_such_table' in job['error']
+    assert job['finished'] and done == [1]
+    assert not os.path.exists(path)
+    # The row committed before the error stays, and its day is recounted
+    assert count(app, 'tasks') == 1
+    db = connect(app.config['DATABASE'])
+    assert db.execute('SELECT total_points FROM daily_activity WHERE user_id = 1 AND entry_date = ?',
+                      (TODAY,)).fetchone()[0] == 1
+    db.close()
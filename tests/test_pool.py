@@ -0,0 +1,38 @@
+"""Each app owns its connection pool and closes it when it goes away."""
+import gc
+import sqlite3
+
+import pytest
+
+from app import create_app
+
+
+def test_requests_reuse_the_apps_pool(app, client):
+    pool = app.extensions['neri']['pool']
+    client.get('/overview')
+    idle = pool._idle.qsize()
+    assert idle >= 1
+    client.get('/overview')
+    assert pool._idle.qsize() == idle
+
+
+def test_pool_closed_with_app(tmp_path):
+    app = create_app({'DATABASE': str(tmp_path / 'neri.db'), 'TESTING': True, 'QUOTE_API_URL': ''})
+    pool = app.extensions['neri']['pool']
+    db = pool.acquire()
+    pool.release(db)
+    del app
+    gc.collect()
+    assert pool.closed
+    with pytest.raises(sqlite3.ProgrammingError):
+        db.execute('SELECT 1')
+
+
+def test_release_after_close_closes(app):
+    pool = app.extensions['neri']['pool']
+    db = pool.acquire()
+    pool.close()
+    pool.release(db)
+    assert pool._idle.qsize() == 0
+    with pytest.raises(sqlite3.ProgrammingError):
+        db.execute('SELECT 1')
@@ -0,0 +1,62 @@
+"""profession_stats counters: kept by triggers, repaired by reconcile_stats.py when corrupted."""
+import pytest
+
+import reconcile_stats
+from database import connect
+from conftest import TODAY, login
+
+
+@pytest.fixture
+def db(app, client):
+    db = connect(app.config['DATABASE'])
+    yield db
+    db.close()
+
+
+def counters(db, uid):
+    row = db.execute('SELECT completed_count, target_count FROM profession_stats WHERE user_id = ?', (uid,)).fetchone()
+    return tuple(row) if row else None
+
+
+def add_tasks(client, done, pending):
+    ids = [client.post('/api/profession/tasks/add', json={'title': f'task {n}', 'date': TODAY}).get_json()['id']
+           for n in range(done + pending)]
+    for task_id in ids[:done]:
+        client.post('/api/profession/tasks/toggle', json={'id': task_id, 'completed': True})
+    return ids
+
+
+def test_triggers_keep_counters(client, db):
+    ids = add_tasks(client, 2, 2)
+    assert counters(db, 1) == (2, 4)
+    client.post('/api/profession/tasks/delete', json={'id': ids[0]})
+    client.post('/api/profession/tasks/toggle', json={'id': ids[2], 'completed': True})
+    assert counters(db, 1) == (2, 3)
+    assert reconcile_stats.drift(db) == []
+
+
+def test_repairs_corrupted_counters(app, client, db):
+    add_tasks(client, 1, 2)
+    other = app.test_client()
+    other.post('/auth/signup', data={'username': 'other', 'password': 'secret'})
+    add_tasks(login(app, 2), 2, 0)
+
+    db.execute('UPDATE profession_stats SET completed_count = 42 WHERE user_id = 1')
+    db.execute('DELETE FROM profession_stats WHERE user_id = 2')
+    db.commit()
+    assert reconcile_stats.drift(db) == [(1, (42, 3), (1, 3)), (2, None, (2, 2))]
+    assert reconcile_stats.drift(db, 2) == [(2, None, (2, 2))]
+
+    path = app.config['DATABASE']
+    assert reconcile_stats.main(['--db', path, '--verify']) == 1
+    assert counters(db, 1) == (42, 3)  # --verify writes nothing
+
+    assert reconcile_stats.main(['--db', path, '--user', '2']) == 0
+    assert (counters(db, 1), counters(db, 2)) == ((42, 3), (2, 2))
+    assert reconcile_stats.main(['--db', path]) == 0
+    assert (counters(db, 1), counters(db, 2)) == ((1, 3), (2, 2))
+    assert reconcile_stats.main(['--db', path, '--verify']) == 0
+
+    # The triggers carry on from the repaired values
+    client.post('/api/profession/tasks/toggle', json={'id': 2, 'completed': True})
+    assert counters(db, 1) == (2, 3)
@@ -0,0 +1,57 @@
+"""rollover only materializes days for users with real activity, and
+never creates daily_activity rows ahead of time."""
+import datetime
+
+import pytest
+
+from checklists import ACTIVE_DAYS, active_user_ids
+from database import connect
+from rollover import rollover
+from conftest import TODAY
+
+
+def day(n):
+    return (datetime.date.fromisoformat(TODAY) + datetime.timedelta(days=n)).isoformat()
+
+
+def counts(db):
+    return {table: db.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+            for table in ('daily_activity', 'daily_physical', 'nutrition_checklist')}
+
+
+@pytest.fixture
+def db(app, client):
+    db = connect(app.config['DATABASE'])
+    yield db
+    db.close()
+
+
+def test_idle_user_gets_no_rows(db):
+    before = counts(db)
+    for n in range(1, 61):
+        rollover(db, day(n), pause=0)
+    assert counts(db) == before
+    assert active_user_ids(db, day(1)) == []
+
+
+def test_active_user_lapses(client, db):
+    client.post('/api/task/add', json={'title': 'run', 'date': TODAY})
+    client.post('/api/task/toggle', json={'id': 1, 'completed': True})
+    for n in range(1, 3 * ACTIVE_DAYS):
+        rollover(db, day(n), pause=0)
+
+    # Materialized rows don't keep the user active: one task, ACTIVE_DAYS days
+    checklist_days = [r[0] for r in db.execute('SELECT DISTINCT entry_date FROM nutrition_checklist ORDER BY 1')]
+    assert checklist_days == [day(n) for n in range(1, ACTIVE_DAYS + 1)]
+    assert [r[0] for r in db.execute('SELECT entry_date FROM daily_activity')] == [TODAY]
+
+
+def test_overview_after_rollover_stores_nothing(client, db):
+    client.post('/api/task/add', json={'title': 'run', 'date': TODAY})
+    db.execute('DELETE FROM daily_activity')
+    db.commit()
+    rollover(db, TODAY, pause=0)
+    assert counts(db)['nutrition_checklist'] > 0
+
+    assert client.get('/overview').status_code == 200
+    assert counts(db)['daily_activity'] == 0
@@ -0,0 +1,115 @@
+"""The trigger-kept week/month/year rollups equal a recomputation from daily_activity."""
+import datetime
+import random
+
+import pytest
+
+from database import connect
+from rollups import rebuild, verify
+
+# Around a year end, so weeks straddle months and years
+START = datetime.date(2024, 12, 20)
+DAYS = [(START + datetime.timedelta(days=n)).isoformat() for n in range(45)]
+
+
+def period_keys(day):
+    date = datetime.date.fromisoformat(day)
+    return {'weekly_activity': (date - datetime.timedelta(days=date.weekday())).isoformat(),
+            'monthly_activity': day[:7], 'yearly_activity': day[:4]}
+
+
+def recomputed(db, uid):
+    """{table: {period: sums}} straight from uid's daily_activity rows"""
+    result = {table: {} for table in ('weekly_activity', 'monthly_activity', 'yearly_activity')}
+    for row in db.execute('SELECT * FROM daily_activity WHERE user_id = ?', (uid,)):
+        for table, key in period_keys(row['entry_date']).items():
+            sums = result[table].setdefault(key, dict.fromkeys(
+                ('days', 'active_days', 'physical_points', 'physical_total_count', 'profession_points',
+                 'profession_total_count', 'total_points', 'physical_pct_sum', 'profession_pct_sum'), 0))
+            sums['days'] += 1
+            sums['active_days'] += row['total_points'] >= 1
+            for column in ('physical_points', 'physical_total_count', 'profession_points',
+                           'profession_total_count', 'total_points'):
+                sums[column] += row[column]
+            sums['physical_pct_sum'] += row['physical_completion_pct']
+            sums['profession_pct_sum'] += row['profession_completion_pct']
+    return result
+
+
+def stored(db, uid):
+    result = {}
+    for table, period in (('weekly_activity', 'week_start'), ('monthly_activity', 'month'),
+                          ('yearly_activity', 'year')):
+        result[table] = {}
+        for row in db.execute(f'SELECT * FROM {table} WHERE user_id = ?', (uid,)):
+            result[table][row[period]] = {k: row[k] for k in row.keys() if k not in ('user_id', period)}
+    return result
+
+
+@pytest.fixture
+def db(app, client):
+    db = connect(app.config['DATABASE'])
+    yield db
+    db.close()
+
+
+def test_rollups_follow_random_writes(client, db):
+    rng = random.Random(5)
+    tasks, ids = {}, {'task': 0, 'profession': 0}
+    for step in range(300):
+        action = rng.random()
+        if action < 0.4 or not tasks:
+            day = rng.choice(DAYS)
+            kind = rng.choice(('task', 'profession'))
+            url = '/api/task/add' if kind == 'task' else '/api/profession/tasks/add'
+            client.post(url, json={'title': f'item {step}', 'date': day})
+            ids[kind] += 1
+            tasks[(kind, ids[kind])] = False
+        elif action < 0.8:
+            kind, task_id = key = rng.choice(list(tasks))
+            tasks[key] = not tasks[key]
+            url = '/api/task/toggle' if kind == 'task' else '/api/profession/tasks/toggle'
+            client.post(url, json={'id': task_id, 'completed': tasks[key]})
+        elif action < 0.9:
+            client.post('/api/activity/note/update', json={'date': rng.choice(DAYS), 'note': f'note {step}'})
+        else:
+            # Straight to the table: a day moved to an empty date (maybe another period), or removed
+            stored_days = [r[0] for r in db.execute('SELECT entry_date FROM daily_activity WHERE user_id = 1')]
+            empty_days = [d for d in DAYS if d not in stored_days]
+            if stored_days and empty_days and rng.random() < 0.5:
+                db.execute('UPDATE daily_activity SET entry_date = ? WHERE user_id = 1 AND entry_date = ?',
+                           (rng.choice(empty_days), rng.choice(stored_days)))
+            else:
+                db.execute('DELETE FROM daily_activity WHERE user_id = 1 AND entry_date = ?', (rng.choice(DAYS),))
+            db.commit()
+    assert db.execute('SELECT COUNT(*) FROM daily_activity').fetchone()[0] > 20
+    assert stored(db, 1) == recomputed(db, 1)
+    assert verify(db) == []
+
+
+def test_rollup_endpoint_averages(client, db):
+    for day in ('2025-01-06', '2025-01-07'):
+        client.post('/api/task/add', json={'title': 'run', 'date': day})
+        client.post('/api/task/add', json={'title': 'swim', 'date': day})
+    client.post('/api/task/toggle', json={'id': 1, 'completed': True})
+    body = client.get('/api/analytics/rollup?period=week&from=2025-01-01&to=2025-01-31').get_json()
+    assert [r['period'] for r in body['rows']] == ['2025-01-06']
+    row = body['rows'][0]
+    expected = recomputed(db, 1)['weekly_activity']['2025-01-06']
+    assert {k: row[k] for k in expected} == expected
+    assert (row['days'], row['active_days'], row['physical_avg'], row['points_avg']) == (2, 1, 25.0, 0.5)
+
+
+def test_verify_and_rebuild_repair_drift(client, db):
+    client.post('/api/task/add', json={'title': 'run', 'date': DAYS[0]})
+    client.post('/api/task/toggle', json={'id': 1, 'completed': True})
+    db.execute('UPDATE monthly_activity SET total_points = 99')
+    db.execute('DELETE FROM weekly_activity')
+    db.commit()
+    drift = verify(db)
+    week = period_keys(DAYS[0])['weekly_activity']
+    assert {(table, period) for table, _, period, _ in drift} == {('monthly_activity', DAYS[0][:7]),
+                                                                  ('weekly_activity', week)}
+    rebuild(db, progress=lambda message: None)
+    assert verify(db) == []
+    assert stored(db, 1) == recomputed(db, 1)
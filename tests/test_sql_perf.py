@@ -0,0 +1,18 @@
+"""Per-request SQL timing is opt-in."""
+from app import create_app
+
+
+def test_sql_perf_off_by_default(app, client):
+    assert app.config['SQL_PERF'] is False
+    response = client.get('/overview')
+    assert response.status_code == 200 and 'Server-Timing' not in response.headers
+    assert app.extensions['neri']['perf_registry'].snapshot() == []
+
+
+def test_sql_perf_opt_in(app):
+    timed = create_app({'DATABASE': app.config['DATABASE'], 'TESTING': True, 'QUOTE_API_URL': '', 'SQL_PERF': True})
+    client = timed.test_client()
+    client.post('/auth/signup', data={'username': 'timed', 'password': 'secret'})
+    response = client.get('/overview')
+    assert 'Server-Timing' in response.headers
+    assert 'GET /overview' in [r['route'] for r in timed.extensions['neri']['perf_registry'].snapshot()]
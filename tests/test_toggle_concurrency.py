@@ -0,0 +1,77 @@
+"""Concurrent toggles and deletes must leave daily_activity equal to a recount."""
+import random
+import threading
+
+from activity import verify_daily_activity
+from database import connect
+from conftest import TODAY, login
+
+THREADS = 4
+ROUNDS = 30
+
+
+def race(app, send):
+    """Run send(client, rng, i) ROUNDS times in each of THREADS threads at once"""
+    barrier = threading.Barrier(THREADS)
+    errors = []
+
+    def worker(seed):
+        client, rng = login(app), random.Random(seed)
+        barrier.wait()
+        try:
+            for i in range(ROUNDS):
+                response = send(client, rng, i)
+                assert response.status_code == 200, response.get_data(as_text=True)
+        except Exception as e:  # surfaced in the main thread
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(THREADS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors, errors[0]
+
+
+def drift(app):
+    db = connect(app.config['DATABASE'])
+    try:
+        return verify_daily_activity(db, 1, TODAY)
+    finally:
+        db.close()
+
+
+def test_concurrent_toggles_keep_counters(app, client):
+    for n in range(3):
+        client.post('/api/task/add', json={'title': f'task {n}', 'date': TODAY})
+        client.post('/api/reminders/add', json={'title': f'reminder {n}', 'date': TODAY})
+        client.post('/api/physical-goals/add', json={'goal_title': f'goal {n}', 'goal_date': TODAY})
+        client.post('/api/profession/tasks/add', json={'title': f'ticket {n}', 'date': TODAY})
+    endpoints = [
+        ('/api/task/toggle', 'completed'),
+        ('/api/reminders/toggle', 'done'),
+        ('/api/physical-goals/toggle', 'completed'),
+        ('/api/profession/tasks/toggle', 'completed'),
+    ]
+
+    def toggle(c, rng, i):
+        url, flag = rng.choice(endpoints)
+        return c.post(url, json={'id': rng.randint(1, 3), flag: rng.random() < 0.5})
+
+    race(app, toggle)
+    assert drift(app) == {}
+
+
+def test_concurrent_deletes_apply_once(app, client):
+    for n in range(3):
+        client.post('/api/reminders/add', json={'title': f'reminder {n}', 'date': TODAY})
+        client.post('/api/physical-goals/add', json={'goal_title': f'goal {n}', 'goal_date': TODAY})
+        client.post('/api/profession/tasks/add', json={'title': f'ticket {n}', 'date': TODAY})
+        client.post('/api/task/add', json={'title': f'task {n}', 'date': TODAY})
+    client.post('/api/reminders/toggle', json={'id': 1, 'done': True})
+    client.post('/api/physical-goals/toggle', json={'id': 1, 'completed': True})
+    urls = ['/api/reminders/delete', '/api/physical-goals/delete', '/api/profession/tasks/delete']
+
+    # Every thread deletes the same rows; only the first delete of each may count
+    race(app, lambda c, rng, i: c.post(urls[i % 3], json={'id': i // 3 % 3 + 1}))
+    assert drift(app) == {}
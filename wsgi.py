@@ -0,0 +1,4 @@
+"""WSGI entry point: `gunicorn wsgi:app` (or any server that loads a module-level app)."""
+from app import create_app
+
+app = create_app()